@@ -6,20 +6,17 @@
 
 const BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 const DEFAULT_ENGAGEMENT_ID = import.meta.env.VITE_DEMO_ENGAGEMENT_ID;
+// Largest page the list endpoints return
+const PAGE_SIZE = 200;
 
-// GET /demo/engagements
+// GET /demo/engagements (table columns only)
 export async function fetchEngagements() {
-  return requestJson('/demo/engagements', { method: 'GET' });
+  return requestAllPages('/demo/engagements?view=summary');
 }
 
 // GET /businesses
 export async function fetchBusinesses() {
-  const url = BASE_URL ? `${BASE_URL}/businesses` : '/businesses';
-  const res = await fetch(url);
-  if (!res.ok) {
-    throw new Error(`Failed to fetch businesses: ${res.status}`);
-  }
-  return res.json();
+  return requestAllPages('/businesses');
 }
 
 // GET /businesses/{id}
@@ -72,6 +69,39 @@ async function requestJson(path, options = {}) {
   return response.json();
 }
 
+// List endpoints return one page per request; follow X-Next-Cursor until the last page.
+async function requestAllPages(path, options = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const separator = path.includes('?') ? '&' : '?';
+    const pagePath = cursor
+      ? `${path}${separator}limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`
+      : `${path}${separator}limit=${PAGE_SIZE}`;
+    const response = await fetch(`${BASE_URL}${pagePath}`, {
+      ...options,
+      headers: {
+        'Content-Type': 'application/json',
+        ...getAuthHeaders(),
+        ...(options.headers || {}),
+      },
+    });
+    if (!response.ok) {
+      let message = `Request failed (${response.status})`;
+      try {
+        const err = await response.json();
+        message = err.detail || err.message || message;
+      } catch {
+        // Ignore JSON parse errors, keep fallback message.
+      }
+      throw new Error(message);
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}
+
 function toEngagementPayload(data) {
   return {
     contact_name: data.contactName || null,
@@ -332,14 +362,17 @@ export async function batchDeleteTasks(clientId, taskIds) {
   });
 }
 
-// GET /demo/engagements/{engagementId}/reviews
-export async function fetchReviews(engagementId) {
+// GET /demo/engagements/{engagementId}/reviews (+ /summary for the counts)
+export async function fetchReviews(engagementId, { signal } = {}) {
   const id = resolveEngagementId(engagementId);
   if (!id) return { total: 0, unanswered_count: 0, reviews: [] };
-  const reviews = await requestJson(`/demo/engagements/${id}/reviews`);
+  const [counts, reviews] = await Promise.all([
+    requestJson(`/demo/engagements/${id}/reviews/summary`, { signal }),
+    requestAllPages(`/demo/engagements/${id}/reviews`, { signal }),
+  ]);
   return {
-    total: reviews.length,
-    unanswered_count: reviews.filter((r) => !r.has_reply).length,
+    total: counts.total,
+    unanswered_count: counts.unanswered_count,
     reviews,
   };
 }
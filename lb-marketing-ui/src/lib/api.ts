@@ -5,6 +5,9 @@
 
 import { getAuthToken } from "./auth";
 
+// Largest page the list endpoints return
+const PAGE_SIZE = 200;
+
 const getApiUrl = (): string => {
   // In production, use the environment variable
   // In development, use relative paths (Vite proxy handles it)
@@ -64,6 +67,28 @@ export const apiFetch = async (
   return fetch(url, config);
 };
 
+/**
+ * Fetches every item of a list endpoint
+ * List endpoints return one page per request; follows X-Next-Cursor until the last page
+ */
+export const apiFetchAll = async <T = any>(endpoint: string): Promise<T[]> => {
+  const items: T[] = [];
+  const separator = endpoint.includes("?") ? "&" : "?";
+  let cursor: string | null = null;
+  do {
+    const page = cursor
+      ? `${endpoint}${separator}limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`
+      : `${endpoint}${separator}limit=${PAGE_SIZE}`;
+    const response = await apiFetch(page);
+    if (!response.ok) {
+      throw new Error(`Request to ${endpoint} failed: ${response.status}`);
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+};
+
 /**
  * API endpoints
  */
@@ -75,7 +100,7 @@ export const api = {
       body: JSON.stringify(data),
     }),
 
-  listPosts: () => apiFetch("/posts"),
+  listPosts: () => apiFetchAll("/posts"),
 
   getPost: (id: number) => apiFetch(`/posts/${id}`),
 
@@ -168,7 +193,7 @@ export const api = {
     }),
 
   // Social Profiles
-  listSocialProfiles: () => apiFetch("/social-profiles"),
+  listSocialProfiles: () => apiFetchAll("/social-profiles"),
 
   createSocialProfile: (data: any) =>
     apiFetch("/social-profiles", {
@@ -181,13 +181,7 @@ export default function SimpleMarketingDashboard() {
     if (!user) return;
     setLoadingPosts(true);
     try {
-      const res = await api.listPosts();
-      if (res.ok) {
-        const data = await res.json();
-        setPosts(data);
-      } else {
-        console.error("Failed to fetch posts:", res.status);
-      }
+      setPosts(await api.listPosts());
     } catch (err) {
       console.error("Error fetching posts:", err);
     } finally {
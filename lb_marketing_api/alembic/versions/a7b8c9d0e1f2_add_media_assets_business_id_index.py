@@ -0,0 +1,28 @@
+"""add_media_assets_business_id_index
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_media_assets_business_id_id', 'media_assets', ['business_id', 'id'],
+        postgresql_include=['mime_type']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_assets_business_id_id', table_name='media_assets')
@@ -0,0 +1,77 @@
+"""add_lookup_indexes
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hot dashboard lookups
+    op.create_index('ix_businesses_user_id', 'businesses', ['user_id'])
+    op.create_index(
+        'ix_social_profiles_user_platform_status', 'social_profiles', ['user_id', 'platform', 'status']
+    )
+    op.create_index(
+        'ix_scheduled_posts_user_id_scheduled_at', 'scheduled_posts', ['user_id', 'scheduled_at']
+    )
+    op.create_index(
+        'ix_scheduled_posts_due', 'scheduled_posts', ['scheduled_at'],
+        postgresql_where=sa.text("status = 'scheduled'")
+    )
+    op.create_index(
+        'ix_client_engagements_user_id_created_at', 'client_engagements', ['user_id', 'created_at']
+    )
+    op.create_index(
+        'ix_review_records_engagement_gbp_review', 'review_records', ['engagement_id', 'gbp_review_id']
+    )
+    op.create_index(
+        'ix_review_records_engagement_published', 'review_records', ['engagement_id', 'review_published_at']
+    )
+    op.create_index(
+        'ix_review_records_unanswered', 'review_records', ['engagement_id'],
+        postgresql_where=sa.text('has_reply = false')
+    )
+
+    # Foreign keys (parent deletes cascade through these)
+    op.create_index('ix_locations_business_id', 'locations', ['business_id'])
+    op.create_index('ix_social_profiles_business_id', 'social_profiles', ['business_id'])
+    op.create_index('ix_campaigns_business_id', 'campaigns', ['business_id'])
+    op.create_index('ix_scheduled_posts_business_id', 'scheduled_posts', ['business_id'])
+    op.create_index('ix_scheduled_posts_campaign_id', 'scheduled_posts', ['campaign_id'])
+    op.create_index('ix_scheduled_posts_media_asset_id', 'scheduled_posts', ['media_asset_id'])
+    op.create_index('ix_oauth_states_user_id', 'oauth_states', ['user_id'])
+    op.create_index('ix_oauth_states_business_id', 'oauth_states', ['business_id'])
+    op.create_index('ix_client_engagements_business_id', 'client_engagements', ['business_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_client_engagements_business_id', table_name='client_engagements')
+    op.drop_index('ix_oauth_states_business_id', table_name='oauth_states')
+    op.drop_index('ix_oauth_states_user_id', table_name='oauth_states')
+    op.drop_index('ix_scheduled_posts_media_asset_id', table_name='scheduled_posts')
+    op.drop_index('ix_scheduled_posts_campaign_id', table_name='scheduled_posts')
+    op.drop_index('ix_scheduled_posts_business_id', table_name='scheduled_posts')
+    op.drop_index('ix_campaigns_business_id', table_name='campaigns')
+    op.drop_index('ix_social_profiles_business_id', table_name='social_profiles')
+    op.drop_index('ix_locations_business_id', table_name='locations')
+
+    op.drop_index('ix_review_records_unanswered', table_name='review_records')
+    op.drop_index('ix_review_records_engagement_published', table_name='review_records')
+    op.drop_index('ix_review_records_engagement_gbp_review', table_name='review_records')
+    op.drop_index('ix_client_engagements_user_id_created_at', table_name='client_engagements')
+    op.drop_index('ix_scheduled_posts_due', table_name='scheduled_posts')
+    op.drop_index('ix_scheduled_posts_user_id_scheduled_at', table_name='scheduled_posts')
+    op.drop_index('ix_social_profiles_user_platform_status', table_name='social_profiles')
+    op.drop_index('ix_businesses_user_id', table_name='businesses')
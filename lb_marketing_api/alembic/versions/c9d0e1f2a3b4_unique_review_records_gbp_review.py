@@ -0,0 +1,39 @@
+"""unique_review_records_gbp_review
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Row-by-row sync could leave duplicates behind; keep the oldest record of each review
+    op.execute("""
+        DELETE FROM review_records a
+        USING review_records b
+        WHERE a.engagement_id = b.engagement_id
+          AND a.gbp_review_id = b.gbp_review_id
+          AND a.id > b.id
+    """)
+    op.drop_index('ix_review_records_engagement_gbp_review', table_name='review_records')
+    op.create_unique_constraint(
+        'uq_review_record_engagement_gbp_review', 'review_records', ['engagement_id', 'gbp_review_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_review_record_engagement_gbp_review', 'review_records', type_='unique')
+    op.create_index(
+        'ix_review_records_engagement_gbp_review', 'review_records', ['engagement_id', 'gbp_review_id']
+    )
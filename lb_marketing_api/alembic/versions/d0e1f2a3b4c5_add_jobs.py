@@ -0,0 +1,65 @@
+"""add_jobs
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    job_status_enum = postgresql.ENUM('queued', 'running', 'succeeded', 'failed', 'canceled', name='jobstatus')
+    job_status_enum.create(op.get_bind(), checkfirst=True)
+
+    if not op.get_bind().dialect.has_table(op.get_bind(), 'jobs'):
+        op.create_table('jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('engagement_id', sa.Integer(), nullable=True),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('status', postgresql.ENUM(name='jobstatus', create_type=False), nullable=False),
+            sa.Column('params', sa.JSON(), nullable=True),
+            sa.Column('progress_total', sa.Integer(), nullable=True),
+            sa.Column('progress_done', sa.Integer(), nullable=False),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['engagement_id'], ['client_engagements.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'])
+        op.create_index('ix_jobs_user_id', 'jobs', ['user_id'])
+        op.create_index('ix_jobs_engagement_id', 'jobs', ['engagement_id'])
+
+    if not op.get_bind().dialect.has_table(op.get_bind(), 'job_results'):
+        op.create_table('job_results',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('data', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_job_results_job_id_id', 'job_results', ['job_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_table('job_results')
+    op.drop_table('jobs')
+    postgresql.ENUM(name='jobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,39 @@
+"""add_media_renditions
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not op.get_bind().dialect.has_table(op.get_bind(), 'media_renditions'):
+        op.create_table('media_renditions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('media_asset_id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('storage_url', sa.Text(), nullable=False),
+            sa.Column('mime_type', sa.String(length=100), nullable=False),
+            sa.Column('width', sa.Integer(), nullable=False),
+            sa.Column('height', sa.Integer(), nullable=False),
+            sa.Column('byte_size', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['media_asset_id'], ['media_assets.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('media_asset_id', 'name', name='uq_rendition_asset_name')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('media_renditions')
@@ -0,0 +1,46 @@
+"""add_content_addressed_media
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not op.get_bind().dialect.has_table(op.get_bind(), 'media_blobs'):
+        op.create_table('media_blobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('content_hash', sa.String(length=64), nullable=False),
+            sa.Column('storage_url', sa.Text(), nullable=False),
+            sa.Column('mime_type', sa.String(length=100), nullable=True),
+            sa.Column('byte_size', sa.Integer(), nullable=False),
+            sa.Column('ref_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('content_hash')
+        )
+
+    op.add_column('media_assets', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        'media_assets_content_hash_fkey', 'media_assets', 'media_blobs',
+        ['content_hash'], ['content_hash']
+    )
+    op.create_index('ix_media_assets_content_hash', 'media_assets', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_assets_content_hash', table_name='media_assets')
+    op.drop_constraint('media_assets_content_hash_fkey', 'media_assets', type_='foreignkey')
+    op.drop_column('media_assets', 'content_hash')
+    op.drop_table('media_blobs')
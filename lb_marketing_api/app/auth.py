@@ -3,9 +3,9 @@ from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 
-from .db import get_db
+from .db import AsyncSessionLocal
 from . import models
 from .config import settings
 
@@ -47,9 +47,14 @@ def verify_token(token: str) -> Optional[dict]:
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
 ) -> models.User:
-    """Get the current authenticated user from the JWT token."""
+    """
+    Get the current authenticated user from the JWT token.
+    
+    The user is loaded with a session of its own that is closed before the endpoint runs,
+    so authentication doesn't hold a pooled connection alongside the endpoint's session.
+    The returned user is detached; only its column attributes are available.
+    """
     import logging
     logger = logging.getLogger(__name__)
     
@@ -96,7 +101,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if user is None or not user.is_active:
         logger.warning(f"get_current_user: User {user_id} not found or inactive")
         raise HTTPException(
@@ -14,6 +14,27 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = "postgres"
     DATABASE_NAME: str = "lb-marketing"
 
+    # Connection pool (per Function instance, so keep it small under scale-out)
+    # DATABASE_POOL_MODE: "queue" = SQLAlchemy QueuePool, "null" = no app-side pooling
+    # (use with PgBouncer / Azure Flexible Server built-in PgBouncer in transaction mode)
+    DATABASE_POOL_MODE: str = "queue"
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 2
+    DATABASE_POOL_TIMEOUT: int = 10  # Seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 180  # Seconds; below Azure's idle connection timeout
+    # Pre-ping costs a round-trip per checkout; recycle + disconnect invalidation usually suffice
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_CONNECT_TIMEOUT: int = 10
+
+    # Optional read replica for GET endpoints (same format as database_url, e.g. postgresql://user:pw@host:5432/db)
+    DATABASE_READ_URL: str = ""
+    # After a client writes, its reads go to the primary for this long (covers replication lag)
+    DATABASE_READ_STICKY_SECONDS: int = 5
+
+    # Query instrumentation (per-request query count / DB time, Server-Timing header)
+    SLOW_QUERY_MS: int = 200  # Statements slower than this are logged individually
+    QUERY_COUNT_WARN: int = 30  # Requests issuing more queries than this are logged (likely N+1)
+
     # CORS configuration
     # In Azure, set CORS_ORIGINS as comma-separated URLs (e.g., "https://app1.com,https://app2.com")
     # Can also be set as a list in .env file
@@ -51,15 +72,52 @@ class Settings(BaseSettings):
     AZURE_STORAGE_CONTAINER_NAME: str = ""  # Default container name for PDFs
     AZURE_STORAGE_USER_MEDIA_CONTAINER_NAME: str = ""  # Container name for user media assets
 
+    # Image renditions (thumbnail / platform-optimized variants of uploaded media)
+    RENDITION_WORKERS: int = 2  # Size of the thread pool that resizes/encodes images
+
     # Azure OpenAI configuration
     AZURE_OPENAI_ENDPOINT: str = ""
     AZURE_OPENAI_API_KEY: str = ""  # Must be set via environment variable
     AZURE_OPENAI_API_VERSION: str = ""
     AZURE_OPENAI_DEPLOYMENT: str = ""
     AZURE_OPENAI_MODEL_NAME: str = ""
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT: str = ""  # Enables near-duplicate matching in the generation cache
+
+    # /ai/generate response cache
+    AI_CACHE_MAX_ENTRIES: int = 1000  # LRU bound (0 disables the cache)
+    AI_CACHE_TTL_SECONDS: int = 3600
+    AI_CACHE_SIMILARITY: float = 0.97  # Minimum cosine similarity for a near-duplicate prompt to hit
+    AI_CACHE_SIMILAR_SCAN_MAX: int = 500  # Most recent prompts compared per near-duplicate lookup
+    AI_GENERATE_BATCH_CONCURRENCY: int = 8  # /ai/generate/batch calls in flight at once (all requests)
+
+    # AI API clients (Anthropic and Azure OpenAI)
+    AI_TIMEOUT_SECONDS: float = 60.0  # Per-request timeout
+    AI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_MAX_RETRIES: int = 2  # SDK retries on connection errors, 429 and 5xx (with backoff)
+
+    # LLM rate governor (services/llm_governor.py): limits per instance, 0 disables a limit
+    ANTHROPIC_RPM: int = 0
+    ANTHROPIC_TPM: int = 0  # Input + output tokens (cache reads excluded)
+    ANTHROPIC_MAX_CONCURRENCY: int = 16  # Calls in flight at once
+    AZURE_OPENAI_RPM: int = 0
+    AZURE_OPENAI_TPM: int = 0
+    AZURE_OPENAI_MAX_CONCURRENCY: int = 16
+    AI_TENANT_RPM: int = 0  # Per user / client address, for each provider
+    AI_TENANT_TPM: int = 0
+    AI_TENANT_CONCURRENCY: int = 8
+    AI_QUEUE_TIMEOUT_SECONDS: float = 30.0  # Longest a request waits for a slot before a 429 (jobs wait as long as needed)
 
     # Anthropic (Demo module — review reply generation)
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_BASE_URL: str = ""  # Override the API endpoint (e.g. a local fake server); empty uses the default
+    AUTO_REPLY_CONCURRENCY: int = 5  # Replies generated at once for one engagement
+
+    # Background jobs (bulk review sync / auto-reply)
+    JOB_WORKER_ENABLED: bool = True  # Run the in-process worker; the Functions timer also drains the queue
+    JOB_POLL_SECONDS: int = 2  # Idle worker re-checks the queue this often
+    JOB_STALE_SECONDS: int = 300  # Running jobs without a heartbeat for this long are picked up again
+    JOB_TIMER_MAX_SECONDS: int = 480  # Time budget of one timer run (under the Functions timeout)
+    AI_BATCH_POLL_SECONDS: int = 60  # How often a batch auto-reply job checks its Message Batch
 
     @property
     def database_url(self) -> str:
@@ -68,6 +126,20 @@ class Settings(BaseSettings):
             f"@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}"
+            f"@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+        )
+
+    @property
+    def async_read_database_url(self) -> str:
+        if not self.DATABASE_READ_URL:
+            return ""
+        scheme, _, rest = self.DATABASE_READ_URL.partition("://")
+        return f"postgresql+asyncpg://{rest}"
+
     class Config:
         env_file = ".env"
 
@@ -1,12 +1,235 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from .config import settings
+from .query_stats import instrument_engine
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counters for connection pool usage, exposed via /healthz/db-pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin:
+    """Records how long checkouts wait for a connection"""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = pool_metrics
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+def _pool_options(poolclass) -> dict:
+    if settings.DATABASE_POOL_MODE == "null":
+        # PgBouncer owns pooling; hold a server connection only for the duration of a session
+        return {"poolclass": NullPool}
+    return dict(
+        poolclass=poolclass,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        # Reuse the most recent connection so surplus ones go idle and get recycled
+        pool_use_lifo=True,
+    )
+
+
+def _async_connect_args() -> dict:
+    connect_args = {"timeout": settings.DATABASE_CONNECT_TIMEOUT}
+    if settings.DATABASE_POOL_MODE == "null":
+        # Prepared statements don't survive PgBouncer transaction pooling
+        connect_args["statement_cache_size"] = 0
+    return connect_args
+
+
+engine = create_engine(
+    settings.database_url,
+    connect_args={"connect_timeout": settings.DATABASE_CONNECT_TIMEOUT},
+    **_pool_options(InstrumentedQueuePool),
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# asyncpg engine for async request handlers
+async_engine = create_async_engine(
+    settings.async_database_url,
+    connect_args=_async_connect_args(),
+    **_pool_options(InstrumentedAsyncQueuePool),
+)
+# Objects stay usable after commit; lazy loads are not available, so load relationships eagerly
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Optional read replica. Without one, read sessions simply use the primary.
+read_engine = None
+async_read_engine = None
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        connect_args={"connect_timeout": settings.DATABASE_CONNECT_TIMEOUT},
+        **_pool_options(QueuePool),
+    )
+    async_read_engine = create_async_engine(
+        settings.async_read_database_url,
+        connect_args=_async_connect_args(),
+        **_pool_options(AsyncAdaptedQueuePool),
+    )
+
+for _engine in (engine, async_engine.sync_engine, read_engine, async_read_engine and async_read_engine.sync_engine):
+    if _engine is not None:
+        instrument_engine(_engine)
+
+
+class ReadRoutingSession(Session):
+    """
+    Session for read endpoints: queries go to the replica unless the session is
+    pinned to the primary (recent write by the client) or has already flushed a write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if read_engine is None or self._flushing or self.info.get("read_primary") or self.info.get("wrote"):
+            return engine
+        return read_engine
+
+
+class AsyncReadRoutingSession(Session):
+    """Sync half of the async read session; same routing rules as ReadRoutingSession"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if async_read_engine is None or self._flushing or self.info.get("read_primary") or self.info.get("wrote"):
+            return async_engine.sync_engine
+        return async_read_engine.sync_engine
+
+
+@event.listens_for(ReadRoutingSession, "after_flush")
+@event.listens_for(AsyncReadRoutingSession, "after_flush")
+def _stick_to_primary_after_write(session, flush_context):
+    # Read-your-writes within the session: everything after a write is served by the primary
+    session.info["wrote"] = True
+
+
+ReadSessionLocal = sessionmaker(class_=ReadRoutingSession, autoflush=False, autocommit=False)
+AsyncReadSessionLocal = async_sessionmaker(sync_session_class=AsyncReadRoutingSession, autoflush=False, expire_on_commit=False)
+
+
+class RecentWriters:
+    """
+    Clients that wrote within the sticky window, so their next reads see their own writes.
+    Kept per process; a client is identified by a hash of its bearer token (or its address).
+    """
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._until: Dict[str, float] = {}
+
+    def record_write(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.window_seconds
+            if len(self._until) > 10000:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+
+    def recently_wrote(self, key: str) -> bool:
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentWriters(settings.DATABASE_READ_STICKY_SECONDS)
+
+
+def client_key(request: Request) -> str:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return request.client.host if request.client else ""
+
+
+def _pool_snapshot(pool, metrics: Optional[PoolMetrics] = None) -> dict:
+    snapshot = {}
+    if metrics is not None:
+        snapshot.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            avg_wait_ms=round(metrics.total_wait_seconds / metrics.checkouts * 1000, 3) if metrics.checkouts else 0.0,
+            max_wait_ms=round(metrics.max_wait_seconds * 1000, 3),
+        )
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return snapshot
+
+def get_pool_metrics() -> dict:
+    """Snapshot of the connection pools' state and checkout wait statistics"""
+    metrics = {
+        "mode": settings.DATABASE_POOL_MODE,
+        "sync": _pool_snapshot(engine.pool, pool_metrics),
+        "async": _pool_snapshot(async_engine.pool, async_pool_metrics),
+    }
+    if read_engine is not None:
+        metrics["read_sync"] = _pool_snapshot(read_engine.pool)
+        metrics["read_async"] = _pool_snapshot(async_read_engine.pool)
+    return metrics
+
+async def dispose_engines():
+    """Close the pooled connections of every engine (primary and replica, sync and async) on shutdown"""
+    for sync_engine in (engine, read_engine):
+        if sync_engine is not None:
+            # Closing connections blocks; keep it off the event loop
+            await asyncio.to_thread(sync_engine.dispose)
+    for an_async_engine in (async_engine, async_read_engine):
+        if an_async_engine is not None:
+            await an_async_engine.dispose()
+
 class Base(DeclarativeBase):
     pass
 
@@ -16,3 +239,26 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(request: Request):
+    """Session for GET endpoints; served by the read replica when one is configured"""
+    db = ReadSessionLocal(info={"read_primary": getattr(request.state, "read_primary", False)})
+    try:
+        yield db
+    finally:
+        if db.info.get("wrote"):
+            request.state.wrote = True
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """Async counterpart of get_read_db"""
+    async with AsyncReadSessionLocal(info={"read_primary": getattr(request.state, "read_primary", False)}) as db:
+        try:
+            yield db
+        finally:
+            if db.info.get("wrote"):
+                request.state.wrote = True
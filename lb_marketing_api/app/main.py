@@ -1,18 +1,26 @@
 
+import asyncio
 import logging
+import math
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from .config import settings
-from .db import Base, engine, get_db, SessionLocal
+from .db import Base, client_key, dispose_engines, engine, get_db, get_pool_metrics, recent_writers, SessionLocal
 from . import models
+from . import query_stats
 from .auth import get_current_user
-from .routers import businesses, locations, social_profiles, campaigns, assets, posts, oauth, auth, pdfs, ai
+from .services.storage import storage_service
+from .services.ai_clients import ai_clients
+from .services.llm_governor import GovernorBusy, governor
+from .services.jobs import worker_loop
+from .routers import businesses, locations, social_profiles, campaigns, assets, posts, oauth, auth, pdfs, ai, jobs
 from .routers.demo import engagements as demo_engagements
 from .routers.demo import tasks as demo_tasks
 from .routers.demo import audit as demo_audit
@@ -55,13 +63,33 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Development seed (test user) skipped: {e}")
     
+    # Verify blob containers in the background so startup doesn't wait on Azure Storage
+    storage_warmup = asyncio.create_task(asyncio.to_thread(storage_service.ensure_containers))
+    
+    # AI API clients live for the whole app so their connection pool is reused
+    ai_clients.start()
+    
+    # Background job worker (bulk review sync / auto-reply)
+    worker_stop = asyncio.Event()
+    worker = asyncio.create_task(worker_loop(worker_stop)) if settings.JOB_WORKER_ENABLED else None
+    
     yield  # Application runs here
     
+    if not storage_warmup.done():
+        storage_warmup.cancel()
+    if worker is not None:
+        # An interrupted job is picked up again once its heartbeat goes stale
+        worker_stop.set()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+    await ai_clients.close()
+    await dispose_engines()
+    
     # Shutdown code (if needed)
     logger.info("Application shutting down")
 
 
-app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS
 app.add_middleware(
@@ -70,12 +98,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Pin a client's reads to the primary for a short window after it writes"""
+    key = client_key(request)
+    request.state.read_primary = recent_writers.recently_wrote(key)
+    response = await call_next(request)
+    wrote = request.method not in ("GET", "HEAD", "OPTIONS") or getattr(request.state, "wrote", False)
+    if wrote and response.status_code < 400:
+        recent_writers.record_write(key)
+    return response
+
+@app.middleware("http")
+async def query_instrumentation(request: Request, call_next):
+    """Per-request query count and DB time, reported as Server-Timing and logged when excessive"""
+    stats = query_stats.start_request()
+    response = await call_next(request)
+    response.headers.append("Server-Timing", stats.server_timing())
+    query_stats.log_request(request.method, request.url.path, response.status_code, stats)
+    return response
+
+@app.exception_handler(GovernorBusy)
+async def governor_busy(request: Request, exc: GovernorBusy):
+    """An LLM call that couldn't get a rate-governor slot in time: ask the client to retry later"""
+    logger.warning(f"{request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(
+        {"detail": str(exc)},
+        status_code=429,
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok", "env": settings.APP_ENV}
 
+@app.get("/healthz/db-pool")
+def healthz_db_pool():
+    return get_pool_metrics()
+
+@app.get("/healthz/db-queries")
+def healthz_db_queries():
+    return query_stats.query_totals.snapshot()
+
+@app.get("/healthz/ai-governor")
+def healthz_ai_governor():
+    return governor.snapshot()
+
 @app.post("/seed")
 def seed(db: Session = Depends(get_db)):
     # Simple seed example
@@ -184,6 +255,7 @@ app.include_router(posts.router)
 app.include_router(oauth.router)
 app.include_router(pdfs.router)
 app.include_router(ai.router)
+app.include_router(jobs.router)
 app.include_router(demo_engagements.router)
 app.include_router(demo_tasks.router)
 app.include_router(demo_audit.router)
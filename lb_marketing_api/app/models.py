@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from sqlalchemy import (
     Column, Integer, String, DateTime, ForeignKey, Text, Enum as SAEnum, UniqueConstraint,
-    Boolean, Numeric
+    Boolean, Numeric, Index, JSON, text
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from passlib.hash import argon2
@@ -50,6 +50,7 @@ class User(Base):
 
 class Business(Base):
     __tablename__ = "businesses"
+    __table_args__ = (Index("ix_businesses_user_id", "user_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -69,6 +70,7 @@ class Business(Base):
 
 class Location(Base):
     __tablename__ = "locations"
+    __table_args__ = (Index("ix_locations_business_id", "business_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id", ondelete="CASCADE"))
@@ -85,7 +87,12 @@ class Location(Base):
 
 class SocialProfile(Base):
     __tablename__ = "social_profiles"
-    __table_args__ = (UniqueConstraint("user_id", "platform", "handle", name="uq_profile_user_platform_handle"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "platform", "handle", name="uq_profile_user_platform_handle"),
+        # Connected-profile lookups when publishing and on status checks
+        Index("ix_social_profiles_user_platform_status", "user_id", "platform", "status"),
+        Index("ix_social_profiles_business_id", "business_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -102,6 +109,7 @@ class SocialProfile(Base):
 
 class Campaign(Base):
     __tablename__ = "campaigns"
+    __table_args__ = (Index("ix_campaigns_business_id", "business_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id", ondelete="CASCADE"))
@@ -114,21 +122,68 @@ class Campaign(Base):
     business = relationship("Business", back_populates="campaigns")
     posts = relationship("ScheduledPost", back_populates="campaign")
 
+class MediaBlob(Base):
+    """A stored media file, addressed by the SHA-256 of its business and content and shared by that business's MediaAssets."""
+    __tablename__ = "media_blobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)  # hex SHA-256 of business id + content
+    storage_url: Mapped[str] = mapped_column(Text, nullable=False)
+    mime_type: Mapped[str | None] = mapped_column(String(100))
+    byte_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)  # MediaAssets pointing at this blob
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    assets = relationship("MediaAsset", back_populates="blob")
+
 class MediaAsset(Base):
     __tablename__ = "media_assets"
+    # Serves GET /assets: keyset scan per business, mime_type filtered from the index
+    __table_args__ = (
+        Index("ix_media_assets_business_id_id", "business_id", "id", postgresql_include=["mime_type"]),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id", ondelete="CASCADE"))
     title: Mapped[str | None] = mapped_column(String(255))
     storage_url: Mapped[str] = mapped_column(Text)  # could be CDN or blob key/URL
     mime_type: Mapped[str | None] = mapped_column(String(100))
+    # Set for uploads stored content-addressed (key scoped to the business); NULL for legacy/external assets
+    content_hash: Mapped[str | None] = mapped_column(ForeignKey("media_blobs.content_hash"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     business = relationship("Business", back_populates="assets")
+    blob = relationship("MediaBlob", back_populates="assets")
     posts = relationship("ScheduledPost", back_populates="media_asset")
+    renditions = relationship("MediaRendition", back_populates="media_asset", cascade="all, delete-orphan")
+
+class MediaRendition(Base):
+    __tablename__ = "media_renditions"
+    __table_args__ = (UniqueConstraint("media_asset_id", "name", name="uq_rendition_asset_name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    media_asset_id: Mapped[int] = mapped_column(ForeignKey("media_assets.id", ondelete="CASCADE"), nullable=False)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)  # 'thumbnail', 'x', 'tiktok_cover'
+    storage_url: Mapped[str] = mapped_column(Text, nullable=False)
+    mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    byte_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    media_asset = relationship("MediaAsset", back_populates="renditions")
 
 class ScheduledPost(Base):
     __tablename__ = "scheduled_posts"
+    __table_args__ = (
+        # GET /posts: a user's posts by scheduled_at
+        Index("ix_scheduled_posts_user_id_scheduled_at", "user_id", "scheduled_at"),
+        # Publisher polling: only rows still waiting to go out
+        Index("ix_scheduled_posts_due", "scheduled_at", postgresql_where=text("status = 'scheduled'")),
+        Index("ix_scheduled_posts_business_id", "business_id"),
+        Index("ix_scheduled_posts_campaign_id", "campaign_id"),
+        Index("ix_scheduled_posts_media_asset_id", "media_asset_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -149,6 +204,10 @@ class ScheduledPost(Base):
 
 class OAuthState(Base):
     __tablename__ = "oauth_states"
+    __table_args__ = (
+        Index("ix_oauth_states_user_id", "user_id"),
+        Index("ix_oauth_states_business_id", "business_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     state: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -162,6 +221,11 @@ class OAuthState(Base):
 
 class ClientEngagement(Base):
     __tablename__ = "client_engagements"
+    __table_args__ = (
+        # GET /demo/engagements: a user's engagements, newest first
+        Index("ix_client_engagements_user_id_created_at", "user_id", "created_at"),
+        Index("ix_client_engagements_business_id", "business_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -242,6 +306,14 @@ class AuditReport(Base):
 
 class ReviewRecord(Base):
     __tablename__ = "review_records"
+    __table_args__ = (
+        # One record per GBP review; review sync upserts against this
+        UniqueConstraint("engagement_id", "gbp_review_id", name="uq_review_record_engagement_gbp_review"),
+        # Review list, newest first
+        Index("ix_review_records_engagement_published", "engagement_id", "review_published_at"),
+        # Auto-reply picks only unanswered reviews
+        Index("ix_review_records_unanswered", "engagement_id", postgresql_where=text("has_reply = false")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     engagement_id: Mapped[int] = mapped_column(ForeignKey("client_engagements.id", ondelete="CASCADE"), nullable=False)
@@ -284,3 +356,57 @@ class MonthEndReport(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     engagement = relationship("ClientEngagement", back_populates="month_end_report")
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    canceled = "canceled"
+
+
+class Job(Base):
+    """Long-running bulk operation (review sync, auto-reply) executed by the job worker"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Worker polling: oldest queued / running jobs first
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_user_id", "user_id"),
+        Index("ix_jobs_engagement_id", "engagement_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    engagement_id: Mapped[int | None] = mapped_column(ForeignKey("client_engagements.id", ondelete="CASCADE"))
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[JobStatus] = mapped_column(SAEnum(JobStatus), default=JobStatus.queued, nullable=False)
+    params: Mapped[dict | None] = mapped_column(JSON)
+    progress_total: Mapped[int | None] = mapped_column(Integer)
+    progress_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSON)
+    # Handler checkpoint kept across runs of a deferred job (e.g. the id of a submitted Message Batch)
+    state: Mapped[dict | None] = mapped_column(JSON)
+    # A deferred job is not claimed again before this time
+    run_after: Mapped[datetime | None] = mapped_column(DateTime)
+    error: Mapped[str | None] = mapped_column(Text)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    results = relationship("JobResult", back_populates="job", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class JobResult(Base):
+    """Per-item outcome of a job (e.g. one reviewed reply), in the order it was produced"""
+    __tablename__ = "job_results"
+    __table_args__ = (Index("ix_job_results_job_id_id", "job_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    job = relationship("Job", back_populates="results")
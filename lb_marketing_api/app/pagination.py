@@ -0,0 +1,102 @@
+"""
+Keyset pagination shared by the list endpoints.
+
+Lists are ordered by one or more columns, newest first, with the primary key as the last
+(tie-breaking) column. A page resumes strictly after the last row of the previous one, so
+every page is an index range scan whatever the page number. The response body stays a JSON
+array; the opaque cursor for the next page is returned in the X-Next-Cursor header.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    keys = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps({"k": keys}).encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor.encode()))["k"]
+        if len(keys) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        values = []
+        for column, key in zip(columns, keys):
+            if key is not None and column.type.python_type is datetime:
+                key = datetime.fromisoformat(key)
+            elif key is not None:
+                key = column.type.python_type(key)
+            values.append(key)
+        return values
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _is_nullable(column) -> bool:
+    return getattr(column.expression, "nullable", True)
+
+
+class Pagination:
+    """Cursor and page size of a list request (see get_pagination)"""
+
+    def __init__(self, response: Response, cursor: Optional[str], limit: int):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+        self.next_cursor: Optional[str] = None
+        self._columns: Sequence[Any] = ()
+
+    def apply(self, query, *columns):
+        """
+        Order query (a Select or a legacy Query) by columns, descending, resume after the
+        cursor and fetch one extra row to detect a next page. The last column must be unique.
+        Nullable columns sort NULLs first, matching a backward scan of an ascending index.
+        """
+        self._columns = columns
+        if self.cursor:
+            query = query.filter(self._after(decode_cursor(self.cursor, columns)))
+        order = [c.desc().nulls_first() if _is_nullable(c) else c.desc() for c in columns]
+        return query.order_by(*order).limit(self.limit + 1)
+
+    def _after(self, values):
+        """Rows that come strictly after values in the (descending, NULLs first) ordering"""
+        clauses = []
+        for i, (column, value) in enumerate(zip(self._columns, values)):
+            equal = [c.is_(None) if v is None else c == v for c, v in zip(self._columns[:i], values[:i])]
+            if value is None:
+                beyond = column.is_not(None)
+            else:
+                beyond = column < value
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def rows(self, rows: Sequence[Any]) -> List[Any]:
+        """Trim the extra row and set X-Next-Cursor when there is a next page"""
+        rows = list(rows)
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            self.next_cursor = encode_cursor([getattr(last, c.key) for c in self._columns])
+            self.response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        return rows
+
+    def headers(self) -> dict:
+        """Headers for endpoints that return their own Response object"""
+        return {NEXT_CURSOR_HEADER: self.next_cursor} if self.next_cursor else {}
+
+
+def get_pagination(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+) -> Pagination:
+    return Pagination(response, cursor, limit)
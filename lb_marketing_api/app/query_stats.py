@@ -0,0 +1,178 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor-execute hooks on every engine record the query count, total DB time and the
+slowest statements for the request being served. The middleware in main.py turns
+that into a Server-Timing header and a log line; process-wide totals are exposed
+via /healthz/db-queries.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_KEPT = 3
+STATEMENT_LOG_CHARS = 500
+
+
+class QueryStats:
+    """Queries issued while serving one request (or inside one count_queries block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+
+    def record(self, seconds: float, statement: str):
+        self.count += 1
+        self.total_seconds += seconds
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+class QueryTotals:
+    """Process-wide counters, exposed via /healthz/db-queries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.slow_queries = 0
+        self.total_seconds = 0.0
+        self.requests = 0
+        self.request_queries = 0
+        self.max_queries_per_request = 0
+
+    def record_query(self, seconds: float, slow: bool):
+        with self._lock:
+            self.queries += 1
+            self.total_seconds += seconds
+            if slow:
+                self.slow_queries += 1
+
+    def record_request(self, stats: QueryStats):
+        with self._lock:
+            self.requests += 1
+            self.request_queries += stats.count
+            self.max_queries_per_request = max(self.max_queries_per_request, stats.count)
+
+    def snapshot(self) -> dict:
+        return {
+            "queries": self.queries,
+            "slow_queries": self.slow_queries,
+            "total_db_ms": round(self.total_seconds * 1000, 3),
+            "requests": self.requests,
+            "avg_queries_per_request": round(self.request_queries / self.requests, 2) if self.requests else 0.0,
+            "max_queries_per_request": self.max_queries_per_request,
+            "slow_query_ms": settings.SLOW_QUERY_MS,
+        }
+
+
+query_totals = QueryTotals()
+
+# Sync handlers run in a threadpool with a copy of the request's context, so they
+# see (and mutate) the same QueryStats object the middleware installed.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# count_queries blocks; these see every query in the process, whichever thread serves it
+_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+
+# The start time is kept on the statement's execution context, so a statement that fails
+# (no after_cursor_execute) leaves nothing behind on the pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_stats_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    slow = elapsed * 1000 >= settings.SLOW_QUERY_MS
+    query_totals.record_query(elapsed, slow)
+    if slow:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement[:STATEMENT_LOG_CHARS]}")
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(elapsed, statement)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.record(elapsed, statement)
+
+
+def instrument_engine(sync_engine):
+    """Attach the timing hooks to an Engine (pass AsyncEngine.sync_engine for async engines)"""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def start_request() -> QueryStats:
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def log_request(method: str, path: str, status_code: int, stats: QueryStats):
+    """Structured per-request summary; promoted to a warning for slow or chatty requests"""
+    query_totals.record_request(stats)
+    noisy = stats.count > settings.QUERY_COUNT_WARN or any(
+        seconds * 1000 >= settings.SLOW_QUERY_MS for seconds, _ in stats.slowest
+    )
+    if not noisy and not logger.isEnabledFor(logging.DEBUG):
+        return
+    slowest = "; ".join(
+        f"{seconds * 1000:.1f}ms {statement[:120]!r}" for seconds, statement in stats.slowest
+    )
+    message = (
+        f"db_stats method={method} path={path} status={status_code} "
+        f"queries={stats.count} db_ms={stats.total_ms:.1f} slowest=[{slowest}]"
+    )
+    if noisy:
+        logger.warning(message)
+    else:
+        logger.debug(message)
+
+
+@contextmanager
+def count_queries(max_queries: Optional[int] = None):
+    """
+    Count every query issued while the block runs, e.g. to hold an endpoint to a query budget:
+
+        with count_queries(max_queries=3):
+            client.get("/demo/engagements", headers=headers)
+
+    Raises AssertionError when the budget is exceeded.
+    """
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+    if max_queries is not None and stats.count > max_queries:
+        statements = "\n".join(statement for _, statement in stats.slowest)
+        raise AssertionError(
+            f"{stats.count} queries issued, budget is {max_queries}. Slowest:\n{statements}"
+        )
@@ -0,0 +1,44 @@
+"""
+Fast JSON responses for list endpoints.
+
+Returning ORM objects with a response_model makes FastAPI validate them, dump the result to
+Python dicts and then encode those with the response class. model_list_response validates
+once and lets pydantic-core write the JSON bytes directly. Rows can be ORM entities or
+projected Row tuples (select(*columns)), which skips building ORM objects altogether.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def model_list_response(
+    rows: Sequence[Any],
+    schema: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """JSON array of rows serialized through schema (keep response_model on the route for the docs)"""
+    adapter = _list_adapter(schema)
+    items = adapter.validate_python(rows, from_attributes=True)
+    return Response(adapter.dump_json(items), media_type="application/json", headers=headers)
+
+
+def schema_columns(model, schema: Type[BaseModel], **expressions) -> list:
+    """
+    Columns of model that schema outputs, for select(*columns) / query(*columns) projections.
+    expressions supply fields that aren't columns of model (joined or computed), by field name.
+    """
+    table_columns = model.__table__.columns
+    columns = []
+    for name in schema.model_fields:
+        if name in expressions:
+            columns.append(expressions[name].label(name))
+        elif name in table_columns:
+            columns.append(getattr(model, name))
+    return columns
@@ -1,33 +1,72 @@
 """
 AI generation endpoints.
 Handles requests to external AI services using Azure OpenAI.
+Responses are cached by prompt (see services/ai_cache.py); send "cache": "bypass" to regenerate.
+Model calls go through the LLM rate governor (services/llm_governor.py), one tenant per client address.
+Output is sized and fitted to the target platform (see services/generation_profiles.py).
 """
 
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Any, Dict
-from openai import AzureOpenAI
+import math
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from openai import AsyncAzureOpenAI
 
+from .. import schemas
 from ..config import settings
+from ..services.ai_cache import CacheKey, cache_key, generation_cache, normalize_prompt
+from ..services.ai_clients import ai_clients
+from ..services.generation_profiles import clean_post, get_profile, needs_reask, trim_post
+from ..services.llm_governor import GovernorBusy, Slot, estimate_tokens, governor
+from ..sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 
+def _tenant(request: Request) -> str:
+    """
+    Governor tenant for a request. These routes don't authenticate, so an Authorization
+    header is just a string the caller picks; only the client address is used.
+    """
+    return f"client:{request.client.host if request.client else ''}"
+
+
 class GenerateRequest(BaseModel):
     """Request model for AI generation endpoint."""
     text: str
     tone: str
+    # Sizes the post and its token budget for the platform; None uses a general default
+    platform: Optional[schemas.PlatformEnum] = None
+    # "bypass" always calls the model (explicit regenerate); the new response replaces the cached one
+    cache: Literal["use", "bypass"] = "use"
+
+
+GENERATE_BATCH_MAX_ITEMS = 100
+
+
+class GenerateBatchItem(BaseModel):
+    text: str
+    tone: str
+    platform: Optional[schemas.PlatformEnum] = None
+
+
+class GenerateBatchRequest(BaseModel):
+    """Request model for the batch generation endpoint."""
+    items: List[GenerateBatchItem] = Field(..., min_length=1, max_length=GENERATE_BATCH_MAX_ITEMS)
+    n: int = Field(1, ge=1, le=5, description="Variants to generate per item")
+    cache: Literal["use", "bypass"] = "use"
 
 
-def get_azure_openai_client() -> AzureOpenAI:
+def get_azure_openai_client() -> AsyncAzureOpenAI:
     """
-    Create and return an Azure OpenAI client instance.
+    Return the app-lifetime Azure OpenAI client (shared connection pool, see services/ai_clients.py).
     
     Returns:
-        AzureOpenAI client instance
+        AsyncAzureOpenAI client instance
         
     Raises:
         HTTPException: If API key is not configured
@@ -38,15 +77,224 @@ def get_azure_openai_client() -> AzureOpenAI:
             detail="Azure OpenAI API key is not configured"
         )
     
-    return AzureOpenAI(
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-        api_key=settings.AZURE_OPENAI_API_KEY,
+    return ai_clients.get_azure_openai()
+
+
+def _messages(payload: GenerateRequest) -> List[Dict[str, str]]:
+    profile = get_profile(payload.platform)
+    platform = f" for {payload.platform.value}" if payload.platform else ""
+    return [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that generates social media posts for a business. You will take in text and a descriptive word for tone and generate a text post for social media."
+            f" Write one post{platform} of {profile.length_hint}, and output only the post text.",
+        },
+        {
+            "role": "user",
+            "content": payload.text + " use the following tone: " + payload.tone,
+        },
+    ]
+
+
+# Sampling parameters shared by every profile; the token cap, temperature and stop sequences
+# come from the platform's generation profile
+SAMPLING_PARAMS: Dict[str, Any] = dict(
+    top_p=1.0,
+    frequency_penalty=0.0,
+    presence_penalty=0.0,
+)
+
+
+def _completion_params(payload: GenerateRequest, n: int = 1) -> Dict[str, Any]:
+    params = {**SAMPLING_PARAMS, **get_profile(payload.platform).completion_params()}
+    if n > 1:
+        params["n"] = n
+    return params
+
+
+def _add_usage(usage: Dict[str, int] | None, other: Dict[str, int] | None) -> Dict[str, int] | None:
+    if usage is None or other is None:
+        return usage or other
+    return {name: usage[name] + other[name] for name in usage}
+
+
+def _usage(usage) -> Dict[str, int] | None:
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    } if usage else None
+
+
+def _api_error(e: Exception) -> HTTPException:
+    """Map an exception from the Azure OpenAI call to the HTTPException to return"""
+    if isinstance(e, GovernorBusy):
+        logger.warning(str(e))
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    # Check if it's an OpenAI API error
+    error_type = type(e).__name__
+    if "OpenAI" in error_type or "API" in error_type or hasattr(e, "status_code"):
+        logger.error(f"Azure OpenAI API error: {str(e)}")
+        status_code = getattr(e, "status_code", 502)
+        return HTTPException(
+            status_code=status_code if 400 <= status_code < 600 else 502,
+            detail=f"Azure OpenAI API error: {str(e)}"
+        )
+    logger.error(f"Unexpected error in AI generation: {str(e)}", exc_info=True)
+    return HTTPException(
+        status_code=500,
+        detail=f"Internal server error: {str(e)}"
     )
 
 
+async def _embed(client: AsyncAzureOpenAI, text: str) -> Optional[List[float]]:
+    """Prompt embedding for near-duplicate cache matching (None when no embedding deployment is set)"""
+    if not settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT:
+        return None
+    try:
+        response = await client.embeddings.create(
+            input=normalize_prompt(text),
+            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+        )
+        return response.data[0].embedding
+    except Exception as e:
+        # Matching is an optimization; generate as if there were no similar prompt
+        logger.warning(f"Prompt embedding failed: {str(e)}")
+        return None
+
+
+async def _cache_lookup(
+    client: AsyncAzureOpenAI,
+    payload: GenerateRequest,
+    params: Dict[str, Any],
+) -> Tuple[CacheKey, Optional[Dict[str, Any]], Optional[List[float]]]:
+    """(key, cached response or None, prompt embedding to store with a new response)"""
+    key = cache_key(payload.text, payload.tone, settings.AZURE_OPENAI_DEPLOYMENT, {**params, "platform": payload.platform})
+    if payload.cache == "use":
+        cached = generation_cache.get(key)
+        if cached is not None:
+            return key, cached, None
+    embedding = await _embed(client, payload.text)
+    if payload.cache == "use" and embedding is not None:
+        cached = await generation_cache.get_similar(key, embedding, settings.AI_CACHE_SIMILARITY)
+        if cached is not None:
+            return key, cached, None
+    generation_cache.misses += 1
+    return key, None, embedding
+
+
+def _cached_response(cached: Dict[str, Any]) -> Dict[str, Any]:
+    # No tokens were spent on this request
+    return {**cached, "usage": None, "cached": True}
+
+
+def _slot(tenant: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Slot:
+    """Governor slot for one completion call (reserving the prompt plus every choice's max output)"""
+    prompt = "".join(message["content"] for message in messages)
+    tokens = estimate_tokens(prompt, params["max_completion_tokens"] * params.get("n", 1))
+    return governor.slot("azure_openai", tenant, tokens, settings.AI_QUEUE_TIMEOUT_SECONDS)
+
+
+async def _create(client: AsyncAzureOpenAI, tenant: str, messages: List[Dict[str, str]], params: Dict[str, Any]):
+    """Call the chat completions API within a governor slot"""
+    async with _slot(tenant, messages, params) as slot:
+        response = await client.chat.completions.create(
+            messages=messages,
+            model=settings.AZURE_OPENAI_DEPLOYMENT,
+            **params,
+        )
+        if response.usage:
+            slot.charge(response.usage.total_tokens)
+    return response
+
+
+async def _fit(
+    client: Optional[AsyncAzureOpenAI],
+    tenant: Optional[str],
+    payload: GenerateRequest,
+    text: str,
+    truncated: bool,
+) -> Tuple[str, Optional[str], Dict[str, int] | None]:
+    """
+    Fit a generated post to its platform's length limit.
+    
+    A post well over the limit is sent back once to be shortened (not when client is None,
+    as for streams whose text has already been sent); anything still over the limit, or cut
+    off by the token cap (truncated), is trimmed at a sentence or word boundary.
+    
+    Returns:
+        (post, fit, usage of the re-ask): fit is None when the post already fit,
+        otherwise "trimmed" or "shortened"
+    """
+    profile = get_profile(payload.platform)
+    post = clean_post(text)
+    fit = None
+    usage = None
+    if client is not None and needs_reask(post, profile):
+        messages = _messages(payload) + [
+            {"role": "assistant", "content": post},
+            {
+                "role": "user",
+                "content": f"That is {profile.length(post)} characters. Rewrite it in at most {profile.max_chars} characters.",
+            },
+        ]
+        try:
+            response = await _create(client, tenant, messages, _completion_params(payload))
+        except Exception as e:
+            # Trimming still gets the post within the limit
+            logger.warning(f"Re-asking for a shorter post failed: {str(e)}")
+        else:
+            usage = _usage(response.usage)
+            shortened = clean_post(response.choices[0].message.content or "")
+            if shortened:
+                post, fit = shortened, "shortened"
+                truncated = response.choices[0].finish_reason == "length"
+    trimmed = trim_post(post, profile, incomplete=truncated)
+    if trimmed != post:
+        post, fit = trimmed, fit or "trimmed"
+    return post, fit, usage
+
+
+async def _complete(client: AsyncAzureOpenAI, tenant: str, payload: GenerateRequest, n: int = 1) -> Dict[str, Any]:
+    """
+    Generate (or serve from the cache) the response to one request; raises on API errors.
+    With n > 1 the response also lists all n generated variants (one API call, prompt billed once).
+    """
+    params = _completion_params(payload, n)
+    key, cached, embedding = await _cache_lookup(client, payload, params)
+    if cached is not None:
+        logger.info("Serving /ai/generate from the response cache")
+        return _cached_response(cached)
+
+    response = await _create(client, tenant, _messages(payload), params)
+    logger.info("Azure OpenAI API call successful")
+
+    fitted = await asyncio.gather(*(
+        _fit(client, tenant, payload, choice.message.content or "", choice.finish_reason == "length")
+        for choice in response.choices
+    ))
+    usage = _usage(response.usage)
+    for _, _, reask_usage in fitted:
+        usage = _add_usage(usage, reask_usage)
+
+    result = {
+        "content": fitted[0][0],
+        "model": response.model,
+        "usage": usage,
+        "fit": fitted[0][1],
+    }
+    if n > 1:
+        result["variants"] = [post for post, _, _ in fitted]
+    generation_cache.put(key, result, embedding)
+    return {**result, "cached": False}
+
+
 @router.post("/generate")
-def generate(payload: GenerateRequest) -> Dict[str, Any]:
+async def generate(payload: GenerateRequest, request: Request) -> Dict[str, Any]:
     """
     Generate AI response based on input text using Azure OpenAI.
     
@@ -57,67 +305,146 @@ def generate(payload: GenerateRequest) -> Dict[str, Any]:
         Response from the AI model with the generated content
         
     Raises:
-        HTTPException: If the AI API call fails
+        HTTPException: If the AI API call fails (429 with Retry-After when the rate budget is exhausted)
     """
     try:
         logger.info(f"Calling Azure OpenAI with text: {payload.text[:100]}...")
         
-        # Create Azure OpenAI client
         client = get_azure_openai_client()
-        
-        # Call the chat completions API
-        response = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that generates social media posts for a business. You will take in text and a descriptive word for tone and generate a text post for social media.",
-                },
-                {
-                    "role": "user",
-                    "content": payload.text + " use the following tone: " + payload.tone,
-                }, 
-                
-            ],
-            max_completion_tokens=13107,
-            temperature=1.0,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0,
-            model=settings.AZURE_OPENAI_DEPLOYMENT
-        )
-        
-        # Extract the generated content
-        generated_content = response.choices[0].message.content
-        
-        logger.info("Azure OpenAI API call successful")
-        
-        return {
-            "content": generated_content,
-            "model": response.model,
-            "usage": {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            } if response.usage else None
-        }
+        return await _complete(client, _tenant(request), payload)
         
     except HTTPException:
         # Re-raise HTTP exceptions (e.g., missing API key)
         raise
     except Exception as e:
-        # Check if it's an OpenAI API error
-        error_type = type(e).__name__
-        if "OpenAI" in error_type or "API" in error_type or hasattr(e, "status_code"):
-            logger.error(f"Azure OpenAI API error: {str(e)}")
-            status_code = getattr(e, "status_code", 502)
-            raise HTTPException(
-                status_code=status_code if 400 <= status_code < 600 else 502,
-                detail=f"Azure OpenAI API error: {str(e)}"
-            )
-        else:
-            logger.error(f"Unexpected error in AI generation: {str(e)}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Internal server error: {str(e)}"
+        raise _api_error(e)
+
+
+@router.post("/generate/stream")
+async def generate_stream(payload: GenerateRequest, request: Request):
+    """
+    Same as /generate, streamed as server-sent events as the post is written.
+    
+    Events:
+        delta: {"text": ...} for each chunk of generated content
+        done: the /generate response body (content, model, usage, fit, cached) once generation finishes
+        error: {"status_code": ..., "detail": ...} if the call fails part-way
+    
+    A cached response is sent as one delta followed by done. A post over the platform's limit
+    is trimmed rather than re-asked, so done's content (not the joined deltas) is the post.
+    """
+    client = get_azure_openai_client()
+    params = _completion_params(payload)
+    key, cached, embedding = await _cache_lookup(client, payload, params)
+    if cached is not None:
+        async def cached_events():
+            yield sse_event("delta", {"text": cached["content"]})
+            yield sse_event("done", _cached_response(cached))
+        return sse_response(cached_events())
+
+    # The slot is held until the stream ends; released by events(), or by the response if it never starts
+    slot = _slot(_tenant(request), _messages(payload), params)
+    try:
+        # Waiting for the slot and opening the stream before responding lets immediate failures
+        # (including a full queue) return a normal error status
+        await slot.__aenter__()
+        try:
+            stream = await client.chat.completions.create(
+                messages=_messages(payload),
+                model=settings.AZURE_OPENAI_DEPLOYMENT,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params,
             )
+        except Exception as e:
+            await slot.__aexit__(type(e), e, e.__traceback__)
+            raise
+    except Exception as e:
+        raise _api_error(e)
+
+    async def events():
+        parts: List[str] = []
+        model = None
+        usage = None
+        truncated = False
+        try:
+            async for chunk in stream:
+                model = chunk.model or model
+                # The usage arrives in a final chunk without choices
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield sse_event("delta", {"text": chunk.choices[0].delta.content})
+                if chunk.choices and chunk.choices[0].finish_reason == "length":
+                    truncated = True
+        except Exception as e:
+            error = _api_error(e)
+            yield sse_event("error", {"status_code": error.status_code, "detail": error.detail})
+            return
+        finally:
+            if usage:
+                slot.charge(usage.total_tokens)
+            slot.release()
+        logger.info(f"Azure OpenAI streamed generation finished, usage: {_usage(usage)}")
+        post, fit, _ = await _fit(None, None, payload, "".join(parts), truncated)
+        result = {"content": post, "model": model, "usage": _usage(usage), "fit": fit}
+        generation_cache.put(key, result, embedding)
+        yield sse_event("done", {**result, "cached": False})
+
+    return sse_response(events(), on_close=slot.release)
+
+
+
+# Bounds how many batch items queue for the rate governor at once; created per event loop on first use
+_batch_limit: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+def _batch_semaphore() -> asyncio.Semaphore:
+    global _batch_limit
+    loop = asyncio.get_running_loop()
+    if _batch_limit is None or _batch_limit[0] is not loop:
+        _batch_limit = (loop, asyncio.Semaphore(settings.AI_GENERATE_BATCH_CONCURRENCY))
+    return _batch_limit[1]
+
+
+@router.post("/generate/batch")
+async def generate_batch(payload: GenerateBatchRequest, request: Request) -> Dict[str, Any]:
+    """
+    Generate posts for many (text, tone) items in one request.
+    
+    Items run concurrently (at most AI_GENERATE_BATCH_CONCURRENCY calls at once across all
+    batch requests, within the rate governor's limits) and go through the same response cache
+    as /generate.
+    
+    Returns:
+        results: one entry per item, in request order, with its variants or its error
+        succeeded / failed: item counts
+    """
+    client = get_azure_openai_client()
+    tenant = _tenant(request)
+    limit = _batch_semaphore()
+
+    async def run(index: int, item: GenerateBatchItem) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {"index": index, "text": item.text, "tone": item.tone, "platform": item.platform}
+        try:
+            async with limit:
+                result = await _complete(
+                    client, tenant,
+                    GenerateRequest(text=item.text, tone=item.tone, platform=item.platform, cache=payload.cache),
+                    payload.n,
+                )
+        except Exception as e:
+            return {**entry, "variants": [], "model": None, "usage": None, "cached": False, "error": _api_error(e).detail}
+        return {
+            **entry,
+            "variants": result.get("variants", [result["content"]]),
+            "model": result["model"],
+            "usage": result["usage"],
+            "cached": result["cached"],
+            "error": None,
+        }
 
+    results = await asyncio.gather(*(run(index, item) for index, item in enumerate(payload.items)))
+    failed = sum(1 for result in results if result["error"])
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
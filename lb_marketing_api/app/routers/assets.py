@@ -1,14 +1,19 @@
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from typing import List
-import uuid
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
+import hashlib
 import os
 
 from ..db import get_db
 from .. import models, schemas
 from ..auth import get_current_user
-from ..services.storage import storage_service
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
+from ..services.storage import storage_service, split_storage_url
+from ..services.renditions import RENDITION_SPECS, generate_renditions, get_or_create_rendition, select_rendition
 from ..config import settings
 
 router = APIRouter(prefix="/assets", tags=["assets"])
@@ -23,16 +28,22 @@ ALLOWED_MIME_TYPES = {
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 @router.post("/upload", response_model=schemas.MediaAssetOut, status_code=201)
 async def upload_media(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Upload media file to Azure Storage and create a MediaAsset record.
-    Files are stored in the user media container under folders organized by user ID.
-    Format: {container_name}/{userId}/{filename}
+    Files are stored content-addressed in the user media container, so identical
+    uploads to the same business share one blob and only add a MediaAsset row.
+    Format: {container_name}/sha256/{hash[:2]}/{hash}{ext}, where hash covers the
+    business id and the content (see _content_key)
+    Thumbnail and platform renditions are generated in the background after the response.
     """
     # Validate file type
     if file.content_type not in ALLOWED_MIME_TYPES:
@@ -65,59 +76,143 @@ async def upload_media(
         db.commit()
         db.refresh(business)
     
-    # Read file content
+    # Read file content, hashing it as it streams in
+    hasher = _content_key(business.id)
+    chunks = []
     try:
-        file_content = await file.read()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            chunks.append(chunk)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
+    file_content = b"".join(chunks)
+    content_hash = hasher.hexdigest()
     
-    # Generate unique filename to avoid collisions
-    # Use UUID + original extension
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    # Store in folder organized by user ID: {userId}/{filename}
-    blob_name = f"{current_user.id}/{unique_filename}"
-    
-    # Upload to Azure Storage
     if not storage_service.blob_service_client:
         raise HTTPException(
             status_code=503,
             detail="Azure Storage is not configured"
         )
     
-    # Get the user media container name from config
-    user_media_container = settings.AZURE_STORAGE_USER_MEDIA_CONTAINER_NAME
-    
-    # Upload the file to user media container (organized by user ID folders)
-    upload_success = storage_service.upload_blob(
-        blob_name=blob_name,
-        data=file_content,
-        content_type=file.content_type,
-        container_name=user_media_container
-    )
-    
-    if not upload_success:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to upload file to Azure Storage"
-        )
-    
-    # Get the storage URL (construct from blob name with container prefix)
-    # Store as: {container_name}/{userId}/{filename} for retrieval
-    storage_url = f"{user_media_container}/{blob_name}"
+    # Identical content is stored once per business; re-uploads only add a MediaAsset row
+    blob, is_duplicate = _acquire_blob(db, content_hash, file_content, file.content_type, file_ext)
     
     # Create MediaAsset record
     media_asset = models.MediaAsset(
         business_id=business.id,
         title=file.filename,
-        storage_url=storage_url,
-        mime_type=file.content_type
+        storage_url=blob.storage_url,
+        mime_type=file.content_type,
+        content_hash=content_hash
     )
     db.add(media_asset)
     db.commit()
     db.refresh(media_asset)
     
+    missing_renditions = list(RENDITION_SPECS)
+    if is_duplicate:
+        missing_renditions = _copy_sibling_renditions(db, media_asset)
+    if missing_renditions:
+        background_tasks.add_task(generate_renditions, media_asset.id, file_content, missing_renditions)
+    
     return media_asset
 
+def _content_key(business_id: int) -> "hashlib._Hash":
+    """
+    Hasher for the dedup key of an upload: SHA-256 of the business id and the content.
+    Keying by business keeps tenants from detecting each other's files through dedup and
+    gives each business its own blobs, so one tenant's deletes never touch another's media.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"business:{business_id}:".encode())
+    return hasher
+
+def _acquire_blob(
+    db: Session,
+    content_hash: str,
+    data: bytes,
+    content_type: str,
+    file_ext: str
+) -> Tuple[models.MediaBlob, bool]:
+    """
+    Take a reference on the MediaBlob for this content, uploading it first if it's new.
+    Returns (blob, is_duplicate). The reference count change is flushed, not committed.
+    """
+    for _ in range(2):
+        # Locks the row, so this waits for a delete_asset releasing the same content; once that
+        # commits the row is gone and its storage already deleted, so the content is uploaded anew
+        blob = db.query(models.MediaBlob).filter(
+            models.MediaBlob.content_hash == content_hash
+        ).with_for_update().first()
+        is_duplicate = blob is not None
+        
+        if not blob:
+            # Content-addressed layout: {container_name}/sha256/{first 2 hex chars}/{hash}{ext}
+            user_media_container = settings.AZURE_STORAGE_USER_MEDIA_CONTAINER_NAME
+            blob_name = f"sha256/{content_hash[:2]}/{content_hash}{file_ext}"
+            if not storage_service.upload_blob(
+                blob_name=blob_name,
+                data=data,
+                content_type=content_type,
+                container_name=user_media_container
+            ):
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to upload file to Azure Storage"
+                )
+            
+            blob = models.MediaBlob(
+                content_hash=content_hash,
+                storage_url=f"{user_media_container}/{blob_name}",
+                mime_type=content_type,
+                byte_size=len(data),
+                ref_count=0
+            )
+            db.add(blob)
+            try:
+                db.flush()
+            except IntegrityError:
+                # Same content uploaded concurrently; use the row the other request created
+                db.rollback()
+                continue
+        
+        # Atomic increment; 0 rows means the blob was released concurrently, so start over
+        updated = db.query(models.MediaBlob).filter(
+            models.MediaBlob.id == blob.id
+        ).update({models.MediaBlob.ref_count: models.MediaBlob.ref_count + 1}, synchronize_session=False)
+        if updated:
+            return blob, is_duplicate
+    
+    raise HTTPException(status_code=409, detail="Concurrent update of media content, please retry")
+
+def _copy_sibling_renditions(db: Session, media_asset: models.MediaAsset) -> List[str]:
+    """
+    Reuse renditions already generated for the same content.
+    Returns the rendition names that still need to be generated.
+    """
+    existing = db.query(models.MediaRendition).join(models.MediaAsset).filter(
+        models.MediaAsset.content_hash == media_asset.content_hash,
+        models.MediaAsset.id != media_asset.id
+    ).all()
+    
+    copied = set()
+    for rendition in existing:
+        if rendition.name in copied:
+            continue
+        db.add(models.MediaRendition(
+            media_asset_id=media_asset.id,
+            name=rendition.name,
+            storage_url=rendition.storage_url,
+            mime_type=rendition.mime_type,
+            width=rendition.width,
+            height=rendition.height,
+            byte_size=rendition.byte_size
+        ))
+        copied.add(rendition.name)
+    db.commit()
+    
+    return [name for name in RENDITION_SPECS if name not in copied]
+
 @router.post("", response_model=schemas.MediaAssetOut, status_code=201)
 def create_asset(payload: schemas.MediaAssetCreate, db: Session = Depends(get_db)):
     if not db.get(models.Business, payload.business_id):
@@ -129,5 +224,119 @@ def create_asset(payload: schemas.MediaAssetCreate, db: Session = Depends(get_db
     return obj
 
 @router.get("", response_model=List[schemas.MediaAssetOut])
-def list_assets(db: Session = Depends(get_db)):
-    return db.query(models.MediaAsset).order_by(models.MediaAsset.id.desc()).all()
+def list_assets(
+    business_id: Optional[int] = Query(None, description="Only assets of this business"),
+    mime_type: Optional[str] = Query(None, description="Only assets with this MIME type"),
+    page: Pagination = Depends(get_pagination),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List the current user's media assets, newest first, one page at a time.
+    The cursor for the next page is returned in the X-Next-Cursor header (absent on the last page).
+    """
+    query = db.query(*schema_columns(models.MediaAsset, schemas.MediaAssetOut)).join(models.Business).filter(
+        models.Business.user_id == current_user.id
+    )
+    if business_id is not None:
+        query = query.filter(models.MediaAsset.business_id == business_id)
+    if mime_type:
+        query = query.filter(models.MediaAsset.mime_type == mime_type)
+    rows = page.rows(page.apply(query, models.MediaAsset.id).all())
+    return model_list_response(rows, schemas.MediaAssetOut, page.headers())
+
+def _get_own_asset(db: Session, asset_id: int, current_user: models.User) -> models.MediaAsset:
+    asset = db.get(models.MediaAsset, asset_id)
+    if not asset:
+        raise HTTPException(404, "Media asset not found")
+    if not asset.business or asset.business.user_id != current_user.id:
+        raise HTTPException(403, "You do not have permission to access this asset")
+    return asset
+
+@router.get("/{asset_id}/renditions", response_model=List[schemas.MediaRenditionOut])
+def list_renditions(
+    asset_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return _get_own_asset(db, asset_id, current_user).renditions
+
+@router.get("/{asset_id}/content")
+def get_asset_content(
+    asset_id: int,
+    rendition: Optional[str] = Query(None, description="Named rendition (thumbnail, x, tiktok_cover)"),
+    width: int = Query(0, ge=0, description="Minimum width the client will display"),
+    height: int = Query(0, ge=0, description="Minimum height the client will display"),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Serve the smallest stored image that covers the requested size.
+    A named rendition is generated on demand if it doesn't exist yet; otherwise
+    the original is served when no rendition is large enough.
+    """
+    asset = _get_own_asset(db, asset_id, current_user)
+    
+    if rendition:
+        if rendition not in RENDITION_SPECS:
+            raise HTTPException(400, f"Unknown rendition. Allowed: {', '.join(RENDITION_SPECS)}")
+        selected = get_or_create_rendition(db, asset, rendition)
+    else:
+        selected = select_rendition(asset.renditions, min_width=width, min_height=height)
+    
+    storage_url = selected.storage_url if selected else asset.storage_url
+    mime_type = selected.mime_type if selected else asset.mime_type
+    container_name, blob_name = split_storage_url(storage_url)
+    data = storage_service.get_blob(blob_name, container_name=container_name)
+    if data is None:
+        raise HTTPException(404, "Media content not found in storage")
+    
+    return Response(
+        content=data,
+        media_type=mime_type or "application/octet-stream",
+        # Blob names are derived from the content, so it never changes; private as it needs auth
+        headers={"Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+@router.delete("/{asset_id}", status_code=204)
+def delete_asset(
+    asset_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete a media asset. The stored file (and its renditions) is only removed
+    once no other asset references the same content.
+    """
+    asset = db.get(models.MediaAsset, asset_id)
+    if not asset:
+        raise HTTPException(404, "Media asset not found")
+    if not asset.business or asset.business.user_id != current_user.id:
+        raise HTTPException(403, "You do not have permission to delete this asset")
+    
+    storage_urls = [asset.storage_url] + [r.storage_url for r in asset.renditions]
+    content_hash = asset.content_hash
+    db.delete(asset)
+    
+    release_storage = True
+    if content_hash:
+        blob = db.query(models.MediaBlob).filter(
+            models.MediaBlob.content_hash == content_hash
+        ).with_for_update().first()
+        if blob:
+            blob.ref_count -= 1
+            release_storage = blob.ref_count <= 0
+            if release_storage:
+                db.flush()
+                db.delete(blob)
+    db.flush()
+    
+    # Storage goes while the MediaBlob row is still locked: an upload of the same content waits
+    # for this commit and then finds no row, so it never reuses a blob name about to be deleted
+    if release_storage:
+        for storage_url in dict.fromkeys(storage_urls):
+            container_name, blob_name = split_storage_url(storage_url)
+            storage_service.delete_blob(blob_name, container_name=container_name)
+    
+    db.commit()
+    return None
@@ -3,8 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .. import models, schemas
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
 
 router = APIRouter(prefix="/businesses", tags=["businesses"])
 
@@ -17,11 +19,13 @@ def create_business(payload: schemas.BusinessCreate, db: Session = Depends(get_d
     return obj
 
 @router.get("", response_model=List[schemas.BusinessOut])
-def list_businesses(db: Session = Depends(get_db)):
-    return db.query(models.Business).order_by(models.Business.id.desc()).all()
+def list_businesses(page: Pagination = Depends(get_pagination), db: Session = Depends(get_read_db)):
+    query = db.query(*schema_columns(models.Business, schemas.BusinessOut))
+    rows = page.rows(page.apply(query, models.Business.id).all())
+    return model_list_response(rows, schemas.BusinessOut, page.headers())
 
 @router.get("/{business_id}", response_model=schemas.BusinessOut)
-def get_business(business_id: int, db: Session = Depends(get_db)):
+def get_business(business_id: int, db: Session = Depends(get_read_db)):
     obj = db.get(models.Business, business_id)
     if not obj:
         raise HTTPException(404, "Business not found")
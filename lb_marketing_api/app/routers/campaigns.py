@@ -5,6 +5,8 @@ from typing import List
 
 from ..db import get_db
 from .. import models, schemas
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
@@ -19,5 +21,7 @@ def create_campaign(payload: schemas.CampaignCreate, db: Session = Depends(get_d
     return obj
 
 @router.get("", response_model=List[schemas.CampaignOut])
-def list_campaigns(db: Session = Depends(get_db)):
-    return db.query(models.Campaign).order_by(models.Campaign.id.desc()).all()
+def list_campaigns(page: Pagination = Depends(get_pagination), db: Session = Depends(get_db)):
+    query = db.query(*schema_columns(models.Campaign, schemas.CampaignOut))
+    rows = page.rows(page.apply(query, models.Campaign.id).all())
+    return model_list_response(rows, schemas.CampaignOut, page.headers())
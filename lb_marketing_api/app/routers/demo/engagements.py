@@ -1,23 +1,38 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
-from fastapi import APIRouter, Body, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from ...db import get_db
+from ...db import get_async_db, get_async_read_db
 from ... import models, schemas
 from ...auth import get_current_user
+from ...pagination import Pagination, get_pagination
+from ...exports import ExportFormat, export_format, stream_export
+from ...responses import model_list_response, schema_columns
 
 router = APIRouter(prefix="/demo/engagements", tags=["demo"])
 
 
+async def _load_engagement(engagement_id: int, db: AsyncSession) -> Optional[models.ClientEngagement]:
+    # business is loaded eagerly: ClientEngagementOut.business_name can't lazy-load under asyncio
+    return await db.scalar(
+        select(models.ClientEngagement)
+        .where(models.ClientEngagement.id == engagement_id)
+        .options(selectinload(models.ClientEngagement.business))
+        .execution_options(populate_existing=True)
+    )
+
+
 @router.post("", response_model=schemas.ClientEngagementOut, status_code=201)
-def create_engagement(
+async def create_engagement(
     payload: schemas.ClientEngagementCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    business = db.get(models.Business, payload.business_id)
+    business = await db.get(models.Business, payload.business_id)
     if not business:
         raise HTTPException(400, "Invalid business_id")
     if business.user_id != current_user.id:
@@ -25,50 +40,71 @@ def create_engagement(
 
     obj = models.ClientEngagement(**payload.model_dump(), user_id=current_user.id)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+    await db.commit()
+    return await _load_engagement(obj.id, db)
 
 
-@router.get("", response_model=List[schemas.ClientEngagementOut])
-def list_engagements(
+@router.get("", response_model=Union[List[schemas.ClientEngagementOut], List[schemas.ClientEngagementSummaryOut]])
+async def list_engagements(
+    view: Literal["full", "summary"] = Query("full", description="summary: only the columns the engagements table shows"),
+    page: Pagination = Depends(get_pagination),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return (
-        db.query(models.ClientEngagement)
-        .filter(models.ClientEngagement.user_id == current_user.id)
-        .order_by(models.ClientEngagement.created_at.desc())
-        .all()
+    schema = schemas.ClientEngagementSummaryOut if view == "summary" else schemas.ClientEngagementOut
+    # Only the schema's columns, with the business name joined into the same statement
+    columns = schema_columns(models.ClientEngagement, schema, business_name=models.Business.name)
+    result = await db.execute(page.apply(
+        select(*columns)
+        .join(models.ClientEngagement.business)
+        .where(models.ClientEngagement.user_id == current_user.id),
+        models.ClientEngagement.created_at, models.ClientEngagement.id,
+    ))
+    return model_list_response(page.rows(result.all()), schema, page.headers())
+
+
+# Must be before /{engagement_id} so "export" is not captured as engagement_id
+@router.get("/export")
+async def export_engagements(
+    request: Request,
+    fmt: ExportFormat = Depends(export_format),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Stream the current user's engagements as NDJSON or CSV"""
+    statement = (
+        select(models.ClientEngagement)
+        .where(models.ClientEngagement.user_id == current_user.id)
+        .options(joinedload(models.ClientEngagement.business))
+        .order_by(models.ClientEngagement.id)
     )
+    return stream_export(request, statement, schemas.ClientEngagementOut, fmt, "engagements")
 
 
 # Must be before /{engagement_id} so "new" is not captured as engagement_id
 @router.post("/new", response_model=schemas.ClientEngagementOut, status_code=201)
-def create_new_engagement(
+async def create_new_engagement(
     payload: Optional[schemas.DemoEngagementQuickStart] = Body(default=None),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new business and engagement in one call. Engagement ID is auto-incremented."""
     business_name = (payload and payload.business_name) or "New Client"
     business = models.Business(user_id=current_user.id, name=business_name)
     db.add(business)
-    db.flush()
+    await db.flush()
     engagement = models.ClientEngagement(user_id=current_user.id, business_id=business.id)
     db.add(engagement)
-    db.commit()
-    db.refresh(engagement)
-    return engagement
+    await db.commit()
+    return await _load_engagement(engagement.id, db)
 
 
 @router.get("/{engagement_id}", response_model=schemas.ClientEngagementOut)
-def get_engagement(
+async def get_engagement(
     engagement_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    obj = db.get(models.ClientEngagement, engagement_id)
+    obj = await _load_engagement(engagement_id, db)
     if not obj:
         raise HTTPException(404, "Engagement not found")
     if obj.user_id != current_user.id:
@@ -77,13 +113,13 @@ def get_engagement(
 
 
 @router.patch("/{engagement_id}", response_model=schemas.ClientEngagementOut)
-def update_engagement(
+async def update_engagement(
     engagement_id: int,
     payload: schemas.ClientEngagementUpdate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    obj = db.get(models.ClientEngagement, engagement_id)
+    obj = await db.get(models.ClientEngagement, engagement_id)
     if not obj:
         raise HTTPException(404, "Engagement not found")
     if obj.user_id != current_user.id:
@@ -93,23 +129,22 @@ def update_engagement(
         setattr(obj, field, value)
     obj.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(obj)
-    return obj
+    await db.commit()
+    return await _load_engagement(engagement_id, db)
 
 
 @router.delete("/{engagement_id}", status_code=204)
-def delete_engagement(
+async def delete_engagement(
     engagement_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    obj = db.get(models.ClientEngagement, engagement_id)
+    obj = await db.get(models.ClientEngagement, engagement_id)
     if not obj:
         raise HTTPException(404, "Engagement not found")
     if obj.user_id != current_user.id:
         raise HTTPException(403, "Forbidden")
 
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
     return None
@@ -1,35 +1,60 @@
+import logging
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from ...db import get_db
+from ...db import AsyncSessionLocal, get_async_db, get_async_read_db
 from ... import models, schemas
 from ...auth import get_current_user
+from ...pagination import Pagination, get_pagination
+from ...exports import ExportFormat, export_format, stream_export
+from ...responses import model_list_response, schema_columns
+from ...sse import sse_event, sse_response
 from ...config import settings
+from ...services.ai_clients import ai_clients
 from ...services.demo.gbp_service import GBPService
-from ...services.demo.claude_service import ClaudeService
+from ...services.demo.claude_service import ClaudeService, GeneratedReply
+from ...services.demo.auto_reply import load_unanswered_reviews, run_auto_reply
+from ...services.demo.review_sync import sync_engagement_reviews
+from ...services.demo import review_jobs  # noqa: F401  (registers the review job handlers)
+from ...services.jobs import enqueue_job
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/demo/engagements/{engagement_id}/reviews", tags=["demo"])
 
+REVIEW_EXCERPT_CHARS = 140
+
 
 def get_gbp_service() -> GBPService:
     return GBPService()
 
 
-def get_claude_service() -> ClaudeService:
+def get_claude_service(user_id: int) -> ClaudeService:
     if not settings.ANTHROPIC_API_KEY:
         raise HTTPException(500, "ANTHROPIC_API_KEY not configured")
-    return ClaudeService(api_key=settings.ANTHROPIC_API_KEY)
+    return ClaudeService(
+        ai_clients.get_anthropic(),
+        tenant=f"user:{user_id}",
+        max_wait=settings.AI_QUEUE_TIMEOUT_SECONDS,
+    )
 
 
-def _get_engagement_or_403(
+async def _get_engagement_or_403(
     engagement_id: int,
     current_user: models.User,
-    db: Session,
+    db: AsyncSession,
 ) -> models.ClientEngagement:
-    engagement = db.get(models.ClientEngagement, engagement_id)
+    # business is loaded eagerly (reply prompts use business.name; no lazy loads under asyncio)
+    engagement = await db.get(
+        models.ClientEngagement, engagement_id,
+        options=[selectinload(models.ClientEngagement.business)],
+    )
     if not engagement:
         raise HTTPException(404, "Engagement not found")
     if engagement.user_id != current_user.id:
@@ -37,214 +62,228 @@ def _get_engagement_or_403(
     return engagement
 
 
-@router.get("", response_model=List[schemas.ReviewRecordOut])
-def list_reviews(
+@router.get("", response_model=Union[List[schemas.ReviewRecordOut], List[schemas.ReviewRecordSummaryOut]])
+async def list_reviews(
+    engagement_id: int,
+    view: Literal["full", "summary"] = Query("full", description="summary: table columns with the review text truncated"),
+    page: Pagination = Depends(get_pagination),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    await _get_engagement_or_403(engagement_id, current_user, db)
+    schema = schemas.ReviewRecordSummaryOut if view == "summary" else schemas.ReviewRecordOut
+    columns = schema_columns(
+        models.ReviewRecord, schema,
+        review_excerpt=func.substr(models.ReviewRecord.review_text, 1, REVIEW_EXCERPT_CHARS),
+    )
+    result = await db.execute(page.apply(
+        select(*columns).where(models.ReviewRecord.engagement_id == engagement_id),
+        models.ReviewRecord.review_published_at, models.ReviewRecord.id,
+    ))
+    return model_list_response(page.rows(result.all()), schema, page.headers())
+
+
+@router.get("/summary", response_model=schemas.ReviewCountsOut)
+async def review_counts(
     engagement_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    _get_engagement_or_403(engagement_id, current_user, db)
-    return (
-        db.query(models.ReviewRecord)
-        .filter(models.ReviewRecord.engagement_id == engagement_id)
-        .order_by(models.ReviewRecord.review_published_at.desc())
-        .all()
+    await _get_engagement_or_403(engagement_id, current_user, db)
+    total, unanswered = (await db.execute(
+        select(
+            func.count(models.ReviewRecord.id),
+            func.count(models.ReviewRecord.id).filter(models.ReviewRecord.has_reply.is_(False)),
+        ).where(models.ReviewRecord.engagement_id == engagement_id)
+    )).one()
+    return schemas.ReviewCountsOut(total=total, unanswered_count=unanswered)
+
+
+@router.get("/export")
+async def export_reviews(
+    engagement_id: int,
+    request: Request,
+    fmt: ExportFormat = Depends(export_format),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Stream the engagement's review records as NDJSON or CSV"""
+    await _get_engagement_or_403(engagement_id, current_user, db)
+    statement = (
+        select(models.ReviewRecord)
+        .where(models.ReviewRecord.engagement_id == engagement_id)
+        .order_by(models.ReviewRecord.id)
+    )
+    return stream_export(request, statement, schemas.ReviewRecordOut, fmt, f"reviews-{engagement_id}")
+
+
+def _job_accepted(job: models.Job) -> JSONResponse:
+    """202 with the queued job; progress at GET /jobs/{id}, results at GET /jobs/{id}/results"""
+    return JSONResponse(
+        status_code=202,
+        content=schemas.JobOut.model_validate(job).model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
     )
 
 
 @router.post("/sync")
 async def sync_reviews(
     engagement_id: int,
+    background: bool = Query(False, description="Run as a background job and return 202 with the job"),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    engagement = _get_engagement_or_403(engagement_id, current_user, db)
+    engagement = await _get_engagement_or_403(engagement_id, current_user, db)
 
     if not engagement.gbp_account_id or not engagement.gbp_location_id:
         raise HTTPException(
             400, "GBP account ID and location ID must be set on the engagement."
         )
 
-    gbp = get_gbp_service()
-    gbp_reviews = await gbp.list_reviews(
-        engagement.gbp_account_id, engagement.gbp_location_id
-    )
+    if background:
+        job = await enqueue_job(db, current_user.id, "review_sync", engagement_id=engagement_id)
+        return _job_accepted(job)
 
-    new_count = 0
-    updated_count = 0
-
-    for rev in gbp_reviews:
-        gbp_review_id = rev["reviewId"]
-        existing = (
-            db.query(models.ReviewRecord)
-            .filter(
-                models.ReviewRecord.engagement_id == engagement_id,
-                models.ReviewRecord.gbp_review_id == gbp_review_id,
-            )
-            .first()
-        )
-
-        if not existing:
-            published_at = None
-            if rev.get("createTime"):
-                try:
-                    published_at = datetime.fromisoformat(
-                        rev["createTime"].replace("Z", "+00:00")
-                    )
-                except ValueError:
-                    pass
-
-            reply = rev.get("reviewReply")
-            record = models.ReviewRecord(
-                engagement_id=engagement_id,
-                gbp_review_id=gbp_review_id,
-                reviewer_name=rev.get("reviewer", {}).get("displayName"),
-                review_text=rev.get("comment"),
-                star_rating=rev.get("starRating"),
-                review_published_at=published_at,
-                has_reply=reply is not None,
-                reply_text=reply.get("comment") if reply else None,
-            )
-            db.add(record)
-            new_count += 1
-        else:
-            reply = rev.get("reviewReply")
-            if reply and not existing.has_reply:
-                existing.has_reply = True
-                existing.reply_text = reply.get("comment")
-                updated_count += 1
-
-    db.commit()
-    return {"synced": len(gbp_reviews), "new": new_count, "updated": updated_count}
+    return await sync_engagement_reviews(db, get_gbp_service(), engagement)
 
 
 @router.post("/auto-reply", response_model=schemas.AutoReplyResult)
 async def auto_reply(
     engagement_id: int,
     payload: schemas.AutoReplyRequest,
+    background: bool = Query(False, description="Run as a background job and return 202 with the job"),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    engagement = _get_engagement_or_403(engagement_id, current_user, db)
-    claude = get_claude_service()
+    engagement = await _get_engagement_or_403(engagement_id, current_user, db)
+    claude = get_claude_service(current_user.id)
     gbp = get_gbp_service()
 
-    unanswered = (
-        db.query(models.ReviewRecord)
-        .filter(
-            models.ReviewRecord.engagement_id == engagement_id,
-            models.ReviewRecord.has_reply == False,  # noqa: E712
-        )
-        .all()
-    )
+    if background or payload.batch:
+        kind = "auto_reply_batch" if payload.batch else "auto_reply"
+        job = await enqueue_job(db, current_user.id, kind, params=payload.model_dump(), engagement_id=engagement_id)
+        return _job_accepted(job)
+
+    unanswered = await load_unanswered_reviews(db, engagement_id)
 
     if not unanswered:
         return schemas.AutoReplyResult(
             processed=0, succeeded=0, failed=0, dry_run=payload.dry_run, results=[]
         )
 
-    results: list[schemas.AutoReplyResultItem] = []
-    succeeded = 0
-    failed = 0
-
-    for review in unanswered:
-        item = schemas.AutoReplyResultItem(
-            review_id=review.id,
-            gbp_review_id=review.gbp_review_id,
-            reviewer=review.reviewer_name or "Unknown",
-            review_snippet=(review.review_text or "")[:120],
-            generated_reply=None,
-            posted=False,
-            saved=False,
-            error=None,
-        )
-        try:
-            reply_text = await claude.generate_review_reply(
-                business_name=engagement.business.name,
-                reviewer_name=review.reviewer_name or "Valued Customer",
-                review_text=review.review_text or "",
-                star_rating=review.star_rating or "THREE",
-                tone=payload.tone,
-                industry=engagement.industry,
-            )
-            item.generated_reply = reply_text
+    return await run_auto_reply(db, claude, gbp, engagement, unanswered, payload)
 
-            if not payload.dry_run:
-                if engagement.gbp_account_id and engagement.gbp_location_id and review.gbp_review_id:
-                    await gbp.post_reply(
-                        engagement.gbp_account_id,
-                        engagement.gbp_location_id,
-                        review.gbp_review_id,
-                        reply_text,
-                    )
-                    item.posted = True
-
-                review.has_reply = True
-                review.reply_text = reply_text
-                review.reply_generated_by = "ai"
-                review.reply_posted_at = datetime.utcnow()
-                db.commit()
-                item.saved = True
-
-            succeeded += 1
-        except Exception as exc:
-            item.error = str(exc)
-            failed += 1
 
-        results.append(item)
+async def _get_review_or_404(engagement_id: int, review_id: int, db: AsyncSession) -> models.ReviewRecord:
+    review = await db.get(models.ReviewRecord, review_id)
+    if not review or review.engagement_id != engagement_id:
+        raise HTTPException(404, "Review not found")
+    return review
 
-    return schemas.AutoReplyResult(
-        processed=len(unanswered),
-        succeeded=succeeded,
-        failed=failed,
-        dry_run=payload.dry_run,
-        results=results,
+
+def _reply_prompt(engagement: models.ClientEngagement, review: models.ReviewRecord, tone: str) -> dict:
+    return dict(
+        business_name=engagement.business.name,
+        reviewer_name=review.reviewer_name or "Valued Customer",
+        review_text=review.review_text or "",
+        star_rating=review.star_rating or "THREE",
+        tone=tone,
+        industry=engagement.industry,
     )
 
 
+async def _post_and_save_reply(
+    db: AsyncSession,
+    gbp: GBPService,
+    engagement: models.ClientEngagement,
+    review: models.ReviewRecord,
+    reply_text: str,
+):
+    if engagement.gbp_account_id and engagement.gbp_location_id and review.gbp_review_id:
+        await gbp.post_reply(
+            engagement.gbp_account_id,
+            engagement.gbp_location_id,
+            review.gbp_review_id,
+            reply_text,
+        )
+
+    review.has_reply = True
+    review.reply_text = reply_text
+    review.reply_generated_by = "ai"
+    review.reply_posted_at = datetime.utcnow()
+    await db.commit()
+
+
+def _reply_result(review_id: int, reply: GeneratedReply, dry_run: bool) -> dict:
+    return {
+        "review_id": review_id,
+        "reply": reply.text,
+        "saved": not dry_run,
+        "usage": reply.usage.model_dump(),
+    }
+
+
 @router.post("/{review_id}/reply")
 async def reply_single(
     engagement_id: int,
     review_id: int,
     payload: schemas.AutoReplyRequest,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    engagement = _get_engagement_or_403(engagement_id, current_user, db)
+    engagement = await _get_engagement_or_403(engagement_id, current_user, db)
+    review = await _get_review_or_404(engagement_id, review_id, db)
 
-    review = db.get(models.ReviewRecord, review_id)
-    if not review or review.engagement_id != engagement_id:
-        raise HTTPException(404, "Review not found")
-
-    claude = get_claude_service()
+    claude = get_claude_service(current_user.id)
     gbp = get_gbp_service()
 
-    reply_text = await claude.generate_review_reply(
-        business_name=engagement.business.name,
-        reviewer_name=review.reviewer_name or "Valued Customer",
-        review_text=review.review_text or "",
-        star_rating=review.star_rating or "THREE",
-        tone=payload.tone,
-        industry=engagement.industry,
-    )
+    reply = await claude.generate_review_reply(**_reply_prompt(engagement, review, payload.tone))
 
     if not payload.dry_run:
-        if engagement.gbp_account_id and engagement.gbp_location_id and review.gbp_review_id:
-            await gbp.post_reply(
-                engagement.gbp_account_id,
-                engagement.gbp_location_id,
-                review.gbp_review_id,
-                reply_text,
-            )
-
-        review.has_reply = True
-        review.reply_text = reply_text
-        review.reply_generated_by = "ai"
-        review.reply_posted_at = datetime.utcnow()
-        db.commit()
+        await _post_and_save_reply(db, gbp, engagement, review, reply.text)
 
-    return {
-        "review_id": review_id,
-        "reply": reply_text,
-        "saved": not payload.dry_run,
-    }
+    return _reply_result(review_id, reply, payload.dry_run)
+
+
+@router.post("/{review_id}/reply/stream")
+async def reply_single_stream(
+    engagement_id: int,
+    review_id: int,
+    payload: schemas.AutoReplyRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    reply_single as server-sent events: `delta` events ({"text": ...}) as the reply is
+    generated, then `done` with the reply_single body once it is posted and saved, or `error`.
+    """
+    engagement = await _get_engagement_or_403(engagement_id, current_user, db)
+    review = await _get_review_or_404(engagement_id, review_id, db)
+
+    claude = get_claude_service(current_user.id)
+    gbp = get_gbp_service()
+    prompt = _reply_prompt(engagement, review, payload.tone)
+
+    async def events():
+        try:
+            reply = None
+            async for chunk in claude.stream_review_reply(**prompt):
+                if isinstance(chunk, GeneratedReply):
+                    reply = chunk
+                else:
+                    yield sse_event("delta", {"text": chunk})
+            if reply is None:
+                raise RuntimeError("stream ended without a reply")
+            if not payload.dry_run:
+                # The request's session is closed once the endpoint returns, so saving uses its own
+                async with AsyncSessionLocal() as stream_db:
+                    stream_review = await _get_review_or_404(engagement_id, review_id, stream_db)
+                    await _post_and_save_reply(stream_db, gbp, engagement, stream_review, reply.text)
+            done = sse_event("done", _reply_result(review_id, reply, payload.dry_run))
+        except Exception as exc:
+            logger.error(f"Streaming reply for review {review_id} failed: {exc}", exc_info=True)
+            yield sse_event("error", {"detail": str(exc)})
+            return
+        yield done
+
+    return sse_response(events())
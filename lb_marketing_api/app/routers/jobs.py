@@ -0,0 +1,105 @@
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import AsyncSessionLocal, get_async_db
+from .. import models, schemas
+from ..auth import get_current_user
+from ..pagination import Pagination, get_pagination
+from ..services.jobs import request_cancel
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+RESULTS_BATCH_SIZE = 500
+# How often a followed result stream checks for new results
+FOLLOW_POLL_SECONDS = 1.0
+
+FINISHED_STATUSES = (models.JobStatus.succeeded, models.JobStatus.failed, models.JobStatus.canceled)
+
+
+async def _get_job_or_403(job_id: int, current_user: models.User, db: AsyncSession) -> models.Job:
+    job = await db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if job.user_id != current_user.id:
+        raise HTTPException(403, "Forbidden")
+    return job
+
+
+@router.get("", response_model=List[schemas.JobOut])
+async def list_jobs(
+    page: Pagination = Depends(get_pagination),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Read from the primary: progress is polled while the worker writes it
+    jobs = (await db.scalars(page.apply(
+        select(models.Job).where(models.Job.user_id == current_user.id),
+        models.Job.id,
+    ))).all()
+    return page.rows(jobs)
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+async def get_job(
+    job_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _get_job_or_403(job_id, current_user, db)
+
+
+async def _stream_results(job_id: int, after: int, follow: bool) -> AsyncIterator[bytes]:
+    # The request's session is closed once the endpoint returns, so the stream owns its own
+    async with AsyncSessionLocal() as db:
+        while True:
+            status = await db.scalar(select(models.Job.status).where(models.Job.id == job_id))
+            results = (await db.execute(
+                select(models.JobResult.id, models.JobResult.data)
+                .where(models.JobResult.job_id == job_id, models.JobResult.id > after)
+                .order_by(models.JobResult.id)
+                .limit(RESULTS_BATCH_SIZE)
+            )).all()
+            # End the transaction so the next poll sees newly committed results
+            await db.rollback()
+            if results:
+                after = results[-1].id
+                yield b"".join(
+                    json.dumps({"id": row.id, "data": row.data}).encode() + b"\n" for row in results
+                )
+                continue
+            # Status was read before the results, so a finished job has no results left to send
+            if not follow or status in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(FOLLOW_POLL_SECONDS)
+
+
+@router.get("/{job_id}/results")
+async def stream_job_results(
+    job_id: int,
+    after: int = Query(0, ge=0, description="Only results with an id greater than this (resume point)"),
+    follow: bool = Query(False, description="Keep the stream open until the job finishes"),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Per-item results as NDJSON lines of {"id": ..., "data": {...}}"""
+    await _get_job_or_403(job_id, current_user, db)
+    return StreamingResponse(_stream_results(job_id, after, follow), media_type="application/x-ndjson")
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobOut)
+async def cancel_job(
+    job_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    job = await _get_job_or_403(job_id, current_user, db)
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(409, f"Job already {job.status.value}")
+    await request_cancel(db, job)
+    return job
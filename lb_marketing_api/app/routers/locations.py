@@ -5,6 +5,8 @@ from typing import List
 
 from ..db import get_db
 from .. import models, schemas
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
@@ -19,5 +21,7 @@ def create_location(payload: schemas.LocationCreate, db: Session = Depends(get_d
     return obj
 
 @router.get("", response_model=List[schemas.LocationOut])
-def list_locations(db: Session = Depends(get_db)):
-    return db.query(models.Location).order_by(models.Location.id.desc()).all()
+def list_locations(page: Pagination = Depends(get_pagination), db: Session = Depends(get_db)):
+    query = db.query(*schema_columns(models.Location, schemas.LocationOut))
+    rows = page.rows(page.apply(query, models.Location.id).all())
+    return model_list_response(rows, schemas.LocationOut, page.headers())
@@ -9,7 +9,7 @@ import hashlib
 import base64
 from urllib.parse import urlencode
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .. import models
 from ..config import settings
 from ..auth import get_current_user
@@ -274,7 +274,7 @@ def x_callback(
 @router.get("/x/status")
 def x_status(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Check if X (Twitter) is connected for the current user.
@@ -501,7 +501,7 @@ def tiktok_callback(
 @router.get("/tiktok/status")
 def tiktok_status(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Check if TikTok is connected for the current user.
@@ -526,7 +526,7 @@ def tiktok_status(
 @router.get("/status")
 def get_all_platform_status(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get connection status for all platforms for the current user.
@@ -624,7 +624,7 @@ def authorize_platform(
 def platform_status(
     platform: str,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Check connection status for a specific platform for the current user.
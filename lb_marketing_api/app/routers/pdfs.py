@@ -17,6 +17,10 @@ PDF_FILES = {
     "affiliate": "30-day-plan-boost-engagement-affiliate.pdf"
 }
 
+# Byte ranges read by /info to check the PDF header and %%EOF trailer
+PDF_PROBE_HEADER_BYTES = 20
+PDF_PROBE_FOOTER_BYTES = 100
+
 
 @router.get("/download/business")
 async def download_business_plan():
@@ -48,25 +52,30 @@ async def get_pdf_info():
     info = {}
     for plan_type, blob_name in PDF_FILES.items():
         try:
-            blob_client = storage_service.blob_service_client.get_blob_client(
-                container=storage_service.container_name,
-                blob=blob_name
-            )
+            # Probe only the first bytes; the response also carries the blob properties
+            header_result = storage_service.get_blob_range(blob_name, offset=0, length=PDF_PROBE_HEADER_BYTES)
             
-            if blob_client.exists():
-                props = blob_client.get_blob_properties()
-                # Try to download a small chunk to verify
-                download_stream = blob_client.download_blob()
-                full_data = download_stream.readall()
+            if header_result is not None:
+                header, props, size = header_result
+                
+                # Probe the tail separately instead of downloading the whole file
+                if size > len(header):
+                    footer_offset = max(size - PDF_PROBE_FOOTER_BYTES, 0)
+                    footer_result = storage_service.get_blob_range(
+                        blob_name, offset=footer_offset, length=size - footer_offset
+                    )
+                    footer = footer_result[0] if footer_result is not None else b""
+                else:
+                    footer = header
                 
                 info[plan_type] = {
                     "exists": True,
-                    "size_in_storage": props.size,
-                    "size_downloaded": len(full_data),
+                    "size_in_storage": size,
+                    "size_downloaded": len(header) + len(footer),
                     "content_type": props.content_settings.content_type if props.content_settings else None,
-                    "pdf_header": full_data[:20].decode('latin-1', errors='ignore') if len(full_data) >= 20 else None,
-                    "pdf_footer": full_data[-20:].decode('latin-1', errors='ignore') if len(full_data) >= 20 else None,
-                    "is_valid_pdf": full_data.startswith(b'%PDF') and b'%%EOF' in full_data[-100:],
+                    "pdf_header": header[:20].decode('latin-1', errors='ignore') if len(header) >= 20 else None,
+                    "pdf_footer": footer[-20:].decode('latin-1', errors='ignore') if len(footer) >= 20 else None,
+                    "is_valid_pdf": header.startswith(b'%PDF') and b'%%EOF' in footer,
                 }
             else:
                 info[plan_type] = {
@@ -1,61 +1,86 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 
-from ..db import get_db
+from ..db import get_async_db, get_async_read_db, get_db
 
 logger = logging.getLogger(__name__)
 from .. import models, schemas
 from ..auth import get_current_user
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
+from ..exports import ExportFormat, export_format, stream_export
 from ..services.platform_poster import post_scheduled_post, PlatformPostError
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 @router.post("", response_model=schemas.ScheduledPostOut, status_code=201)
-def schedule_post(payload: schemas.ScheduledPostCreate, db: Session = Depends(get_db)):
-    if not db.get(models.User, payload.user_id):
+async def schedule_post(payload: schemas.ScheduledPostCreate, db: AsyncSession = Depends(get_async_db)):
+    if not await db.get(models.User, payload.user_id):
         raise HTTPException(400, "Invalid user_id")
-    if payload.business_id and not db.get(models.Business, payload.business_id):
+    if payload.business_id and not await db.get(models.Business, payload.business_id):
         raise HTTPException(400, "Invalid business_id")
-    if payload.campaign_id and not db.get(models.Campaign, payload.campaign_id):
+    if payload.campaign_id and not await db.get(models.Campaign, payload.campaign_id):
         raise HTTPException(400, "Invalid campaign_id")
-    if payload.media_asset_id and not db.get(models.MediaAsset, payload.media_asset_id):
+    if payload.media_asset_id and not await db.get(models.MediaAsset, payload.media_asset_id):
         raise HTTPException(400, "Invalid media_asset_id")
     obj = models.ScheduledPost(**payload.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 @router.get("", response_model=List[schemas.ScheduledPostOut])
-def list_posts(
+async def list_posts(
+    page: Pagination = Depends(get_pagination),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    return db.query(models.ScheduledPost).filter(
-        models.ScheduledPost.user_id == current_user.id
-    ).order_by(models.ScheduledPost.scheduled_at.desc()).all()
+    result = await db.execute(page.apply(
+        select(*schema_columns(models.ScheduledPost, schemas.ScheduledPostOut))
+        .where(models.ScheduledPost.user_id == current_user.id),
+        models.ScheduledPost.scheduled_at, models.ScheduledPost.id,
+    ))
+    rows = page.rows(result.all())
+    return model_list_response(rows, schemas.ScheduledPostOut, page.headers())
+
+# Must be before /{post_id} so "export" is not captured as post_id
+@router.get("/export")
+async def export_posts(
+    request: Request,
+    fmt: ExportFormat = Depends(export_format),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Stream the current user's post history as NDJSON or CSV"""
+    statement = (
+        select(models.ScheduledPost)
+        .where(models.ScheduledPost.user_id == current_user.id)
+        .order_by(models.ScheduledPost.scheduled_at, models.ScheduledPost.id)
+    )
+    return stream_export(request, statement, schemas.ScheduledPostOut, fmt, "posts")
 
 @router.get("/{post_id}", response_model=schemas.ScheduledPostOut)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.get(models.ScheduledPost, post_id)
+async def get_post(post_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    post = await db.get(models.ScheduledPost, post_id)
     if not post:
         raise HTTPException(404, f"Post with id {post_id} not found")
     return post
 
 @router.delete("/{post_id}", status_code=204)
-def delete_post(
+async def delete_post(
     post_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a post by ID. Only the owner of the post can delete it.
     """
-    post = db.get(models.ScheduledPost, post_id)
+    post = await db.get(models.ScheduledPost, post_id)
     if not post:
         raise HTTPException(404, f"Post with id {post_id} not found")
     
@@ -63,8 +88,8 @@ def delete_post(
     if post.user_id != current_user.id:
         raise HTTPException(403, "You do not have permission to delete this post")
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
     return None
 
 @router.post("/publish", response_model=List[schemas.ScheduledPostOut])
@@ -5,6 +5,8 @@ from typing import List
 
 from ..db import get_db
 from .. import models, schemas
+from ..pagination import Pagination, get_pagination
+from ..responses import model_list_response, schema_columns
 
 router = APIRouter(prefix="/social-profiles", tags=["social-profiles"])
 
@@ -24,5 +26,7 @@ def create_social_profile(payload: schemas.SocialProfileCreate, db: Session = De
     return obj
 
 @router.get("", response_model=List[schemas.SocialProfileOut])
-def list_social_profiles(db: Session = Depends(get_db)):
-    return db.query(models.SocialProfile).order_by(models.SocialProfile.id.desc()).all()
+def list_social_profiles(page: Pagination = Depends(get_pagination), db: Session = Depends(get_db)):
+    query = db.query(*schema_columns(models.SocialProfile, schemas.SocialProfileOut))
+    rows = page.rows(page.apply(query, models.SocialProfile.id).all())
+    return model_list_response(rows, schemas.SocialProfileOut, page.headers())
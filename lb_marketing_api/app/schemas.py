@@ -1,23 +1,24 @@
 
 from datetime import datetime, timezone
-from typing import List, Optional
-from pydantic import BaseModel, Field, field_serializer
+from typing import Annotated, List, Optional
+from pydantic import AfterValidator, BaseModel, Field, field_validator
 from enum import Enum
 
-def serialize_datetime_utc(dt: datetime) -> str:
-    """Serialize datetime to ISO format with UTC timezone indicator ('Z' suffix)."""
-    # If datetime is naive (no timezone), assume it's UTC
+def _as_utc(dt: datetime) -> datetime:
+    # Naive values come from TIMESTAMP WITHOUT TIME ZONE columns and are UTC
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    else:
-        # Convert to UTC if it has timezone info
-        dt = dt.astimezone(timezone.utc)
-    # Return ISO format, ensuring it ends with 'Z' for UTC
-    iso_str = dt.isoformat()
-    # Replace '+00:00' with 'Z' for UTC timezone
-    if iso_str.endswith('+00:00'):
-        return iso_str[:-6] + 'Z'
-    return iso_str
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+# Datetime serialized as ISO 8601 in UTC with a 'Z' suffix (e.g. 2026-01-01T09:30:00Z).
+# Values are tagged as UTC on validation; pydantic-core then formats them natively.
+UTCDateTime = Annotated[datetime, AfterValidator(_as_utc)]
+
+def to_naive_utc(dt: datetime) -> datetime:
+    """Normalize to naive UTC, matching the TIMESTAMP WITHOUT TIME ZONE columns."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
 
 class PlatformEnum(str, Enum):
     facebook = "facebook"
@@ -51,11 +52,7 @@ class BusinessOut(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
     website: Optional[str] = None
-    created_at: datetime
-    
-    @field_serializer('created_at')
-    def serialize_created_at(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+    created_at: UTCDateTime
     
     class Config:
         from_attributes = True
@@ -101,11 +98,7 @@ class SocialProfileOut(BaseModel):
     handle: str
     external_id: Optional[str] = None
     status: str
-    created_at: datetime
-    
-    @field_serializer('created_at')
-    def serialize_created_at(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+    created_at: UTCDateTime
     
     class Config:
         from_attributes = True
@@ -122,16 +115,10 @@ class CampaignOut(BaseModel):
     business_id: int
     name: str
     goal: Optional[str] = None
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
+    start_date: Optional[UTCDateTime] = None
+    end_date: Optional[UTCDateTime] = None
     status: str
     
-    @field_serializer('start_date', 'end_date')
-    def serialize_datetime(self, dt: Optional[datetime], _info) -> Optional[str]:
-        if dt is None:
-            return None
-        return serialize_datetime_utc(dt)
-    
     class Config:
         from_attributes = True
 
@@ -147,11 +134,21 @@ class MediaAssetOut(BaseModel):
     title: Optional[str] = None
     storage_url: str
     mime_type: Optional[str] = None
-    created_at: datetime
+    created_at: UTCDateTime
     
-    @field_serializer('created_at')
-    def serialize_created_at(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+    class Config:
+        from_attributes = True
+
+class MediaRenditionOut(BaseModel):
+    id: int
+    media_asset_id: int
+    name: str
+    storage_url: str
+    mime_type: str
+    width: int
+    height: int
+    byte_size: int
+    created_at: UTCDateTime
     
     class Config:
         from_attributes = True
@@ -165,6 +162,11 @@ class ScheduledPostCreate(BaseModel):
     campaign_id: Optional[int] = None
     media_asset_id: Optional[int] = None
 
+    @field_validator('scheduled_at')
+    @classmethod
+    def normalize_scheduled_at(cls, dt: datetime) -> datetime:
+        return to_naive_utc(dt)
+
 class ScheduledPostOut(BaseModel):
     id: int
     user_id: int
@@ -173,14 +175,10 @@ class ScheduledPostOut(BaseModel):
     platform: PlatformEnum
     content: str
     media_asset_id: Optional[int] = None
-    scheduled_at: datetime
+    scheduled_at: UTCDateTime
     status: PostStatus
     external_post_id: Optional[str] = None
-    created_at: datetime
-    
-    @field_serializer('scheduled_at', 'created_at')
-    def serialize_datetime(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+    created_at: UTCDateTime
     
     class Config:
         from_attributes = True
@@ -194,13 +192,9 @@ class UserOut(BaseModel):
     id: int
     email: str
     full_name: Optional[str] = None
-    created_at: datetime
+    created_at: UTCDateTime
     is_active: bool
     
-    @field_serializer('created_at')
-    def serialize_created_at(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
-    
     class Config:
         from_attributes = True
 
@@ -277,12 +271,28 @@ class ClientEngagementOut(BaseModel):
     review_count: Optional[int] = None
     main_goal: Optional[str] = None
     notes: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
+    created_at: UTCDateTime
+    updated_at: UTCDateTime
+
+    class Config:
+        from_attributes = True
 
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+
+class ClientEngagementSummaryOut(BaseModel):
+    """Row of the engagements table (GET /demo/engagements?view=summary)"""
+    id: int
+    business_id: int
+    business_name: Optional[str] = None
+    contact_name: Optional[str] = None
+    industry: Optional[str] = None
+    city: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    current_rating: Optional[float] = None
+    review_count: Optional[int] = None
+    created_at: UTCDateTime
+    updated_at: UTCDateTime
 
     class Config:
         from_attributes = True
@@ -293,13 +303,7 @@ class TaskStateOut(BaseModel):
     engagement_id: int
     task_id: str
     completed: bool
-    completed_at: Optional[datetime] = None
-
-    @field_serializer('completed_at')
-    def serialize_completed_at(self, dt: Optional[datetime], _info) -> Optional[str]:
-        if dt is None:
-            return None
-        return serialize_datetime_utc(dt)
+    completed_at: Optional[UTCDateTime] = None
 
     class Config:
         from_attributes = True
@@ -385,12 +389,8 @@ class AuditReportOut(BaseModel):
     quick_win_1: Optional[str] = None
     quick_win_2: Optional[str] = None
     notes: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
-
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+    created_at: UTCDateTime
+    updated_at: UTCDateTime
 
     class Config:
         from_attributes = True
@@ -403,30 +403,57 @@ class ReviewRecordOut(BaseModel):
     reviewer_name: Optional[str] = None
     review_text: Optional[str] = None
     star_rating: Optional[str] = None
-    review_published_at: Optional[datetime] = None
+    review_published_at: Optional[UTCDateTime] = None
     has_reply: bool
     reply_text: Optional[str] = None
     reply_generated_by: Optional[str] = None
-    reply_posted_at: Optional[datetime] = None
-    created_at: datetime
+    reply_posted_at: Optional[UTCDateTime] = None
+    created_at: UTCDateTime
 
-    @field_serializer('review_published_at', 'reply_posted_at')
-    def serialize_optional_datetime(self, dt: Optional[datetime], _info) -> Optional[str]:
-        if dt is None:
-            return None
-        return serialize_datetime_utc(dt)
+    class Config:
+        from_attributes = True
 
-    @field_serializer('created_at')
-    def serialize_created_at(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+
+class ReviewRecordSummaryOut(BaseModel):
+    """Row of the reviews table (GET .../reviews?view=summary); review text is truncated"""
+    id: int
+    gbp_review_id: Optional[str] = None
+    reviewer_name: Optional[str] = None
+    review_excerpt: Optional[str] = None
+    star_rating: Optional[str] = None
+    review_published_at: Optional[UTCDateTime] = None
+    has_reply: bool
+    reply_posted_at: Optional[UTCDateTime] = None
 
     class Config:
         from_attributes = True
 
 
+class ReviewCountsOut(BaseModel):
+    """Review totals of an engagement (GET .../reviews/summary), counted without loading the rows"""
+    total: int
+    unanswered_count: int
+
+
 class AutoReplyRequest(BaseModel):
     tone: str = "warm"
     dry_run: bool = False
+    # Generate all replies in one Anthropic Message Batch (half price, usually done within an hour);
+    # always runs as a background job
+    batch: bool = False
+
+
+class TokenUsage(BaseModel):
+    input_tokens: int = 0  # Uncached input
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0  # Input written to the prompt cache
+    cache_read_input_tokens: int = 0  # Input served from the prompt cache
+
+    def add(self, other: "TokenUsage"):
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_creation_input_tokens += other.cache_creation_input_tokens
+        self.cache_read_input_tokens += other.cache_read_input_tokens
 
 
 class AutoReplyResultItem(BaseModel):
@@ -438,6 +465,7 @@ class AutoReplyResultItem(BaseModel):
     posted: bool
     saved: bool
     error: Optional[str] = None
+    usage: Optional[TokenUsage] = None
 
 
 class AutoReplyResult(BaseModel):
@@ -445,6 +473,7 @@ class AutoReplyResult(BaseModel):
     succeeded: int
     failed: int
     dry_run: bool
+    usage: TokenUsage = Field(default_factory=TokenUsage)  # Totals over all results
     results: list[AutoReplyResultItem]
 
 
@@ -505,12 +534,37 @@ class MonthEndReportOut(BaseModel):
     gbp_changes: Optional[str] = None
     highlights: Optional[str] = None
     next_month_plan: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
+    created_at: UTCDateTime
+    updated_at: UTCDateTime
+
+    class Config:
+        from_attributes = True
 
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime, _info) -> str:
-        return serialize_datetime_utc(dt)
+
+# Background jobs
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    canceled = "canceled"
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    engagement_id: Optional[int] = None
+    params: Optional[dict] = None
+    progress_total: Optional[int] = None
+    progress_done: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: UTCDateTime
+    started_at: Optional[UTCDateTime] = None
+    finished_at: Optional[UTCDateTime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
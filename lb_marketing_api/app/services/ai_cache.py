@@ -0,0 +1,146 @@
+"""
+In-process cache of AI generation responses.
+
+Entries are keyed by the normalized prompt (whitespace collapsed, case folded) together
+with the tone, model and sampling parameters, so repeating a brief returns the stored
+response without calling the model. When an embedding deployment is configured, a miss
+on the exact key falls back to the most similar cached prompt with the same tone, model
+and parameters, if its cosine similarity reaches AI_CACHE_SIMILARITY. Only the
+AI_CACHE_SIMILAR_SCAN_MAX most recently stored prompts of that variant are compared, off the
+event loop.
+
+The cache is a size-bounded LRU whose entries expire after AI_CACHE_TTL_SECONDS. It lives
+in one process; each instance warms its own.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _hash(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class CacheKey(NamedTuple):
+    prompt: str  # Hash of the normalized prompt text
+    variant: str  # Hash of everything else the response depends on (tone, model, params)
+
+
+def cache_key(text: str, tone: str, model: str, params: Dict[str, Any]) -> CacheKey:
+    return CacheKey(
+        prompt=_hash(normalize_prompt(text)),
+        variant=_hash({"tone": normalize_prompt(tone), "model": model, "params": params}),
+    )
+
+
+def _unit(vector: List[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return tuple(v / norm for v in vector)
+
+
+def _best_match(
+    query: Tuple[float, ...], candidates: List[Tuple["CacheKey", Tuple[float, ...]]], threshold: float,
+) -> Optional["CacheKey"]:
+    best_key, best_score = None, threshold
+    for key, embedding in candidates:
+        score = sum(a * b for a, b in zip(query, embedding))
+        if score >= best_score:
+            best_key, best_score = key, score
+    return best_key
+
+
+class _Entry(NamedTuple):
+    value: Dict[str, Any]
+    expires_at: float
+    embedding: Optional[Tuple[float, ...]]
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similar_scan_max: int = 500):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similar_scan_max = similar_scan_max
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        # Embedded prompts per variant, oldest stored first, so a similarity search only sees its variant
+        self._embeddings: Dict[str, Dict[CacheKey, Tuple[float, ...]]] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _live(self, key: CacheKey) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        embeddings = self._embeddings.get(key.variant)
+        if embeddings is not None:
+            embeddings.pop(key, None)
+            if not embeddings:
+                del self._embeddings[key.variant]
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    async def get_similar(self, key: CacheKey, embedding: List[float], threshold: float) -> Optional[Dict[str, Any]]:
+        """Value of the live entry of the same variant whose prompt embedding is closest, if close enough"""
+        embeddings = self._embeddings.get(key.variant)
+        if not embeddings:
+            return None
+        # Snapshot on the event loop; the comparison runs in a thread while the cache keeps changing
+        candidates = list(embeddings.items())[-self.similar_scan_max:]
+        best_key = await asyncio.to_thread(_best_match, _unit(embedding), candidates, threshold)
+        entry = self._live(best_key) if best_key is not None else None
+        if entry is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self.similar_hits += 1
+        return entry.value
+
+    def put(self, key: CacheKey, value: Dict[str, Any], embedding: Optional[List[float]] = None):
+        self._remove(key)
+        self._entries[key] = _Entry(
+            value=value,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            embedding=_unit(embedding) if embedding else None,
+        )
+        if embedding:
+            self._embeddings.setdefault(key.variant, {})[key] = self._entries[key].embedding
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+        }
+
+
+generation_cache = ResponseCache(
+    settings.AI_CACHE_MAX_ENTRIES, settings.AI_CACHE_TTL_SECONDS, settings.AI_CACHE_SIMILAR_SCAN_MAX,
+)
@@ -0,0 +1,79 @@
+"""
+App-lifetime AI API clients.
+
+The Anthropic and Azure OpenAI clients are created once (in the app lifespan, or on first
+use outside the app such as the Functions timer) and reused, so requests share each
+client's HTTP connection pool and keep its TLS connections warm instead of building a
+client per call. Timeouts and retries come from settings; close() shuts the pools down.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+import anthropic
+import openai
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AIClients:
+
+    def __init__(self):
+        # Pooled connections belong to the event loop that opened them
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._anthropic: Optional[anthropic.AsyncAnthropic] = None
+        self._azure_openai: Optional[openai.AsyncAzureOpenAI] = None
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new event loop (e.g. a fresh asyncio.run): start new pools
+            self._loop = loop
+            self._anthropic = None
+            self._azure_openai = None
+
+    def get_anthropic(self) -> anthropic.AsyncAnthropic:
+        self._check_loop()
+        if self._anthropic is None:
+            self._anthropic = anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                base_url=settings.ANTHROPIC_BASE_URL or None,
+                timeout=anthropic.Timeout(settings.AI_TIMEOUT_SECONDS, connect=settings.AI_CONNECT_TIMEOUT_SECONDS),
+                max_retries=settings.AI_MAX_RETRIES,
+            )
+        return self._anthropic
+
+    def get_azure_openai(self) -> openai.AsyncAzureOpenAI:
+        self._check_loop()
+        if self._azure_openai is None:
+            self._azure_openai = openai.AsyncAzureOpenAI(
+                api_version=settings.AZURE_OPENAI_API_VERSION,
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                timeout=openai.Timeout(settings.AI_TIMEOUT_SECONDS, connect=settings.AI_CONNECT_TIMEOUT_SECONDS),
+                max_retries=settings.AI_MAX_RETRIES,
+            )
+        return self._azure_openai
+
+    def start(self):
+        """Create the configured clients up front (called from the app lifespan)"""
+        if settings.ANTHROPIC_API_KEY:
+            self.get_anthropic()
+        if settings.AZURE_OPENAI_API_KEY:
+            self.get_azure_openai()
+
+    async def close(self):
+        clients: List = [c for c in (self._anthropic, self._azure_openai) if c is not None]
+        self._anthropic = None
+        self._azure_openai = None
+        self._loop = None
+        for client in clients:
+            await client.close()
+        if clients:
+            logger.info("AI clients closed")
+
+
+ai_clients = AIClients()
@@ -0,0 +1,243 @@
+"""
+Bulk review auto-reply: generates AI replies for an engagement's unanswered reviews.
+
+Replies are generated concurrently, bounded per engagement here and across the process by the
+LLM rate governor, so a bulk run takes roughly (reviews / AUTO_REPLY_CONCURRENCY) LLM latencies
+instead of one per review. The first reply of a run is generated on its own so that the shared system prompt is
+in the prompt cache before the rest fan out. GBP posting and the database update happen
+afterwards, as one batch.
+
+Batch mode submits every reply as one Anthropic Message Batch instead (see the
+auto_reply_batch job); its results go through the same apply step once the batch has ended.
+"""
+
+import asyncio
+import logging
+import weakref
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ... import models, schemas
+from ...config import settings
+from .claude_service import ClaudeService
+from .gbp_service import GBPService
+
+logger = logging.getLogger(__name__)
+
+# Called with each review's result item as soon as its reply is generated
+OnGenerated = Callable[[schemas.AutoReplyResultItem], Awaitable[None]]
+# Polled before each generation; True stops the run (remaining reviews are skipped, nothing is posted)
+ShouldStop = Callable[[], Awaitable[bool]]
+
+# Shared by concurrent runs on the same engagement; dropped once no run holds them
+_engagement_limits: "weakref.WeakValueDictionary[int, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+
+def _engagement_semaphore(engagement_id: int) -> asyncio.Semaphore:
+    semaphore = _engagement_limits.get(engagement_id)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.AUTO_REPLY_CONCURRENCY)
+        _engagement_limits[engagement_id] = semaphore
+    return semaphore
+
+
+async def load_unanswered_reviews(
+    db: AsyncSession,
+    engagement_id: int,
+    review_ids: Optional[List[int]] = None,
+) -> Sequence[models.ReviewRecord]:
+    query = select(models.ReviewRecord).where(
+        models.ReviewRecord.engagement_id == engagement_id,
+        models.ReviewRecord.has_reply == False,  # noqa: E712
+    )
+    if review_ids is not None:
+        query = query.where(models.ReviewRecord.id.in_(review_ids))
+    return (await db.scalars(query.order_by(models.ReviewRecord.id))).all()
+
+
+def result_items(reviews: Sequence[models.ReviewRecord]) -> List[schemas.AutoReplyResultItem]:
+    return [_result_item(review) for review in reviews]
+
+
+def _result_item(review: models.ReviewRecord) -> schemas.AutoReplyResultItem:
+    return schemas.AutoReplyResultItem(
+        review_id=review.id,
+        gbp_review_id=review.gbp_review_id,
+        reviewer=review.reviewer_name or "Unknown",
+        review_snippet=(review.review_text or "")[:120],
+        generated_reply=None,
+        posted=False,
+        saved=False,
+        error=None,
+    )
+
+
+def _reply_params(claude: ClaudeService, engagement: models.ClientEngagement, review: models.ReviewRecord, tone: str) -> dict:
+    return claude.review_reply_params(
+        business_name=engagement.business.name,
+        reviewer_name=review.reviewer_name or "Valued Customer",
+        review_text=review.review_text or "",
+        star_rating=review.star_rating or "THREE",
+        tone=tone,
+        industry=engagement.industry,
+    )
+
+
+async def generate_replies(
+    claude: ClaudeService,
+    engagement: models.ClientEngagement,
+    reviews: Sequence[models.ReviewRecord],
+    items: Sequence[schemas.AutoReplyResultItem],
+    tone: str,
+    on_generated: Optional[OnGenerated] = None,
+    should_stop: Optional[ShouldStop] = None,
+):
+    """Fill in generated_reply (or error) on the result item of each review"""
+    engagement_limit = _engagement_semaphore(engagement.id)
+
+    async def generate(review: models.ReviewRecord, item: schemas.AutoReplyResultItem):
+        async with engagement_limit:
+            if should_stop is not None and await should_stop():
+                item.error = "canceled"
+                return
+            try:
+                reply = await claude.generate_review_reply(
+                    business_name=engagement.business.name,
+                    reviewer_name=review.reviewer_name or "Valued Customer",
+                    review_text=review.review_text or "",
+                    star_rating=review.star_rating or "THREE",
+                    tone=tone,
+                    industry=engagement.industry,
+                )
+                item.generated_reply, item.usage = reply.text, reply.usage
+            except Exception as exc:
+                logger.warning(f"Reply generation failed for review {review.id}: {exc}")
+                item.error = str(exc)
+        if on_generated is not None:
+            await on_generated(item)
+
+    pairs = list(zip(reviews, items))
+    if not pairs:
+        return
+    # A cache entry is only readable once its first response has started, so concurrent
+    # requests sent together would all pay to write it
+    await generate(*pairs[0])
+    await asyncio.gather(*(generate(review, item) for review, item in pairs[1:]))
+
+
+def _batch_custom_id(review: models.ReviewRecord) -> str:
+    return f"review-{review.id}"
+
+
+async def submit_reply_batch(
+    claude: ClaudeService,
+    engagement: models.ClientEngagement,
+    reviews: Sequence[models.ReviewRecord],
+    tone: str,
+) -> str:
+    """Submit one reply request per review as a single Message Batch; returns the batch id"""
+    return await claude.create_batch([
+        {"custom_id": _batch_custom_id(review), "params": _reply_params(claude, engagement, review, tone)}
+        for review in reviews
+    ])
+
+
+async def collect_batch_replies(
+    claude: ClaudeService,
+    batch_id: str,
+    reviews: Sequence[models.ReviewRecord],
+    items: Sequence[schemas.AutoReplyResultItem],
+):
+    """Fill in generated_reply (or error) on the result items from an ended batch"""
+    by_custom_id = {_batch_custom_id(review): item for review, item in zip(reviews, items)}
+    async for custom_id, reply, error in claude.batch_results(batch_id):
+        item = by_custom_id.get(custom_id)
+        if item is None:  # Review was answered while the batch ran
+            continue
+        if reply is not None:
+            item.generated_reply, item.usage = reply.text, reply.usage
+        item.error = error
+    for item in items:
+        if item.generated_reply is None and item.error is None:
+            item.error = "missing from batch results"
+
+
+async def apply_replies(
+    db: AsyncSession,
+    gbp: GBPService,
+    engagement: models.ClientEngagement,
+    reviews: Sequence[models.ReviewRecord],
+    items: Sequence[schemas.AutoReplyResultItem],
+):
+    """Post generated replies to GBP, then record them on the reviews in one commit"""
+    engagement_limit = _engagement_semaphore(engagement.id)
+    can_post = bool(engagement.gbp_account_id and engagement.gbp_location_id)
+
+    async def post(review: models.ReviewRecord, item: schemas.AutoReplyResultItem):
+        if not (can_post and review.gbp_review_id):
+            return
+        async with engagement_limit:
+            try:
+                await gbp.post_reply(
+                    engagement.gbp_account_id,
+                    engagement.gbp_location_id,
+                    review.gbp_review_id,
+                    item.generated_reply,
+                )
+                item.posted = True
+            except Exception as exc:
+                item.error = str(exc)
+
+    pending = [(review, item) for review, item in zip(reviews, items) if item.generated_reply and not item.error]
+    await asyncio.gather(*(post(review, item) for review, item in pending))
+
+    saved = [(review, item) for review, item in pending if not item.error]
+    now = datetime.utcnow()
+    for review, item in saved:
+        review.has_reply = True
+        review.reply_text = item.generated_reply
+        review.reply_generated_by = "ai"
+        review.reply_posted_at = now
+    if saved:
+        await db.commit()
+        for _, item in saved:
+            item.saved = True
+
+
+async def run_auto_reply(
+    db: AsyncSession,
+    claude: ClaudeService,
+    gbp: GBPService,
+    engagement: models.ClientEngagement,
+    reviews: Sequence[models.ReviewRecord],
+    payload: schemas.AutoReplyRequest,
+    on_generated: Optional[OnGenerated] = None,
+    should_stop: Optional[ShouldStop] = None,
+) -> schemas.AutoReplyResult:
+    items = result_items(reviews)
+    await generate_replies(claude, engagement, reviews, items, payload.tone, on_generated, should_stop)
+
+    stopped = should_stop is not None and await should_stop()
+    if not payload.dry_run and not stopped:
+        await apply_replies(db, gbp, engagement, reviews, items)
+
+    return summarize(items, payload.dry_run)
+
+
+def summarize(items: Sequence[schemas.AutoReplyResultItem], dry_run: bool) -> schemas.AutoReplyResult:
+    failed = sum(1 for item in items if item.error)
+    usage = schemas.TokenUsage()
+    for item in items:
+        if item.usage is not None:
+            usage.add(item.usage)
+    return schemas.AutoReplyResult(
+        processed=len(items),
+        succeeded=len(items) - failed,
+        failed=failed,
+        dry_run=dry_run,
+        usage=usage,
+        results=list(items),
+    )
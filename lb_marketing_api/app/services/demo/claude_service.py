@@ -1,16 +1,67 @@
 """
 Generates professional review replies using the Anthropic API (Claude).
+
+Reply calls go through the LLM rate governor (services/llm_governor.py) under the service's
+tenant; Message Batch calls don't, as batches have their own limits.
 """
 
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple, Union
+
 import anthropic
 
+from ... import schemas
+from ..llm_governor import estimate_tokens, governor
+
+REVIEW_REPLY_MODEL = "claude-sonnet-4-20250514"
+
+
+class GeneratedReply(NamedTuple):
+    text: str
+    usage: schemas.TokenUsage
+
+
+def _reply(message) -> GeneratedReply:
+    usage = message.usage
+    return GeneratedReply(
+        text=message.content[0].text,
+        usage=schemas.TokenUsage(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_creation_input_tokens=usage.cache_creation_input_tokens or 0,
+            cache_read_input_tokens=usage.cache_read_input_tokens or 0,
+        ),
+    )
+
+
+def _estimated_tokens(params: dict) -> int:
+    prompt = "".join(block["text"] for block in params["system"])
+    prompt += "".join(message["content"] for message in params["messages"])
+    return estimate_tokens(prompt, params["max_tokens"])
+
+
+def _billed_tokens(usage: schemas.TokenUsage) -> int:
+    # Cache reads don't count toward the input tokens-per-minute limit
+    return usage.input_tokens + usage.cache_creation_input_tokens + usage.output_tokens
+
 
 class ClaudeService:
 
-    def __init__(self, api_key: str):
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+    def __init__(
+        self,
+        client: anthropic.AsyncAnthropic,
+        tenant: Optional[str] = None,
+        max_wait: Optional[float] = None,
+    ):
+        # The app-lifetime client from services/ai_clients.py (shared connection pool)
+        self.client = client
+        # Governor budget the calls count against, and how long they may queue (None = no limit)
+        self.tenant = tenant
+        self.max_wait = max_wait
 
-    async def generate_review_reply(
+    def _slot(self, params: dict):
+        return governor.slot("anthropic", self.tenant, _estimated_tokens(params), self.max_wait)
+
+    def review_reply_params(
         self,
         business_name: str,
         reviewer_name: str,
@@ -18,7 +69,15 @@ class ClaudeService:
         star_rating: str,
         tone: str,
         industry: str | None,
-    ) -> str:
+    ) -> dict:
+        """
+        messages.create parameters for one review reply (also used as a Message Batch request).
+
+        The system prompt depends only on the business, industry and tone, so it is identical for
+        every review of a bulk run and marked for prompt caching; everything specific to the
+        review goes in the user message after the cached prefix. (Prefixes shorter than the
+        model's minimum cacheable length are simply not cached.)
+        """
         sentiment_map = {
             "ONE": "negative",
             "TWO": "negative",
@@ -59,11 +118,68 @@ class ClaudeService:
             f"Review: {review_text}"
         )
 
-        response = await self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=300,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}],
-        )
+        return {
+            "model": REVIEW_REPLY_MODEL,
+            "max_tokens": 300,
+            "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": user_message}],
+        }
+
+    async def generate_review_reply(
+        self,
+        business_name: str,
+        reviewer_name: str,
+        review_text: str,
+        star_rating: str,
+        tone: str,
+        industry: str | None,
+    ) -> GeneratedReply:
+        params = self.review_reply_params(business_name, reviewer_name, review_text, star_rating, tone, industry)
+        async with self._slot(params) as slot:
+            reply = _reply(await self.client.messages.create(**params))
+            slot.charge(_billed_tokens(reply.usage))
+
+        return reply
+
+    async def stream_review_reply(
+        self,
+        business_name: str,
+        reviewer_name: str,
+        review_text: str,
+        star_rating: str,
+        tone: str,
+        industry: str | None,
+    ) -> AsyncIterator[Union[str, GeneratedReply]]:
+        """Yield the reply text in chunks as it is generated, then the complete GeneratedReply"""
+        params = self.review_reply_params(business_name, reviewer_name, review_text, star_rating, tone, industry)
+        async with self._slot(params) as slot, self.client.messages.stream(**params) as stream:
+            async for text in stream.text_stream:
+                yield text
+            reply = _reply(await stream.get_final_message())
+            slot.charge(_billed_tokens(reply.usage))
+        yield reply
+
+    # Message Batches: processed asynchronously (usually within an hour) at half the price
+
+    async def create_batch(self, requests: List[dict]) -> str:
+        """Submit [{"custom_id": ..., "params": {...}}, ...] as one Message Batch; returns its id"""
+        batch = await self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    async def batch_ended(self, batch_id: str) -> bool:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def cancel_batch(self, batch_id: str):
+        await self.client.messages.batches.cancel(batch_id)
 
-        return response.content[0].text
+    async def batch_results(self, batch_id: str) -> AsyncIterator[Tuple[str, Optional[GeneratedReply], Optional[str]]]:
+        """(custom_id, reply, error) for each request of an ended batch"""
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                yield entry.custom_id, _reply(result.message), None
+            elif result.type == "errored":
+                yield entry.custom_id, None, f"{result.error.error.type}: {result.error.error.message}"
+            else:  # canceled / expired
+                yield entry.custom_id, None, result.type
@@ -0,0 +1,111 @@
+"""
+Background job handlers for the review module (see services/jobs.py).
+"""
+
+from sqlalchemy.orm import selectinload
+
+from ... import models, schemas
+from ...config import settings
+from ..ai_clients import ai_clients
+from ..jobs import JobCanceled, JobContext, job_handler
+from .auto_reply import (
+    apply_replies,
+    collect_batch_replies,
+    load_unanswered_reviews,
+    result_items,
+    run_auto_reply,
+    submit_reply_batch,
+    summarize,
+)
+from .claude_service import ClaudeService
+from .gbp_service import GBPService
+from .review_sync import sync_engagement_reviews
+
+
+async def _load_engagement(ctx: JobContext) -> models.ClientEngagement:
+    engagement = await ctx.db.get(
+        models.ClientEngagement, ctx.job.engagement_id,
+        options=[selectinload(models.ClientEngagement.business)],
+    )
+    if engagement is None:
+        raise ValueError(f"Engagement {ctx.job.engagement_id} no longer exists")
+    return engagement
+
+
+def _claude_service(ctx: JobContext) -> ClaudeService:
+    if not settings.ANTHROPIC_API_KEY:
+        raise RuntimeError("ANTHROPIC_API_KEY not configured")
+    # Jobs queue for the rate governor as long as it takes rather than failing
+    return ClaudeService(ai_clients.get_anthropic(), tenant=f"user:{ctx.job.user_id}")
+
+
+@job_handler("review_sync")
+async def review_sync_job(ctx: JobContext) -> dict:
+    engagement = await _load_engagement(ctx)
+    result = await sync_engagement_reviews(ctx.db, GBPService(), engagement)
+    await ctx.set_total(result["synced"])
+    await ctx.advance(result["synced"])
+    return result
+
+
+@job_handler("auto_reply")
+async def auto_reply_job(ctx: JobContext) -> dict:
+    claude = _claude_service(ctx)
+    payload = schemas.AutoReplyRequest(**ctx.params)
+    engagement = await _load_engagement(ctx)
+    reviews = await load_unanswered_reviews(ctx.db, engagement.id)
+    await ctx.set_total(len(reviews))
+
+    async def on_generated(item: schemas.AutoReplyResultItem):
+        if payload.dry_run:
+            # Nothing else happens to a dry-run item, so its result is final
+            await ctx.add_result(item.model_dump(mode="json"))
+        else:
+            await ctx.advance()
+
+    result = await run_auto_reply(
+        ctx.db, claude, GBPService(), engagement, reviews, payload,
+        on_generated=on_generated, should_stop=ctx.canceled,
+    )
+    if not payload.dry_run:
+        # Posted / saved are only known once the batch has been applied
+        for item in result.results:
+            await ctx.add_result(item.model_dump(mode="json"), done=0)
+    return result.model_dump(mode="json", exclude={"results"})
+
+
+@job_handler("auto_reply_batch")
+async def auto_reply_batch_job(ctx: JobContext) -> dict:
+    """
+    First run: submit the unanswered reviews as one Message Batch and defer. Later runs poll
+    the batch (deferring again until it has ended), then apply the replies like auto_reply.
+    """
+    claude = _claude_service(ctx)
+    payload = schemas.AutoReplyRequest(**ctx.params)
+    engagement = await _load_engagement(ctx)
+
+    if ctx.state is None:
+        reviews = await load_unanswered_reviews(ctx.db, engagement.id)
+        await ctx.set_total(len(reviews))
+        if not reviews:
+            return summarize([], payload.dry_run).model_dump(mode="json", exclude={"results"})
+        batch_id = await submit_reply_batch(claude, engagement, reviews, payload.tone)
+        await ctx.save_state({"batch_id": batch_id, "review_ids": [review.id for review in reviews]})
+        ctx.defer(settings.AI_BATCH_POLL_SECONDS)
+
+    batch_id = ctx.state["batch_id"]
+    if await ctx.canceled():
+        await claude.cancel_batch(batch_id)
+        raise JobCanceled()
+    if not await claude.batch_ended(batch_id):
+        ctx.defer(settings.AI_BATCH_POLL_SECONDS)
+
+    # Reviews answered while the batch ran are left alone
+    reviews = await load_unanswered_reviews(ctx.db, engagement.id, ctx.state["review_ids"])
+    items = result_items(reviews)
+    await collect_batch_replies(claude, batch_id, reviews, items)
+    if not payload.dry_run:
+        await apply_replies(ctx.db, GBPService(), engagement, reviews, items)
+    await ctx.add_results([item.model_dump(mode="json") for item in items])
+    return summarize(items, payload.dry_run).model_dump(mode="json", exclude={"results"})
+
@@ -0,0 +1,79 @@
+"""
+Review sync: pulls an engagement's reviews from GBP into ReviewRecord.
+"""
+
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ... import models
+from ...schemas import to_naive_utc
+from .gbp_service import GBPService
+
+# Rows per upsert statement (well under PostgreSQL's 32767 bind parameter limit)
+REVIEW_UPSERT_BATCH = 1000
+
+
+def _review_values(engagement_id: int, rev: dict) -> dict:
+    published_at = None
+    if rev.get("createTime"):
+        try:
+            published_at = to_naive_utc(datetime.fromisoformat(
+                rev["createTime"].replace("Z", "+00:00")
+            ))
+        except ValueError:
+            pass
+
+    reply = rev.get("reviewReply")
+    return dict(
+        engagement_id=engagement_id,
+        gbp_review_id=rev["reviewId"],
+        reviewer_name=rev.get("reviewer", {}).get("displayName"),
+        review_text=rev.get("comment"),
+        star_rating=rev.get("starRating"),
+        review_published_at=published_at,
+        has_reply=reply is not None,
+        reply_text=reply.get("comment") if reply else None,
+        created_at=datetime.utcnow(),
+    )
+
+
+async def upsert_reviews(db: AsyncSession, engagement_id: int, gbp_reviews: List[dict]) -> Tuple[int, int]:
+    """
+    Insert new reviews and record replies on existing ones, one statement per batch.
+    Returns (inserted, updated); rows that didn't change are not counted.
+    """
+    new_count = 0
+    updated_count = 0
+    # A GBP page can repeat a review; the last occurrence wins
+    values = list({rev["reviewId"]: _review_values(engagement_id, rev) for rev in gbp_reviews}.values())
+    for start in range(0, len(values), REVIEW_UPSERT_BATCH):
+        stmt = insert(models.ReviewRecord).values(values[start:start + REVIEW_UPSERT_BATCH])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_review_record_engagement_gbp_review",
+            set_={"has_reply": True, "reply_text": stmt.excluded.reply_text},
+            # Existing records only change when GBP shows a reply we haven't recorded
+            where=stmt.excluded.has_reply & ~models.ReviewRecord.has_reply,
+        ).returning(
+            # xmax is 0 for freshly inserted rows and set for rows updated on conflict
+            literal_column("xmax = 0").label("inserted")
+        )
+        for inserted in (await db.scalars(stmt)):
+            if inserted:
+                new_count += 1
+            else:
+                updated_count += 1
+    return new_count, updated_count
+
+
+async def sync_engagement_reviews(db: AsyncSession, gbp: GBPService, engagement: models.ClientEngagement) -> dict:
+    gbp_reviews = await gbp.list_reviews(
+        engagement.gbp_account_id, engagement.gbp_location_id
+    )
+
+    new_count, updated_count = await upsert_reviews(db, engagement.id, gbp_reviews)
+    await db.commit()
+    return {"synced": len(gbp_reviews), "new": new_count, "updated": updated_count}
@@ -0,0 +1,135 @@
+"""
+Per-platform generation profiles for AI-written social posts.
+
+A profile sizes the completion to the post the platform takes: the output token cap, the
+length the prompt asks for, the sampling temperature and stop sequences that end the
+generation where a single post ends. After generation the post is fitted to the platform's
+length limit: a post cut off by the token cap, or only a little over the limit, is trimmed
+at a sentence or word boundary; one well over the limit is sent back once to be shortened
+(see needs_reask), since trimming it would lose most of the post.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from .. import models
+
+# Where models tend to start a second version or a commentary after the post
+STOP_SEQUENCES: List[str] = ["\n---", "\nOption 2", "\nVersion 2", "\nNote:"]
+
+# Posts up to this fraction over the limit are trimmed; longer ones are re-asked
+TRIM_TOLERANCE = 0.2
+
+# X counts every link as 23 characters (t.co) and characters outside these ranges as 2
+X_URL_LENGTH = 23
+_X_SINGLE_WEIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+_URL_RE = re.compile(r"https?://\S+")
+_QUOTE_PAIRS = {('"', '"'), ("“", "”")}
+_SENTENCE_END_RE = re.compile(r"[.!?…](?:[\"')\]]*)(?=\s|$)")
+
+
+def x_weighted_length(text: str) -> int:
+    """Length of a post as X counts it against the 280 limit"""
+    length = 0
+    position = 0
+    for url in _URL_RE.finditer(text):
+        length += _weighted(text[position:url.start()]) + X_URL_LENGTH
+        position = url.end()
+    return length + _weighted(text[position:])
+
+
+def _weighted(text: str) -> int:
+    return sum(
+        1 if any(low <= ord(char) <= high for low, high in _X_SINGLE_WEIGHT_RANGES) else 2
+        for char in text
+    )
+
+
+class GenerationProfile(NamedTuple):
+    max_chars: int  # Platform limit the fitted post must meet
+    max_completion_tokens: int  # Output cap sized to the post (not to the model's limit)
+    length_hint: str  # Length instruction added to the prompt
+    temperature: float = 0.7
+    weighted: bool = False  # Count length the way X does (x_weighted_length)
+
+    def length(self, text: str) -> int:
+        return x_weighted_length(text) if self.weighted else len(text)
+
+    def completion_params(self) -> Dict:
+        return dict(
+            max_completion_tokens=self.max_completion_tokens,
+            temperature=self.temperature,
+            stop=STOP_SEQUENCES,
+        )
+
+
+PLATFORM_PROFILES: Dict[models.PlatformEnum, GenerationProfile] = {
+    models.PlatformEnum.x: GenerationProfile(
+        max_chars=280, max_completion_tokens=160, weighted=True,
+        length_hint="at most 240 characters including hashtags and emoji",
+    ),
+    models.PlatformEnum.instagram: GenerationProfile(
+        max_chars=2200, max_completion_tokens=600,
+        length_hint="a caption of up to 150 words; put the hook in the first line",
+    ),
+    models.PlatformEnum.tiktok: GenerationProfile(
+        max_chars=2200, max_completion_tokens=300,
+        length_hint="a short caption of one or two sentences plus a few hashtags",
+    ),
+    models.PlatformEnum.facebook: GenerationProfile(
+        max_chars=63206, max_completion_tokens=500,
+        length_hint="up to 120 words",
+    ),
+    models.PlatformEnum.linkedin: GenerationProfile(
+        max_chars=3000, max_completion_tokens=800, temperature=0.6,
+        length_hint="up to 250 words in short paragraphs",
+    ),
+    models.PlatformEnum.youtube: GenerationProfile(
+        max_chars=5000, max_completion_tokens=800,
+        length_hint="a video description of up to 250 words",
+    ),
+}
+
+# Requests that don't name a platform
+DEFAULT_PROFILE = GenerationProfile(
+    max_chars=3000, max_completion_tokens=600,
+    length_hint="up to 150 words",
+)
+
+
+def get_profile(platform: Optional[models.PlatformEnum]) -> GenerationProfile:
+    return PLATFORM_PROFILES.get(platform, DEFAULT_PROFILE) if platform is not None else DEFAULT_PROFILE
+
+
+def clean_post(text: str) -> str:
+    """Strip whitespace and quotation marks wrapped around the whole post"""
+    text = text.strip()
+    if len(text) >= 2 and (text[0], text[-1]) in _QUOTE_PAIRS:
+        text = text[1:-1].strip()
+    return text
+
+
+def needs_reask(text: str, profile: GenerationProfile) -> bool:
+    """True when the post is too far over the limit to trim"""
+    return profile.length(text) > profile.max_chars * (1 + TRIM_TOLERANCE)
+
+
+def trim_post(text: str, profile: GenerationProfile, incomplete: bool = False) -> str:
+    """
+    Cut the post to the profile's limit at the last sentence end that fits (or, failing
+    that, the last word). incomplete=True (cut off by the token cap) also drops the
+    unfinished sentence at the end of a post that is within the limit.
+    """
+    if not incomplete and profile.length(text) <= profile.max_chars:
+        return text
+    end = len(text)
+    while end and profile.length(text[:end]) > profile.max_chars:
+        # Shrink in proportion to the overflow (weighted lengths aren't one per character)
+        end = min(end - 1, end * profile.max_chars // profile.length(text[:end]))
+    fitting = text[:end]
+    sentence_ends = [match.end() for match in _SENTENCE_END_RE.finditer(fitting)]
+    # A sentence end in the first third would throw away most of the post; use a word boundary instead
+    if sentence_ends and sentence_ends[-1] >= len(fitting) // 3:
+        return fitting[:sentence_ends[-1]].strip()
+    space = fitting.rfind(" ")
+    return (fitting[:space] if space > 0 else fitting).rstrip(" ,;:-–—")
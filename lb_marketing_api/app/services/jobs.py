@@ -0,0 +1,275 @@
+"""
+Background jobs for long-running bulk operations.
+
+Endpoints enqueue a Job row and return 202; a worker claims queued jobs with
+SELECT ... FOR UPDATE SKIP LOCKED and runs the handler registered for the job's kind.
+The worker runs in-process (started from the app lifespan) and from the Azure Functions
+timer, so any number of instances can share the queue. Handlers report progress and
+per-item results through a JobContext and check it for cancellation. A handler waiting on
+something external (e.g. a Message Batch) saves a checkpoint and defers the job instead of
+holding a worker; the job is queued again and resumed from its checkpoint later.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import settings
+from ..db import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext"], Awaitable[Optional[dict]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# How often a running job re-reads its cancel flag
+CANCEL_CHECK_SECONDS = 2.0
+
+
+class JobCanceled(Exception):
+    """Raised by handlers that stop early because the job was canceled"""
+    pass
+
+
+class JobDeferred(Exception):
+    """Raised (via JobContext.defer) to put the job back in the queue for a later run"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"deferred for {seconds}s")
+        self.seconds = seconds
+
+
+def job_handler(kind: str):
+    """Register the coroutine that runs jobs of this kind"""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    user_id: int,
+    kind: str,
+    params: Optional[dict] = None,
+    engagement_id: Optional[int] = None,
+) -> models.Job:
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = models.Job(user_id=user_id, engagement_id=engagement_id, kind=kind, params=params or {})
+    db.add(job)
+    await db.commit()
+    wake_worker()
+    return job
+
+
+class JobContext:
+    """What a running handler sees of its job: parameters, progress, results and cancellation"""
+
+    def __init__(self, job: models.Job, db: AsyncSession):
+        self.job = job
+        self.db = db
+        self.params: dict = job.params or {}
+        # Handlers may report from concurrent tasks; the session is used by one at a time
+        self._lock = asyncio.Lock()
+        self._canceled = job.cancel_requested
+        self._cancel_checked_at = 0.0
+
+    @property
+    def state(self) -> Optional[dict]:
+        """Checkpoint saved by an earlier run of this job (None on the first run)"""
+        return self.job.state
+
+    async def save_state(self, state: dict):
+        async with self._lock:
+            self.job.state = state
+            self.job.heartbeat_at = datetime.utcnow()
+            await self.db.commit()
+
+    def defer(self, seconds: float):
+        """Stop this run; the job is resumed (from its saved state) after seconds"""
+        raise JobDeferred(seconds)
+
+    async def set_total(self, total: int):
+        async with self._lock:
+            self.job.progress_total = total
+            self.job.heartbeat_at = datetime.utcnow()
+            await self.db.commit()
+
+    async def add_result(self, data: dict, done: int = 1):
+        """Record one item's outcome and advance progress"""
+        async with self._lock:
+            self.db.add(models.JobResult(job_id=self.job.id, data=data))
+            self.job.progress_done += done
+            self.job.heartbeat_at = datetime.utcnow()
+            await self.db.commit()
+
+    async def add_results(self, items: List[dict]):
+        """Record several finished items in one commit"""
+        async with self._lock:
+            self.db.add_all(models.JobResult(job_id=self.job.id, data=data) for data in items)
+            self.job.progress_done += len(items)
+            self.job.heartbeat_at = datetime.utcnow()
+            await self.db.commit()
+
+    async def advance(self, done: int = 1):
+        async with self._lock:
+            self.job.progress_done += done
+            self.job.heartbeat_at = datetime.utcnow()
+            await self.db.commit()
+
+    async def canceled(self) -> bool:
+        """True once cancellation was requested (checked against the database every few seconds)"""
+        if self._canceled:
+            return True
+        now = time.monotonic()
+        if now - self._cancel_checked_at >= CANCEL_CHECK_SECONDS:
+            self._cancel_checked_at = now
+            async with self._lock:
+                self._canceled = bool(await self.db.scalar(
+                    select(models.Job.cancel_requested).where(models.Job.id == self.job.id)
+                ))
+        return self._canceled
+
+    async def raise_if_canceled(self):
+        if await self.canceled():
+            raise JobCanceled()
+
+
+async def claim_next_job(db: AsyncSession) -> Optional[models.Job]:
+    """Take the oldest queued job that is due (or a running one whose worker stopped heartbeating)"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    job = await db.scalar(
+        select(models.Job)
+        .where(or_(
+            (models.Job.status == models.JobStatus.queued)
+            & or_(models.Job.run_after.is_(None), models.Job.run_after <= now),
+            (models.Job.status == models.JobStatus.running) & (models.Job.heartbeat_at < stale_before),
+        ))
+        .order_by(models.Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job is None:
+        await db.rollback()
+        return None
+    if job.status == models.JobStatus.running:
+        # Reclaimed from a worker that died: the handler starts over, so drop what it reported
+        await db.execute(delete(models.JobResult).where(models.JobResult.job_id == job.id))
+        job.progress_done = 0
+    job.status = models.JobStatus.running
+    job.started_at = job.started_at or now
+    job.heartbeat_at = now
+    await db.commit()
+    return job
+
+
+async def run_job(job: models.Job, db: AsyncSession):
+    # Captured up front: a rollback expires the job and async sessions can't lazy-load
+    job_id, kind = job.id, job.kind
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        job.status = models.JobStatus.failed
+        job.error = f"Unknown job kind: {kind}"
+    elif job.cancel_requested and job.state is None:
+        job.status = models.JobStatus.canceled
+    else:
+        # A job with saved state still runs once canceled, so the handler can clean up
+        context = JobContext(job, db)
+        try:
+            job.result = await handler(context)
+            job.status = models.JobStatus.canceled if await context.canceled() else models.JobStatus.succeeded
+        except JobDeferred as deferred:
+            job.status = models.JobStatus.queued
+            job.run_after = datetime.utcnow() + timedelta(seconds=deferred.seconds)
+            await db.commit()
+            logger.info(f"Job {job_id} ({kind}) deferred for {deferred.seconds}s")
+            return
+        except JobCanceled:
+            job.status = models.JobStatus.canceled
+        except Exception as exc:
+            logger.error(f"Job {job_id} ({kind}) failed: {exc}", exc_info=True)
+            await db.rollback()
+            job.status = models.JobStatus.failed
+            job.error = str(exc)
+    job.finished_at = datetime.utcnow()
+    await db.commit()
+    logger.info(f"Job {job_id} ({kind}) finished: {job.status.value}")
+
+
+async def run_next_job() -> bool:
+    """Claim and run one job; False when the queue is empty"""
+    async with AsyncSessionLocal() as db:
+        job = await claim_next_job(db)
+        if job is None:
+            return False
+        await run_job(job, db)
+        return True
+
+
+async def run_pending_jobs(max_seconds: float) -> int:
+    """Run queued jobs until the queue is empty or max_seconds have passed (timer trigger)"""
+    deadline = time.monotonic() + max_seconds
+    count = 0
+    while time.monotonic() < deadline and await run_next_job():
+        count += 1
+    return count
+
+
+async def request_cancel(db: AsyncSession, job: models.Job):
+    """
+    Queued jobs that never ran are canceled immediately. Running ones stop at their next
+    cancellation check; deferred ones are resumed right away so the handler can clean up.
+    """
+    canceled = None
+    if job.status == models.JobStatus.queued and job.state is None:
+        canceled = await db.execute(
+            update(models.Job)
+            .where(models.Job.id == job.id, models.Job.status == models.JobStatus.queued)
+            .values(status=models.JobStatus.canceled, cancel_requested=True, finished_at=datetime.utcnow())
+        )
+    # rowcount 0: a worker claimed the job in the meantime
+    if canceled is None or canceled.rowcount == 0:
+        job.cancel_requested = True
+        job.run_after = None
+        wake_worker()
+    await db.commit()
+    await db.refresh(job)
+
+
+# In-process worker
+
+_wake_event: Optional[asyncio.Event] = None
+
+
+def wake_worker():
+    """Let the in-process worker pick up a new job without waiting for the next poll"""
+    if _wake_event is not None:
+        _wake_event.set()
+
+
+async def worker_loop(stop: asyncio.Event):
+    global _wake_event
+    _wake_event = asyncio.Event()
+    logger.info("Job worker started")
+    while not stop.is_set():
+        try:
+            if await run_next_job():
+                continue
+        except Exception as exc:
+            logger.error(f"Job worker error: {exc}", exc_info=True)
+        _wake_event.clear()
+        try:
+            await asyncio.wait_for(_wake_event.wait(), timeout=settings.JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    _wake_event = None
+    logger.info("Job worker stopped")
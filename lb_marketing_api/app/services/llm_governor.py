@@ -0,0 +1,307 @@
+"""
+Rate governor for LLM API calls.
+
+Every Anthropic and Azure OpenAI call takes a slot from the governor first. A slot is
+granted when it fits the provider's concurrency limit and its requests-per-minute and
+tokens-per-minute budgets, and the same for the calling tenant (a user or client). Calls
+that don't fit wait instead of failing: in FIFO order within a tenant, and across tenants
+in arrival order among those whose own budget has room, so a tenant over its budget doesn't
+hold up the others. Only a call that would wait longer than its max_wait is refused with
+GovernorBusy, which carries a Retry-After hint.
+
+Budgets are sliding 60-second windows. A call reserves an estimate of its tokens (prompt
+plus max output) and is charged its actual usage once it returns. When a provider answers
+429 anyway, that provider is paused for its Retry-After so queued calls don't pile more
+errors on top. Limits are per process; configure them as the account limit divided by
+the number of instances. A limit of 0 disables it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+# Pause after a 429 that came without a Retry-After header
+DEFAULT_COOLDOWN_SECONDS = 5.0
+# Retry-After hint when a refused call was waiting on running calls rather than a budget
+BUSY_RETRY_SECONDS = 5.0
+# Tenant budgets unused for this long are dropped
+TENANT_IDLE_SECONDS = 600.0
+
+
+class GovernorBusy(Exception):
+    """The call could not get a slot within its max_wait"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is at capacity; retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str, max_output_tokens: int) -> int:
+    """Rough reservation for a call: ~4 characters per prompt token plus the output cap"""
+    return len(text) // 4 + max_output_tokens
+
+
+class _Window:
+    """Requests and tokens used over the last minute"""
+
+    def __init__(self, rpm: int, tpm: int, concurrency: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.events: Deque[List[float]] = deque()  # [timestamp, tokens]
+        self.tokens = 0
+        self.last_used = time.monotonic()
+
+    def _trim(self, now: float):
+        while self.events and self.events[0][0] <= now - WINDOW_SECONDS:
+            self.tokens -= self.events.popleft()[1]
+
+    def wait_time(self, now: float, tokens: int) -> Optional[float]:
+        """Seconds until a call of this size fits (0 = now, None = when a running call finishes)"""
+        self._trim(now)
+        if self.concurrency and self.in_flight >= self.concurrency:
+            return None
+        wait = 0.0
+        if self.rpm and len(self.events) >= self.rpm:
+            wait = self.events[len(self.events) - self.rpm][0] + WINDOW_SECONDS - now
+        # A call larger than the whole budget runs once the window is empty
+        if self.tpm and self.tokens + tokens > self.tpm and self.events:
+            excess = self.tokens + min(tokens, self.tpm) - self.tpm
+            for timestamp, used in self.events:
+                excess -= used
+                if excess <= 0:
+                    wait = max(wait, timestamp + WINDOW_SECONDS - now)
+                    break
+        return wait
+
+    def add(self, now: float, tokens: int) -> List[float]:
+        event = [now, tokens]
+        self.events.append(event)
+        self.tokens += tokens
+        self.in_flight += 1
+        self.last_used = now
+        return event
+
+
+class _ProviderMetrics:
+
+    def __init__(self):
+        self.calls = 0
+        self.queued_calls = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def snapshot(self, queue_length: int) -> dict:
+        return {
+            "calls": self.calls,
+            "queued_calls": self.queued_calls,
+            "queue_length": queue_length,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": round(self.total_wait_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class Slot:
+    """
+    One governed call: `async with governor.slot(...) as slot:` waits for the slot, and
+    slot.charge(tokens) replaces the reserved estimate with the actual usage.
+    """
+
+    def __init__(self, provider: "_Provider", tenant: Optional[str], tokens: int, max_wait: Optional[float]):
+        self._provider = provider
+        self._tenant = tenant
+        self._tokens = tokens
+        self._max_wait = max_wait
+        self._windows: List[_Window] = []
+        self._events: List[List[float]] = []
+
+    def charge(self, tokens: int):
+        window_start = time.monotonic() - WINDOW_SECONDS
+        for window, event in zip(self._windows, self._events):
+            if event[0] > window_start:  # Still counted in the window
+                window.tokens += tokens - int(event[1])
+            event[1] = tokens
+
+    async def __aenter__(self) -> "Slot":
+        self._windows, self._events = await self._provider.acquire(self._tenant, self._tokens, self._max_wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc is not None and getattr(exc, "status_code", None) == 429:
+            self._provider.cool_down(_retry_after(exc))
+        self.release()
+
+    def release(self):
+        """Give the slot back; for slots held past the `async with` (idempotent)"""
+        windows, self._windows = self._windows, []
+        if windows:
+            self._provider.release(windows)
+
+
+def _retry_after(exc: Exception) -> float:
+    response = getattr(exc, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_COOLDOWN_SECONDS
+
+
+class _Ticket:
+    """A queued call"""
+    __slots__ = ("tenant", "tokens")
+
+    def __init__(self, tenant: Optional[str], tokens: int):
+        self.tenant = tenant
+        self.tokens = tokens
+
+
+class _Provider:
+
+    def __init__(self, name: str, rpm: int, tpm: int, concurrency: int):
+        self.name = name
+        self.window = _Window(rpm, tpm, concurrency)
+        self.tenants: Dict[str, _Window] = {}
+        self.queue: Deque[_Ticket] = deque()
+        self.paused_until = 0.0
+        self.metrics = _ProviderMetrics()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _tenant(self, tenant: str, now: float) -> _Window:
+        window = self.tenants.get(tenant)
+        if window is None:
+            if len(self.tenants) > 1000:
+                self.tenants = {
+                    key: w for key, w in self.tenants.items()
+                    if w.in_flight or w.last_used > now - TENANT_IDLE_SECONDS
+                }
+            window = _Window(settings.AI_TENANT_RPM, settings.AI_TENANT_TPM, settings.AI_TENANT_CONCURRENCY)
+            self.tenants[tenant] = window
+        return window
+
+    def _notify(self):
+        """Wake every waiter; later waiters wait on a fresh event"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._wakeup = None
+
+    def cool_down(self, seconds: float):
+        self.metrics.rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"{self.name} returned 429; pausing calls for {seconds:.1f}s")
+
+    def release(self, windows: List[_Window]):
+        for window in windows:
+            window.in_flight -= 1
+        self._notify()
+
+    def _next_up(self, now: float) -> Optional[_Ticket]:
+        """
+        The call that gets the provider next: the earliest waiter that is first in its
+        tenant's queue and fits its tenant's budget
+        """
+        seen = set()
+        for ticket in self.queue:
+            if ticket.tenant in seen:
+                continue
+            seen.add(ticket.tenant)
+            if ticket.tenant is None or self._tenant(ticket.tenant, now).wait_time(now, ticket.tokens) == 0:
+                return ticket
+        return None
+
+    async def acquire(self, tenant: Optional[str], tokens: int, max_wait: Optional[float]):
+        """Wait until the call fits; returns the windows it counts against and its events in them"""
+        start = time.monotonic()
+        deadline = None if max_wait is None else start + max_wait
+        ticket = _Ticket(tenant, tokens)
+        self.queue.append(ticket)
+        try:
+            while True:
+                now = time.monotonic()
+                windows = [self.window] + ([self._tenant(tenant, now)] if tenant else [])
+                wait: Optional[float] = None
+                if self._next_up(now) is ticket:
+                    waits = [self.window.wait_time(now, tokens), self.paused_until - now]
+                    wait = None if None in waits else max(waits)
+                    if wait is not None and wait <= 0:
+                        break
+                elif tenant and next(t for t in self.queue if t.tenant == tenant) is ticket:
+                    # Held back by its own tenant's budget (or running calls) only
+                    wait = windows[1].wait_time(now, tokens) or None
+                if deadline is not None and (now >= deadline or (wait is not None and now + wait > deadline)):
+                    self.metrics.rejected += 1
+                    raise GovernorBusy(self.name, wait if wait is not None else BUSY_RETRY_SECONDS)
+                # Woken early when a call finishes or leaves the queue
+                if self._wakeup is None:
+                    self._wakeup = asyncio.Event()
+                timeout = wait
+                if deadline is not None:
+                    timeout = deadline - now if timeout is None else min(timeout, deadline - now)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.001) if timeout is not None else None)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.queue.remove(ticket)
+            self._notify()
+
+        waited = time.monotonic() - start
+        self.metrics.calls += 1
+        if waited > 0.001:
+            self.metrics.queued_calls += 1
+        self.metrics.total_wait_seconds += waited
+        self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, waited)
+        return windows, [window.add(now, tokens) for window in windows]
+
+
+class LLMGovernor:
+
+    def __init__(self):
+        # Waiters and events belong to the event loop they were created on
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._providers: Dict[str, _Provider] = {}
+
+    def _provider(self, name: str) -> _Provider:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._providers = {}
+        provider = self._providers.get(name)
+        if provider is None:
+            limits = {
+                "anthropic": (settings.ANTHROPIC_RPM, settings.ANTHROPIC_TPM, settings.ANTHROPIC_MAX_CONCURRENCY),
+                "azure_openai": (settings.AZURE_OPENAI_RPM, settings.AZURE_OPENAI_TPM, settings.AZURE_OPENAI_MAX_CONCURRENCY),
+            }[name]
+            provider = self._providers[name] = _Provider(name, *limits)
+        return provider
+
+    def slot(
+        self,
+        provider: str,
+        tenant: Optional[str] = None,
+        tokens: int = 0,
+        max_wait: Optional[float] = None,
+    ) -> Slot:
+        """
+        A call to provider ("anthropic" / "azure_openai") reserving tokens, for `async with`.
+        max_wait=None waits as long as it takes (background jobs).
+        """
+        return Slot(self._provider(provider), tenant, tokens, max_wait)
+
+    def snapshot(self) -> dict:
+        return {name: p.metrics.snapshot(len(p.queue)) for name, p in self._providers.items()}
+
+
+governor = LLMGovernor()
@@ -10,7 +10,7 @@ import io
 import logging
 
 from .. import models
-from ..services.storage import storage_service
+from ..services.renditions import get_publish_media
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -455,24 +455,10 @@ def post_scheduled_post(
     if scheduled_post.media_asset_id:
         media_asset = db.get(models.MediaAsset, scheduled_post.media_asset_id)
         if media_asset:
-            # Extract container and blob name from storage_url
-            # Format: "{container_name}/{userId}/{filename}"
-            # Container name comes from AZURE_STORAGE_USER_MEDIA_CONTAINER_NAME config
-            storage_url_parts = media_asset.storage_url.split("/", 1)
-            if len(storage_url_parts) == 2:
-                container_name = storage_url_parts[0]
-                blob_name = storage_url_parts[1]  # This is {userId}/{filename}
-            else:
-                # Fallback: assume it's in the default container
-                container_name = None
-                blob_name = media_asset.storage_url
-            
-            # Fetch media from Azure Storage
-            media_data = storage_service.get_blob(blob_name, container_name=container_name)
-            # add logger line to print out media_data
-            logger.info(f"Media data: {media_data}")
+            # Prefer the platform-optimized rendition (smaller upload), falling back to the original
+            media_data, media_type = get_publish_media(db, media_asset, scheduled_post.platform)
             if media_data:
-                media_type = media_asset.mime_type
+                logger.info(f"Media data: {len(media_data)} bytes ({media_type})")
             else:
                 raise PlatformPostError(
                     f"Failed to retrieve media from storage: {media_asset.storage_url}"
@@ -0,0 +1,285 @@
+"""
+Image rendition service.
+Generates platform-appropriate variants (thumbnail, X-optimal, TikTok cover) of uploaded
+media, stores them next to the original blob and picks the smallest adequate one to serve.
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..db import SessionLocal
+from .storage import storage_service, split_storage_url
+
+logger = logging.getLogger(__name__)
+
+
+class RenditionError(Exception):
+    """Raised when a rendition cannot be generated or stored"""
+    pass
+
+
+class RenditionSpec(NamedTuple):
+    width: int
+    height: int
+    crop: bool  # True: fill the box and center-crop; False: fit inside the box
+    format: str  # Pillow format name
+    quality: int
+    max_bytes: Optional[int] = None  # Platform upload limit, if any
+
+
+RENDITION_SPECS: Dict[str, RenditionSpec] = {
+    # Small preview for the UI
+    "thumbnail": RenditionSpec(width=320, height=320, crop=False, format="WEBP", quality=80),
+    # X displays single images at up to 1200x675 (16:9); images must be under 5 MB
+    "x": RenditionSpec(width=1600, height=900, crop=False, format="JPEG", quality=85, max_bytes=5 * 1024 * 1024),
+    # TikTok covers are 9:16 portrait
+    "tiktok_cover": RenditionSpec(width=1080, height=1920, crop=True, format="JPEG", quality=85),
+}
+
+# Rendition used when publishing to each platform
+PLATFORM_RENDITIONS: Dict[models.PlatformEnum, str] = {
+    models.PlatformEnum.x: "x",
+    models.PlatformEnum.tiktok: "tiktok_cover",
+}
+
+_FORMAT_INFO: Dict[str, Tuple[str, str]] = {
+    "JPEG": ("image/jpeg", ".jpg"),
+    "PNG": ("image/png", ".png"),
+    "WEBP": ("image/webp", ".webp"),
+}
+
+_executor = ThreadPoolExecutor(max_workers=max(settings.RENDITION_WORKERS, 1), thread_name_prefix="rendition")
+
+
+class RenderedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    extension: str
+    width: int
+    height: int
+
+
+def render(original: bytes, spec: RenditionSpec) -> RenderedImage:
+    """
+    Resize and re-encode an image according to a rendition spec.
+    
+    Images are never upscaled. Animated images are rendered from their first frame.
+    
+    Raises:
+        RenditionError: If the image cannot be decoded or encoded
+    """
+    try:
+        with Image.open(io.BytesIO(original)) as img:
+            img.seek(0)
+            img = ImageOps.exif_transpose(img)
+            
+            if spec.crop:
+                # Shrink the target box (keeping its aspect ratio) rather than upscaling small images
+                scale = min(1.0, img.width / spec.width, img.height / spec.height)
+                target = (max(round(spec.width * scale), 1), max(round(spec.height * scale), 1))
+                img = ImageOps.fit(img, target, method=Image.Resampling.LANCZOS)
+            else:
+                img.thumbnail((spec.width, spec.height), Image.Resampling.LANCZOS)
+            
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            output_format = spec.format
+            if output_format == "JPEG" and has_alpha and spec.max_bytes is None:
+                # Keep transparency where the platform doesn't force JPEG
+                output_format = "PNG"
+            
+            if output_format == "JPEG":
+                if has_alpha:
+                    rgba = img.convert("RGBA")
+                    background = Image.new("RGB", img.size, (255, 255, 255))
+                    background.paste(rgba, mask=rgba.split()[-1])
+                    img = background
+                else:
+                    img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            
+            quality = spec.quality
+            while True:
+                buffer = io.BytesIO()
+                save_kwargs = {"optimize": True}
+                if output_format in ("JPEG", "WEBP"):
+                    save_kwargs["quality"] = quality
+                if output_format == "JPEG":
+                    save_kwargs["progressive"] = True
+                img.save(buffer, format=output_format, **save_kwargs)
+                data = buffer.getvalue()
+                
+                if spec.max_bytes is None or len(data) <= spec.max_bytes or quality <= 50 or output_format == "PNG":
+                    break
+                quality -= 10
+            
+            mime_type, extension = _FORMAT_INFO[output_format]
+            return RenderedImage(data, mime_type, extension, img.width, img.height)
+    except RenditionError:
+        raise
+    except Exception as e:
+        raise RenditionError(f"Failed to render image: {e}") from e
+
+
+def rendition_blob_name(original_blob_name: str, name: str, extension: str) -> str:
+    """
+    Rendition blobs live next to the content-addressed original:
+    sha256/{first 2 hex chars}/{hash}.{name}{ext}
+    """
+    stem, _ = os.path.splitext(original_blob_name)
+    return f"{stem}.{name}{extension}"
+
+
+def _store_rendition(
+    media_asset_id: int,
+    original_storage_url: str,
+    name: str,
+    original: bytes
+) -> dict:
+    """Render and upload a single rendition. Returns the column values for MediaRendition."""
+    container_name, blob_name = split_storage_url(original_storage_url)
+    rendered = render(original, RENDITION_SPECS[name])
+    rendition_blob = rendition_blob_name(blob_name, name, rendered.extension)
+    
+    if not storage_service.upload_blob(
+        blob_name=rendition_blob,
+        data=rendered.data,
+        content_type=rendered.mime_type,
+        container_name=container_name
+    ):
+        raise RenditionError(f"Failed to upload rendition {name} for media asset {media_asset_id}")
+    
+    storage_url = f"{container_name}/{rendition_blob}" if container_name is not None else rendition_blob
+    return {
+        "media_asset_id": media_asset_id,
+        "name": name,
+        "storage_url": storage_url,
+        "mime_type": rendered.mime_type,
+        "width": rendered.width,
+        "height": rendered.height,
+        "byte_size": len(rendered.data),
+    }
+
+
+def generate_renditions(media_asset_id: int, original: bytes, names: Optional[List[str]] = None) -> None:
+    """
+    Generate and store renditions for a media asset using the rendition worker pool.
+    
+    Meant to run as a background task after upload; opens its own database session.
+    Failures are logged and leave the asset usable via its original blob.
+    """
+    names = names or list(RENDITION_SPECS)
+    db = SessionLocal()
+    try:
+        media_asset = db.get(models.MediaAsset, media_asset_id)
+        if not media_asset:
+            logger.warning(f"Media asset {media_asset_id} not found, skipping renditions")
+            return
+        
+        futures = {
+            name: _executor.submit(_store_rendition, media_asset.id, media_asset.storage_url, name, original)
+            for name in names
+        }
+        for name, future in futures.items():
+            try:
+                values = future.result()
+            except Exception as e:
+                logger.error(f"Rendition {name} failed for media asset {media_asset_id}: {e}")
+                continue
+            db.add(models.MediaRendition(**values))
+        db.commit()
+        logger.info(f"Generated renditions for media asset {media_asset_id}: {', '.join(futures)}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to generate renditions for media asset {media_asset_id}: {e}")
+    finally:
+        db.close()
+
+
+def _find_rendition(db: Session, media_asset_id: int, name: str) -> Optional[models.MediaRendition]:
+    return db.query(models.MediaRendition).filter(
+        models.MediaRendition.media_asset_id == media_asset_id,
+        models.MediaRendition.name == name
+    ).first()
+
+
+def get_or_create_rendition(db: Session, media_asset: models.MediaAsset, name: str) -> Optional[models.MediaRendition]:
+    """
+    Return the stored rendition, generating it from the original on a miss.
+    
+    Returns None if the original can't be read or rendered (callers fall back to the original).
+    """
+    rendition = _find_rendition(db, media_asset.id, name)
+    if rendition:
+        return rendition
+    
+    container_name, blob_name = split_storage_url(media_asset.storage_url)
+    original = storage_service.get_blob(blob_name, container_name=container_name)
+    if original is None:
+        return None
+    
+    try:
+        values = _executor.submit(
+            _store_rendition, media_asset.id, media_asset.storage_url, name, original
+        ).result()
+    except RenditionError as e:
+        logger.error(f"Rendition {name} failed for media asset {media_asset.id}: {e}")
+        return None
+    
+    media_asset_id = media_asset.id
+    rendition = models.MediaRendition(**values)
+    db.add(rendition)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Generated concurrently by another request (or the background task); the blob
+        # names match, so keep the row that won
+        db.rollback()
+        return _find_rendition(db, media_asset_id, name)
+    db.refresh(rendition)
+    return rendition
+
+
+def select_rendition(
+    renditions: List[models.MediaRendition],
+    min_width: int = 0,
+    min_height: int = 0
+) -> Optional[models.MediaRendition]:
+    """Pick the smallest rendition that covers the requested box, or None if none is large enough"""
+    adequate = [r for r in renditions if r.width >= min_width and r.height >= min_height]
+    if not adequate:
+        return None
+    return min(adequate, key=lambda r: r.byte_size)
+
+
+def get_publish_media(
+    db: Session,
+    media_asset: models.MediaAsset,
+    platform: models.PlatformEnum
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Return (bytes, mime_type) to upload when publishing to a platform.
+    
+    Uses the platform's pre-optimized rendition when possible. Animated GIFs are
+    published as-is so they keep their animation.
+    """
+    name = PLATFORM_RENDITIONS.get(platform)
+    if name and media_asset.mime_type != "image/gif":
+        rendition = get_or_create_rendition(db, media_asset, name)
+        if rendition:
+            container_name, blob_name = split_storage_url(rendition.storage_url)
+            data = storage_service.get_blob(blob_name, container_name=container_name)
+            if data is not None:
+                return data, rendition.mime_type
+    
+    container_name, blob_name = split_storage_url(media_asset.storage_url)
+    return storage_service.get_blob(blob_name, container_name=container_name), media_asset.mime_type
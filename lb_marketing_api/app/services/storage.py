@@ -2,8 +2,10 @@
 Azure Blob Storage service for managing PDF files and user media assets
 """
 import logging
-from typing import Optional
-from azure.storage.blob import BlobServiceClient, BlobClient, ContentSettings
+import threading
+from typing import Optional, Set, Tuple
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, BlobClient, BlobProperties, ContentSettings
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -19,36 +21,55 @@ class StorageService:
         self.container_name = settings.AZURE_STORAGE_CONTAINER_NAME
         self.user_media_container_name = settings.AZURE_STORAGE_USER_MEDIA_CONTAINER_NAME
         
-        if not self.connection_string and not (self.account_name and self.account_key):
-            logger.warning(
-                "Azure Storage not configured. Either AZURE_STORAGE_CONNECTION_STRING "
-                "or AZURE_STORAGE_ACCOUNT_NAME + AZURE_STORAGE_ACCOUNT_KEY must be set."
-            )
-            self.blob_service_client = None
-        else:
-            try:
-                if self.connection_string:
-                    self.blob_service_client = BlobServiceClient.from_connection_string(
-                        self.connection_string
-                    )
-                else:
-                    account_url = f"https://{self.account_name}.blob.core.windows.net"
-                    self.blob_service_client = BlobServiceClient(
-                        account_url=account_url,
-                        credential=self.account_key
-                    )
-                # Ensure container exists
-                self._ensure_container_exists()
-            except Exception as e:
-                logger.error(f"Failed to initialize Azure Storage client: {e}")
-                self.blob_service_client = None
+        # The client is built on first use so importing this module never touches the network
+        self._blob_service_client: Optional[BlobServiceClient] = None
+        self._client_initialized = False
+        # Containers already verified/created by this process
+        self._ensured_containers: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def blob_service_client(self) -> Optional[BlobServiceClient]:
+        """Lazily construct the BlobServiceClient, or None if storage is not configured"""
+        if self._client_initialized:
+            return self._blob_service_client
+        
+        with self._lock:
+            if self._client_initialized:
+                return self._blob_service_client
+            
+            if not self.connection_string and not (self.account_name and self.account_key):
+                logger.warning(
+                    "Azure Storage not configured. Either AZURE_STORAGE_CONNECTION_STRING "
+                    "or AZURE_STORAGE_ACCOUNT_NAME + AZURE_STORAGE_ACCOUNT_KEY must be set."
+                )
+            else:
+                try:
+                    if self.connection_string:
+                        self._blob_service_client = BlobServiceClient.from_connection_string(
+                            self.connection_string
+                        )
+                    else:
+                        account_url = f"https://{self.account_name}.blob.core.windows.net"
+                        self._blob_service_client = BlobServiceClient(
+                            account_url=account_url,
+                            credential=self.account_key
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to initialize Azure Storage client: {e}")
+                    self._blob_service_client = None
+            
+            self._client_initialized = True
+            return self._blob_service_client
     
     def _ensure_container_exists(self, container_name: Optional[str] = None):
-        """Create container if it doesn't exist"""
+        """Create container if it doesn't exist (checked at most once per container)"""
         if not self.blob_service_client:
             return
         
         container = container_name or self.container_name
+        if not container or container in self._ensured_containers:
+            return
         
         try:
             container_client = self.blob_service_client.get_container_client(
@@ -57,13 +78,30 @@ class StorageService:
             if not container_client.exists():
                 container_client.create_container()
                 logger.info(f"Created container: {container}")
+            self._ensured_containers.add(container)
+        except ResourceExistsError:
+            # Created concurrently by another instance
+            self._ensured_containers.add(container)
         except Exception as e:
             logger.error(f"Failed to ensure container exists: {e}")
     
+    def ensure_containers(self):
+        """
+        Verify the configured containers exist.
+        
+        Intended to run off the request path (e.g. in a background task at startup);
+        uploads still call _ensure_container_exists, which is a no-op once memoized.
+        """
+        for container in (self.container_name, self.user_media_container_name):
+            self._ensure_container_exists(container)
+    
     def get_blob(self, blob_name: str, container_name: Optional[str] = None) -> Optional[bytes]:
         """
         Download a blob from Azure Storage
         
+        Issues a single download request; a missing blob is reported by the
+        service as ResourceNotFoundError rather than checked up front.
+        
         Args:
             blob_name: Name of the blob to download
             container_name: Optional container name (defaults to configured container)
@@ -83,18 +121,16 @@ class StorageService:
                 blob=blob_name
             )
             
-            if not blob_client.exists():
+            try:
+                download_stream = blob_client.download_blob()
+            except ResourceNotFoundError:
                 logger.warning(f"Blob not found: {blob_name}")
                 return None
             
-            # Get blob properties to check size
-            blob_properties = blob_client.get_blob_properties()
-            expected_size = blob_properties.size
-            logger.info(f"Blob {blob_name} exists, expected size: {expected_size} bytes")
-            
-            download_stream = blob_client.download_blob()
-            pdf_data = download_stream.readall()
-            actual_size = len(pdf_data)
+            # Size comes from the download response, no separate properties call
+            expected_size = download_stream.properties.size
+            blob_data = download_stream.readall()
+            actual_size = len(blob_data)
             
             logger.info(f"Downloaded {blob_name}: {actual_size} bytes (expected: {expected_size} bytes)")
             
@@ -104,13 +140,61 @@ class StorageService:
                     f"expected {expected_size} bytes"
                 )
             
-            return pdf_data
+            return blob_data
         except Exception as e:
             logger.error(f"Failed to download blob {blob_name}: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return None
     
+    def get_blob_range(
+        self,
+        blob_name: str,
+        offset: int,
+        length: int,
+        container_name: Optional[str] = None
+    ) -> Optional[Tuple[bytes, BlobProperties, int]]:
+        """
+        Download a byte range of a blob from Azure Storage
+        
+        Useful for header/footer probes where downloading the whole blob is wasteful.
+        On a ranged download the SDK sets properties.size to the size of the range, so the
+        full blob size is returned separately (parsed from Content-Range, "bytes 0-19/N").
+        
+        Args:
+            blob_name: Name of the blob to read
+            offset: Start of the range in bytes
+            length: Number of bytes to read
+            container_name: Optional container name (defaults to configured container)
+            
+        Returns:
+            Tuple of (range content, blob properties, full blob size), or None if not found or error
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage client not initialized")
+            return None
+        
+        container = container_name or self.container_name
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=container,
+                blob=blob_name
+            )
+            download_stream = blob_client.download_blob(offset=offset, length=length)
+            data = download_stream.readall()
+            props = download_stream.properties
+            content_range = props.content_range or ""
+            total = content_range.rpartition("/")[2]
+            size = int(total) if total.isdigit() else props.size
+            return data, props, size
+        except ResourceNotFoundError:
+            logger.warning(f"Blob not found: {blob_name}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read range of blob {blob_name}: {e}")
+            return None
+    
     def upload_blob(self, blob_name: str, data: bytes, content_type: str = "application/pdf", container_name: Optional[str] = None) -> bool:
         """
         Upload a blob to Azure Storage
@@ -130,9 +214,8 @@ class StorageService:
         
         container = container_name or self.container_name
         
-        # Ensure container exists if it's different from the default
-        if container != self.container_name:
-            self._ensure_container_exists(container)
+        # Memoized per container, so only the first upload pays the round-trip
+        self._ensure_container_exists(container)
         
         try:
             blob_client = self.blob_service_client.get_blob_client(
@@ -151,6 +234,33 @@ class StorageService:
             logger.error(f"Failed to upload blob {blob_name}: {e}")
             return False
     
+    def delete_blob(self, blob_name: str, container_name: Optional[str] = None) -> bool:
+        """
+        Delete a blob from Azure Storage
+        
+        Returns:
+            True if the blob was deleted or did not exist, False on error
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage client not initialized")
+            return False
+        
+        container = container_name or self.container_name
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=container,
+                blob=blob_name
+            )
+            blob_client.delete_blob()
+            logger.info(f"Deleted blob: {blob_name}")
+            return True
+        except ResourceNotFoundError:
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete blob {blob_name}: {e}")
+            return False
+    
     def blob_exists(self, blob_name: str, container_name: Optional[str] = None) -> bool:
         """Check if a blob exists"""
         if not self.blob_service_client:
@@ -169,6 +279,19 @@ class StorageService:
             return False
 
 
-# Global instance
+def split_storage_url(storage_url: str) -> Tuple[Optional[str], str]:
+    """
+    Split a stored media reference into (container_name, blob_name).
+    
+    Media is stored as "{container_name}/{userId}/{filename}"; a reference without
+    a container prefix is assumed to live in the default container (None).
+    """
+    parts = storage_url.split("/", 1)
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return None, storage_url
+
+
+# Global instance (no network calls until first use)
 storage_service = StorageService()
 
@@ -0,0 +1,32 @@
+"""
+Server-sent events for endpoints that stream AI output as it is generated.
+
+A stream is a sequence of `delta` events carrying text as it arrives, ended by one `done`
+event with the full result (including token usage) or an `error` event. Clients read it
+with fetch() and a stream reader (EventSource can't POST).
+Events are only sent as they are produced under uvicorn; the Azure Functions AsgiMiddleware
+buffers the whole response.
+"""
+from typing import AsyncIterator, Callable, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+
+def sse_event(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def sse_response(events: AsyncIterator[bytes], on_close: Optional[Callable[[], None]] = None) -> StreamingResponse:
+    """on_close runs once the response is finished, including when the client left before the stream started"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Keep reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+        background=BackgroundTask(on_close) if on_close is not None else None,
+    )
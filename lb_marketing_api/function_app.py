@@ -1,14 +1,19 @@
 """
 Azure Functions entry point for FastAPI application.
 This file wraps the FastAPI app from app.main to work with Azure Functions.
+AsgiMiddleware buffers each response, so streaming endpoints (SSE, exports, followed job
+results) return their whole body at once here; they only stream under uvicorn.
 """
 
+import asyncio
 import logging
 import azure.functions as func
 from azure.functions import AsgiMiddleware
 from app.main import app
 from app.db import SessionLocal
 from app.routers.posts import process_due_posts
+from app.config import settings
+from app.services.jobs import run_pending_jobs
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -16,6 +21,22 @@ logger = logging.getLogger(__name__)
 # Create ASGI middleware wrapper
 asgi_handler = AsgiMiddleware(app)
 
+# AsgiMiddleware only runs the app lifespan (background job worker, shared clients) once
+# notify_startup() is awaited; it must run on the worker's event loop, so the first request does it
+_startup_lock = asyncio.Lock()
+_started = False
+
+
+async def ensure_startup() -> None:
+    global _started
+    if _started:
+        return
+    async with _startup_lock:
+        if not _started:
+            if not await asgi_handler.notify_startup():
+                logger.error("FastAPI lifespan startup failed")
+            _started = True
+
 # Create function app with manual HTTP trigger to control route pattern
 function_app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
@@ -57,6 +78,7 @@ async def http_app_func(req: func.HttpRequest) -> func.HttpResponse:
     """HTTP trigger function that handles all routes for FastAPI app."""
     # Wrap the request to strip /api prefix from URL before passing to FastAPI
     modified_req = HttpRequestWrapper(req)
+    await ensure_startup()
     return await asgi_handler.handle_async(modified_req)
 
 @function_app.timer_trigger(schedule="0 * * * * *", arg_name="timer", run_on_startup=False, use_monitor=False)
@@ -79,4 +101,15 @@ def publish_scheduled_posts_timer(timer: func.TimerRequest) -> None:
     finally:
         db.close()
 
-
+@function_app.timer_trigger(schedule="0 * * * * *", arg_name="timer", run_on_startup=False, use_monitor=False)
+async def run_background_jobs_timer(timer: func.TimerRequest) -> None:
+    """
+    Timer-triggered function that drains the background job queue every minute.
+    Covers instances where the in-process worker isn't running (scaled to zero between requests).
+    """
+    try:
+        count = await run_pending_jobs(settings.JOB_TIMER_MAX_SECONDS)
+        if count:
+            logger.info(f"Ran {count} background job(s)")
+    except Exception as e:
+        logger.error(f"Error in run_background_jobs_timer: {str(e)}", exc_info=True)
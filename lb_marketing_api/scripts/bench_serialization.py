@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark list-response serialization.
+
+Compares FastAPI's default response pipeline (validate against response_model, dump to
+Python objects, encode with the response class) with the direct path used by the list
+endpoints (validate once, encode straight to JSON bytes in pydantic-core), for ORM
+entities and for projected row tuples.
+
+Usage:
+    python scripts/bench_serialization.py [rows] [repeats]
+"""
+
+import asyncio
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Make the app package importable when run from anywhere
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+
+try:
+    from app.responses import model_list_response  # noqa: E402
+except ImportError:  # Before the direct path existed
+    model_list_response = None
+
+
+def make_posts(n: int) -> List[models.ScheduledPost]:
+    start = datetime(2026, 1, 1)
+    return [
+        models.ScheduledPost(
+            id=i, user_id=1, business_id=1, campaign_id=None, platform="x",
+            content=f"Post number {i} with some representative copy #marketing",
+            media_asset_id=None, scheduled_at=start + timedelta(minutes=i),
+            status="scheduled", external_post_id=None, created_at=start,
+        )
+        for i in range(n)
+    ]
+
+
+def as_rows(posts) -> list:
+    # Stand-in for the Row tuples a select(*columns) projection returns
+    keys = list(schemas.ScheduledPostOut.model_fields)
+    PostRow = namedtuple("PostRow", keys)
+    return [PostRow(*(getattr(p, k) for k in keys)) for p in posts]
+
+
+def bench(label: str, fn, repeats: int):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        size = len(fn())
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"{label:<44} {elapsed * 1000:8.2f} ms   {size:>9} bytes")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    posts = make_posts(n)
+    field = create_model_field(name="Response_list_posts", type_=List[schemas.ScheduledPostOut], mode="serialization")
+
+    def fastapi_path(response_class):
+        def run():
+            content = asyncio.run(serialize_response(field=field, response_content=posts, is_coroutine=True))
+            return response_class(content).body
+        return run
+
+    print(f"{n} ScheduledPostOut rows, mean of {repeats} runs")
+    bench("FastAPI response_model + JSONResponse", fastapi_path(JSONResponse), repeats)
+    bench("FastAPI response_model + ORJSONResponse", fastapi_path(ORJSONResponse), repeats)
+    if model_list_response is not None:
+        rows = as_rows(posts)
+        bench("model_list_response (ORM entities)", lambda: model_list_response(posts, schemas.ScheduledPostOut).body, repeats)
+        bench("model_list_response (row tuples)", lambda: model_list_response(rows, schemas.ScheduledPostOut).body, repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Index advisor: flags foreign keys and hot filter columns that no index covers.
+
+A column set counts as covered when it is a leading prefix of an index, a
+unique constraint or the primary key. The columns a partial index's WHERE
+clause pins (e.g. has_reply = false) count as following its indexed columns.
+Add new entries to HOT_FILTERS when a router starts filtering on a new column
+combination. tests/test_indexes.py runs the same check in the test suite.
+
+Usage:
+    python scripts/check_indexes.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Make the app package importable when run from anywhere
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.db import Base  # noqa: E402
+import app.models  # noqa: E402,F401
+
+# (table, columns) that routers filter on for every dashboard load
+HOT_FILTERS = [
+    ("businesses", ("user_id",)),
+    ("social_profiles", ("user_id", "platform", "status")),
+    ("scheduled_posts", ("user_id",)),
+    ("scheduled_posts", ("scheduled_at",)),
+    ("media_assets", ("business_id",)),
+    ("client_engagements", ("user_id",)),
+    ("review_records", ("engagement_id", "gbp_review_id")),
+    ("review_records", ("engagement_id",)),
+    ("review_records", ("engagement_id", "has_reply")),
+    ("oauth_states", ("state",)),
+    ("users", ("email",)),
+    ("jobs", ("status",)),
+    ("jobs", ("user_id",)),
+    ("job_results", ("job_id",)),
+]
+
+
+def _predicate_columns(table, index):
+    """Columns named in a partial index's WHERE clause, in the order they appear"""
+    where = index.dialect_options["postgresql"].get("where")
+    if where is None:
+        return ()
+    names = re.findall(r"\w+", str(where))
+    return tuple(dict.fromkeys(name for name in names if name in table.columns))
+
+
+def covering_prefixes(table):
+    """Return the column tuples of every index-backed structure on table."""
+    prefixes = []
+    if table.primary_key.columns:
+        prefixes.append(tuple(c.name for c in table.primary_key.columns))
+    for index in table.indexes:
+        prefixes.append(tuple(c.name for c in index.columns) + _predicate_columns(table, index))
+    for constraint in table.constraints:
+        if constraint.__class__.__name__ == "UniqueConstraint":
+            prefixes.append(tuple(c.name for c in constraint.columns))
+    for column in table.columns:
+        if column.unique:
+            prefixes.append((column.name,))
+    return prefixes
+
+
+def is_covered(table, columns):
+    return any(p[:len(columns)] == tuple(columns) for p in covering_prefixes(table))
+
+
+def main():
+    tables = Base.metadata.tables
+    problems = []
+
+    for table in tables.values():
+        for fk in table.foreign_key_constraints:
+            columns = tuple(c.name for c in fk.columns)
+            if not is_covered(table, columns):
+                problems.append(f"{table.name}({', '.join(columns)}): foreign key without index")
+
+    for table_name, columns in HOT_FILTERS:
+        table = tables.get(table_name)
+        if table is None:
+            problems.append(f"{table_name}: table not found")
+        elif not is_covered(table, columns):
+            problems.append(f"{table_name}({', '.join(columns)}): filter column without index")
+
+    if problems:
+        print("Unindexed columns found:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+
+    print("✓ All foreign keys and hot filter columns are indexed")
+
+
+if __name__ == "__main__":
+    main()
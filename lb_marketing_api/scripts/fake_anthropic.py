@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic API, for exercising review replies without an API key.
+
+Serves /v1/messages (streaming too) and the Message Batches endpoints with canned replies. Batches end
+FAKE_BATCH_SECONDS after they are created. System blocks marked with cache_control are
+reported as cache writes the first time they are seen and as cache reads afterwards.
+Point the app at it with:
+
+    ANTHROPIC_API_KEY=fake ANTHROPIC_BASE_URL=http://127.0.0.1:8081
+
+Usage:
+    python scripts/fake_anthropic.py [port]
+"""
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+BATCH_SECONDS = float(os.getenv("FAKE_BATCH_SECONDS", "5"))
+
+app = FastAPI(title="Fake Anthropic API")
+batches: dict = {}
+cached_prefixes: set = set()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _usage(params: dict, text: str) -> dict:
+    usage = {"input_tokens": len(str(params["messages"])) // 4, "output_tokens": len(text) // 4,
+             "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+    system = params.get("system") or ""
+    if isinstance(system, str):
+        usage["input_tokens"] += len(system) // 4
+        return usage
+    for block in system:
+        tokens = len(block["text"]) // 4
+        if not block.get("cache_control"):
+            usage["input_tokens"] += tokens
+        elif block["text"] in cached_prefixes:
+            usage["cache_read_input_tokens"] += tokens
+        else:
+            cached_prefixes.add(block["text"])
+            usage["cache_creation_input_tokens"] += tokens
+    return usage
+
+
+def _message(params: dict) -> dict:
+    prompt = params["messages"][-1]["content"]
+    reviewer = prompt.splitlines()[0].removeprefix("Reviewer: ") if isinstance(prompt, str) else "there"
+    text = f"Thanks so much, {reviewer}! We hope to see you again soon."
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": params["model"],
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": _usage(params, text),
+    }
+
+
+def _batch_body(request: Request, batch: dict) -> dict:
+    ended = batch["canceled"] or time.time() >= batch["created"] + BATCH_SECONDS
+    count = len(batch["requests"])
+    return {
+        "id": batch["id"],
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else count,
+            "succeeded": count if ended and not batch["canceled"] else 0,
+            "errored": 0,
+            "canceled": count if batch["canceled"] else 0,
+            "expired": 0,
+        },
+        "created_at": _iso(batch["created"]),
+        "expires_at": _iso(batch["created"] + 86400),
+        "ended_at": _iso(time.time()) if ended else None,
+        "cancel_initiated_at": _iso(batch["created"]) if batch["canceled"] else None,
+        "archived_at": None,
+        "results_url": str(request.url_for("batch_results", batch_id=batch["id"])) if ended else None,
+    }
+
+
+def _get_batch(batch_id: str) -> dict:
+    if batch_id not in batches:
+        raise HTTPException(404, "Batch not found")
+    return batches[batch_id]
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: ".encode() + orjson.dumps({"type": event, **data}) + b"\n\n"
+
+
+async def _stream_message(message: dict):
+    text = message["content"][0]["text"]
+    usage = message["usage"]
+    yield _sse("message_start", {"message": {**message, "content": [], "usage": {**usage, "output_tokens": 0}}})
+    yield _sse("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+    for i, word in enumerate(text.split(" ")):
+        chunk = word if i == 0 else " " + word
+        yield _sse("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+    yield _sse("content_block_stop", {"index": 0})
+    yield _sse("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                 "usage": {"output_tokens": usage["output_tokens"]}})
+    yield _sse("message_stop", {})
+
+
+@app.post("/v1/messages")
+async def create_message(request: Request):
+    params = await request.json()
+    if params.get("stream"):
+        return StreamingResponse(_stream_message(_message(params)), media_type="text/event-stream")
+    return _message(params)
+
+
+@app.post("/v1/messages/batches")
+async def create_batch(request: Request):
+    body = await request.json()
+    batch = {"id": f"msgbatch_{uuid.uuid4().hex}", "requests": body["requests"], "created": time.time(), "canceled": False}
+    batches[batch["id"]] = batch
+    return _batch_body(request, batch)
+
+
+@app.get("/v1/messages/batches/{batch_id}")
+async def retrieve_batch(batch_id: str, request: Request):
+    return _batch_body(request, _get_batch(batch_id))
+
+
+@app.post("/v1/messages/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str, request: Request):
+    batch = _get_batch(batch_id)
+    batch["canceled"] = True
+    return _batch_body(request, batch)
+
+
+@app.get("/v1/messages/batches/{batch_id}/results", name="batch_results")
+async def batch_results(batch_id: str):
+    batch = _get_batch(batch_id)
+    lines = []
+    for entry in batch["requests"]:
+        if batch["canceled"]:
+            result = {"type": "canceled"}
+        else:
+            result = {"type": "succeeded", "message": _message(entry["params"])}
+        lines.append(orjson.dumps({"custom_id": entry["custom_id"], "result": result}))
+    return Response(b"\n".join(lines) + b"\n", media_type="application/x-jsonl")
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8081
+    uvicorn.run(app, host="127.0.0.1", port=port)
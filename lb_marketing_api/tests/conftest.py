@@ -0,0 +1,88 @@
+"""
+Shared fixtures.
+
+Tests run the app against a throwaway SQLite database (aiosqlite for the async handlers)
+instead of PostgreSQL; every table is emptied after each test.
+"""
+import os
+
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("JOB_WORKER_ENABLED", "false")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, delete  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+import app.db as db_module  # noqa: E402
+from app import models  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.query_stats import count_queries, instrument_engine  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database(tmp_path_factory):
+    """Point the app's engines and session factories at a fresh SQLite file"""
+    path = tmp_path_factory.mktemp("db") / "test.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=NullPool)
+    # A TestClient without `with` runs each request on its own event loop; don't keep connections
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    for sync_engine in (engine, async_engine.sync_engine):
+        instrument_engine(sync_engine)
+    db_module.engine, db_module.async_engine = engine, async_engine
+    db_module.SessionLocal.configure(bind=engine)
+    db_module.AsyncSessionLocal.configure(bind=async_engine)
+    db_module.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _empty_tables(database):
+    yield
+    with database.begin() as connection:
+        for table in reversed(db_module.Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+
+
+@pytest.fixture
+def db():
+    session = db_module.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user; returns (user, auth headers)"""
+    def make(email: str = "owner@example.com"):
+        user = models.User(email=email)
+        user.set_password("password")
+        db.add(user)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        return user, headers
+    return make
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Hold a block to a maximum number of SQL queries (see app.query_stats.count_queries):
+
+        with query_budget(3):
+            client.get("/posts", headers=headers)
+    """
+    def budget(max_queries: int):
+        return count_queries(max_queries=max_queries)
+    return budget
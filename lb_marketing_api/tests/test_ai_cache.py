@@ -0,0 +1,87 @@
+"""AI response cache (app/services/ai_cache.py): keys, LRU bound, TTL and near-duplicate lookup"""
+import asyncio
+
+from app.services import ai_cache
+from app.services.ai_cache import ResponseCache, cache_key
+
+PARAMS = {"temperature": 0.7}
+
+
+def key(text, tone="warm", model="gpt", params=PARAMS):
+    return cache_key(text, tone, model, params)
+
+
+def similar(cache, text, embedding, threshold=0.9, **variant):
+    return asyncio.run(cache.get_similar(key(text, **variant), embedding, threshold))
+
+
+def test_key_normalizes_whitespace_and_case():
+    assert key("  Spring   SALE\nthis week ") == key("spring sale this week")
+    assert key("spring sale", tone=" Warm ") == key("spring sale", tone="warm")
+
+
+def test_key_separates_tone_model_and_params():
+    base = key("spring sale")
+    assert base != key("spring sale", tone="formal")
+    assert base != key("spring sale", model="gpt-mini")
+    assert base != key("spring sale", params={"temperature": 0.2})
+    assert base.prompt == key("spring sale", tone="formal").prompt
+
+
+def test_get_counts_hits():
+    cache = ResponseCache(10, 60)
+    cache.put(key("a"), {"content": "A"})
+    assert cache.get(key("a")) == {"content": "A"}
+    assert cache.get(key("b")) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(2, 60)
+    cache.put(key("a"), {"content": "A"})
+    cache.put(key("b"), {"content": "B"})
+    cache.get(key("a"))
+    cache.put(key("c"), {"content": "C"})
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) == {"content": "A"}
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ai_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(10, ttl_seconds=60)
+    cache.put(key("a"), {"content": "A"}, embedding=[1.0, 0.0])
+    now[0] += 61
+    assert cache.get(key("a")) is None
+    assert similar(cache, "a again", [1.0, 0.0]) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_similar_prompt_hits_within_the_same_variant():
+    cache = ResponseCache(10, 60)
+    cache.put(key("spring sale"), {"content": "A"}, embedding=[1.0, 0.0])
+    cache.put(key("winter sale"), {"content": "B"}, embedding=[0.0, 1.0])
+    # Embeddings needn't be normalized
+    assert similar(cache, "spring sale!", [3.0, 0.3]) == {"content": "A"}
+    assert similar(cache, "autumn sale", [1.0, 1.0]) is None  # Below the threshold
+    assert similar(cache, "spring sale!", [1.0, 0.0], tone="formal") is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_similar_lookup_scans_only_the_most_recent_entries():
+    cache = ResponseCache(10, 60, similar_scan_max=2)
+    cache.put(key("oldest"), {"content": "old"}, embedding=[1.0, 0.0])
+    cache.put(key("newer"), {"content": "B"}, embedding=[0.0, 1.0])
+    cache.put(key("newest"), {"content": "C"}, embedding=[0.0, 1.0])
+    assert similar(cache, "like the oldest", [1.0, 0.0]) is None
+    cache.put(key("oldest"), {"content": "old"}, embedding=[1.0, 0.0])  # Stored again: most recent
+    assert similar(cache, "like the oldest", [1.0, 0.0]) == {"content": "old"}
+
+
+def test_evicted_entries_leave_the_similarity_index():
+    cache = ResponseCache(1, 60)
+    cache.put(key("a"), {"content": "A"}, embedding=[1.0, 0.0])
+    cache.put(key("b", tone="formal"), {"content": "B"}, embedding=[1.0, 0.0])
+    assert similar(cache, "a", [1.0, 0.0]) is None
+    assert list(cache._embeddings) == [key("b", tone="formal").variant]
@@ -0,0 +1,80 @@
+"""Per-platform generation profiles (app/services/generation_profiles.py): length, trimming, re-asking"""
+import pytest
+
+from app import models
+from app.services.generation_profiles import (
+    DEFAULT_PROFILE,
+    STOP_SEQUENCES,
+    GenerationProfile,
+    clean_post,
+    get_profile,
+    needs_reask,
+    trim_post,
+    x_weighted_length,
+)
+
+X = get_profile(models.PlatformEnum.x)
+SHORT = GenerationProfile(max_chars=40, max_completion_tokens=50, length_hint="short")
+
+
+def test_profiles_by_platform():
+    assert X.max_chars == 280 and X.weighted
+    assert get_profile(None) is DEFAULT_PROFILE
+    assert X.completion_params() == {"max_completion_tokens": 160, "temperature": 0.7, "stop": STOP_SEQUENCES}
+
+
+@pytest.mark.parametrize("text, length", [
+    ("hello", 5),
+    ("café — “ok”", 11),  # Latin and general punctuation count 1
+    ("日本", 4),  # CJK counts 2
+    ("🎉", 2),
+    ("see https://example.com/a/very/long/path?with=query", 4 + 23),  # Links count 23
+    ("a http://x.io b", 4 + 23),
+])
+def test_x_weighted_length(text, length):
+    assert x_weighted_length(text) == length
+
+
+def test_clean_post_strips_wrapping_quotes():
+    assert clean_post('  "Spring sale!"  ') == "Spring sale!"
+    assert clean_post("“Spring sale!”") == "Spring sale!"
+    assert clean_post('"Spring" sale') == '"Spring" sale'
+
+
+def test_needs_reask_only_well_over_the_limit():
+    assert not needs_reask("x" * 48, SHORT)  # 20% over: trimmed
+    assert needs_reask("x" * 49, SHORT)
+
+
+def test_post_within_the_limit_is_untouched():
+    text = "Fresh bagels daily. Come by"
+    assert trim_post(text, SHORT) == text
+
+
+def test_trim_at_the_last_sentence_that_fits():
+    text = "Fresh bagels daily. Open at seven! Lots of cream cheese flavours too."
+    assert trim_post(text, SHORT) == "Fresh bagels daily. Open at seven!"
+
+
+def test_trim_at_a_word_when_no_sentence_end_is_late_enough():
+    text = "Hi. Fresh bagels and coffee every single morning at our bakery"
+    trimmed = trim_post(text, SHORT)
+    assert len(trimmed) <= SHORT.max_chars
+    assert text.startswith(trimmed) and text[len(trimmed)] == " "
+    assert trimmed != "Hi."
+
+
+def test_incomplete_post_drops_its_unfinished_sentence():
+    text = "Fresh bagels daily. Open at sev"
+    assert trim_post(text, SHORT, incomplete=True) == "Fresh bagels daily."
+    assert trim_post(text, SHORT) == text
+
+
+def test_trim_uses_weighted_length_for_x():
+    # 280 characters, but emoji count 2: over X's limit
+    text = "Great news 🎉 " * 21
+    assert len(text.strip()) <= 280 < x_weighted_length(text)
+    trimmed = trim_post(text.strip(), X)
+    assert text.startswith(trimmed)
+    assert 270 <= x_weighted_length(trimmed) <= 280
+    assert text[len(trimmed)] == " "  # Cut at a word
@@ -0,0 +1,36 @@
+"""Index advisor (scripts/check_indexes.py): every foreign key and hot filter has an index"""
+import pytest
+
+from app.db import Base
+import app.models  # noqa: F401
+from scripts.check_indexes import HOT_FILTERS, is_covered
+
+FOREIGN_KEYS = [
+    (table.name, tuple(column.name for column in fk.columns))
+    for table in Base.metadata.sorted_tables
+    for fk in table.foreign_key_constraints
+]
+
+
+def _id(value):
+    return f"{value[0]}({','.join(value[1])})"
+
+
+@pytest.mark.parametrize("table_name, columns", FOREIGN_KEYS, ids=map(_id, FOREIGN_KEYS))
+def test_foreign_key_is_indexed(table_name, columns):
+    assert is_covered(Base.metadata.tables[table_name], columns), (
+        f"{table_name}({', '.join(columns)}): foreign key without index"
+    )
+
+
+@pytest.mark.parametrize("table_name, columns", HOT_FILTERS, ids=map(_id, HOT_FILTERS))
+def test_hot_filter_is_indexed(table_name, columns):
+    table = Base.metadata.tables.get(table_name)
+    assert table is not None, f"{table_name}: table not found"
+    assert is_covered(table, columns), f"{table_name}({', '.join(columns)}): filter column without index"
+
+
+def test_partial_index_predicate_counts_as_covered():
+    table = Base.metadata.tables["review_records"]
+    assert is_covered(table, ("engagement_id", "has_reply"))
+    assert not is_covered(table, ("has_reply",))
@@ -0,0 +1,158 @@
+"""Job queue (app/services/jobs.py): claiming, stale-job reclaim, deferral and cancellation"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.services import jobs
+from app.services.jobs import claim_next_job, enqueue_job, request_cancel, run_next_job
+
+KIND = "test_job"
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """Register a handler for KIND; returns the list of runs it saw (params, state)"""
+    runs = []
+
+    async def handler(context):
+        runs.append((context.params, context.state))
+        if context.params.get("defer") and context.state is None:
+            await context.save_state({"step": 1})
+            context.defer(60)
+        await context.set_total(2)
+        await context.add_results([{"item": 1}, {"item": 2}])
+        return {"ok": True}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, KIND, handler)
+    return runs
+
+
+@pytest.fixture
+def owner(make_user):
+    user, _ = make_user()
+    return user
+
+
+def _add_job(db, owner, **fields) -> int:
+    fields.setdefault("params", {})
+    job = models.Job(user_id=owner.id, kind=KIND, **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+async def _claim():
+    async with AsyncSessionLocal() as session:
+        job = await claim_next_job(session)
+        return job and (job.id, job.status, job.progress_done)
+
+
+def _job(db, job_id) -> models.Job:
+    db.expire_all()
+    return db.get(models.Job, job_id)
+
+
+def test_claims_the_oldest_due_job(db, owner):
+    later = _add_job(db, owner, run_after=datetime.utcnow() + timedelta(hours=1))
+    due = _add_job(db, owner, run_after=datetime.utcnow() - timedelta(seconds=1))
+    queued = _add_job(db, owner)
+
+    assert asyncio.run(_claim()) == (due, models.JobStatus.running, 0)
+    assert asyncio.run(_claim())[0] == queued
+    assert asyncio.run(_claim()) is None
+    job = _job(db, later)
+    assert job.status == models.JobStatus.queued and job.started_at is None
+
+
+def test_reclaimed_stale_job_starts_over(db, owner):
+    stale = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS + 60)
+    job_id = _add_job(db, owner, status=models.JobStatus.running, started_at=stale, heartbeat_at=stale, progress_done=2)
+    db.add_all(models.JobResult(job_id=job_id, data={"item": i}) for i in (1, 2))
+    db.commit()
+
+    assert asyncio.run(_claim()) == (job_id, models.JobStatus.running, 0)
+    job = _job(db, job_id)
+    assert job.heartbeat_at > stale and job.started_at == stale
+    assert db.scalars(select(models.JobResult).where(models.JobResult.job_id == job_id)).all() == []
+
+
+def test_running_job_with_a_fresh_heartbeat_is_not_reclaimed(db, owner):
+    _add_job(db, owner, status=models.JobStatus.running, heartbeat_at=datetime.utcnow(), progress_done=1)
+    assert asyncio.run(_claim()) is None
+
+
+def test_run_records_results_and_progress(db, owner, handled):
+    async def run():
+        async with AsyncSessionLocal() as session:
+            job = await enqueue_job(session, owner.id, KIND, params={"n": 2})
+            job_id = job.id
+        assert await run_next_job()
+        assert not await run_next_job()
+        return job_id
+
+    job = _job(db, asyncio.run(run()))
+    assert job.status == models.JobStatus.succeeded
+    assert job.result == {"ok": True}
+    assert (job.progress_done, job.progress_total) == (2, 2)
+    assert job.finished_at is not None
+    assert handled == [({"n": 2}, None)]
+
+
+def test_deferred_job_resumes_from_its_state(db, owner, handled):
+    job_id = _add_job(db, owner, params={"defer": True})
+
+    assert asyncio.run(run_next_job())
+    job = _job(db, job_id)
+    assert job.status == models.JobStatus.queued
+    assert job.state == {"step": 1} and job.run_after > datetime.utcnow()
+    assert not asyncio.run(run_next_job())  # Not due yet
+
+    job.run_after = None
+    db.commit()
+    assert asyncio.run(run_next_job())
+    assert _job(db, job_id).status == models.JobStatus.succeeded
+    assert handled == [({"defer": True}, None), ({"defer": True}, {"step": 1})]
+
+
+def test_unknown_kind_fails_the_job(db, owner):
+    job_id = _add_job(db, owner)
+    assert asyncio.run(run_next_job())
+    job = _job(db, job_id)
+    assert job.status == models.JobStatus.failed
+    assert job.error == f"Unknown job kind: {KIND}"
+
+
+def test_cancel_a_queued_job(db, owner, handled):
+    job_id = _add_job(db, owner)
+
+    async def cancel():
+        async with AsyncSessionLocal() as session:
+            await request_cancel(session, await session.get(models.Job, job_id))
+
+    asyncio.run(cancel())
+    job = _job(db, job_id)
+    assert job.status == models.JobStatus.canceled and job.cancel_requested
+    assert not asyncio.run(run_next_job())
+    assert handled == []
+
+
+def test_cancel_a_deferred_job_resumes_it_now(db, owner, handled):
+    job_id = _add_job(db, owner, params={"defer": True})
+    asyncio.run(run_next_job())
+
+    async def cancel():
+        async with AsyncSessionLocal() as session:
+            await request_cancel(session, await session.get(models.Job, job_id))
+
+    asyncio.run(cancel())
+    job = _job(db, job_id)
+    assert job.status == models.JobStatus.queued and job.cancel_requested and job.run_after is None
+    # The handler runs once more with its state to clean up; the job ends canceled
+    assert asyncio.run(run_next_job())
+    assert _job(db, job_id).status == models.JobStatus.canceled
+    assert len(handled) == 2
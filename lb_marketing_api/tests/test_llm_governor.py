@@ -0,0 +1,188 @@
+"""LLM rate governor (app/services/llm_governor.py): limits, queue order, rejection and cool-down"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import llm_governor
+from app.services.llm_governor import GovernorBusy, LLMGovernor, estimate_tokens
+
+WINDOW = 0.4
+
+
+@pytest.fixture(autouse=True)
+def short_window(monkeypatch):
+    monkeypatch.setattr(llm_governor, "WINDOW_SECONDS", WINDOW)
+    for name, value in {
+        "ANTHROPIC_RPM": 0, "ANTHROPIC_TPM": 0, "ANTHROPIC_MAX_CONCURRENCY": 0,
+        "AI_TENANT_RPM": 0, "AI_TENANT_TPM": 0, "AI_TENANT_CONCURRENCY": 0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+class Calls:
+    """Runs governed calls and records when each started and how many overlapped"""
+
+    def __init__(self):
+        self.governor = LLMGovernor()
+        self.started = []
+        self.running = 0
+        self.peak = 0
+        self.t0 = time.monotonic()
+
+    async def call(self, name, tenant=None, tokens=0, hold=0.05, max_wait=None):
+        async with self.governor.slot("anthropic", tenant, tokens, max_wait):
+            self.started.append((name, time.monotonic() - self.t0))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(hold)
+            self.running -= 1
+        return name
+
+    def order(self):
+        return [name for name, _ in self.started]
+
+    def start_of(self, name):
+        return dict(self.started)[name]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("x" * 400, 50) == 150
+
+
+def test_concurrency_limit_keeps_fifo_order(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_MAX_CONCURRENCY", 2)
+
+    async def run():
+        calls = Calls()
+        await asyncio.gather(*(calls.call(i) for i in range(6)))
+        return calls
+
+    calls = asyncio.run(run())
+    assert calls.peak == 2
+    assert calls.order() == list(range(6))
+
+
+def test_requests_per_minute_window(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_RPM", 2)
+
+    async def run():
+        calls = Calls()
+        await asyncio.gather(*(calls.call(i, hold=0) for i in range(3)))
+        return calls
+
+    calls = asyncio.run(run())
+    assert calls.start_of(1) < WINDOW / 2
+    assert calls.start_of(2) >= WINDOW * 0.9
+
+
+def test_tokens_per_minute_charges_actual_usage(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_TPM", 100)
+
+    async def run():
+        governor = LLMGovernor()
+        async with governor.slot("anthropic", tokens=90) as slot:
+            slot.charge(10)  # Used far less than reserved
+        t0 = time.monotonic()
+        async with governor.slot("anthropic", tokens=80):
+            pass
+        fitted = time.monotonic() - t0
+        t0 = time.monotonic()
+        async with governor.slot("anthropic", tokens=80):
+            pass
+        return fitted, time.monotonic() - t0
+
+    fitted, waited = asyncio.run(run())
+    assert fitted < WINDOW / 2
+    assert waited >= WINDOW * 0.5
+
+
+def test_rejects_calls_that_would_wait_past_max_wait(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_RPM", 1)
+
+    async def run():
+        governor = LLMGovernor()
+        async with governor.slot("anthropic"):
+            pass
+        with pytest.raises(GovernorBusy) as busy:
+            async with governor.slot("anthropic", max_wait=0.05):
+                pass
+        return busy.value, governor.snapshot()["anthropic"]
+
+    busy, snapshot = asyncio.run(run())
+    assert busy.provider == "anthropic"
+    assert 0 < busy.retry_after <= WINDOW
+    assert snapshot["rejected"] == 1 and snapshot["calls"] == 1 and snapshot["queue_length"] == 0
+
+
+def test_tenant_over_budget_does_not_hold_up_other_tenants(monkeypatch):
+    monkeypatch.setattr(settings, "AI_TENANT_RPM", 1)
+
+    async def run():
+        calls = Calls()
+        await calls.call("a1", tenant="a", hold=0)
+        # a2 queues first but has to wait for a's window; b and c go ahead of it
+        a2 = asyncio.create_task(calls.call("a2", tenant="a", hold=0))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(calls.call("b", tenant="b", hold=0), calls.call("c", tenant="c", hold=0))
+        await a2
+        return calls
+
+    calls = asyncio.run(run())
+    assert calls.order() == ["a1", "b", "c", "a2"]
+    assert calls.start_of("b") < WINDOW / 2
+    assert calls.start_of("a2") >= WINDOW * 0.9
+
+
+def test_fifo_within_a_tenant(monkeypatch):
+    monkeypatch.setattr(settings, "AI_TENANT_CONCURRENCY", 1)
+
+    async def run():
+        calls = Calls()
+        await asyncio.gather(*(calls.call(i, tenant="a", hold=0.02) for i in range(4)), calls.call("b", tenant="b"))
+        return calls
+
+    calls = asyncio.run(run())
+    assert [name for name in calls.order() if name != "b"] == [0, 1, 2, 3]
+    assert calls.start_of("b") < 0.02
+
+
+def test_rate_limited_call_pauses_the_provider():
+    class RateLimited(Exception):
+        status_code = 429
+        response = SimpleNamespace(headers={"retry-after": "0.3"})
+
+    async def run():
+        governor = LLMGovernor()
+        with pytest.raises(RateLimited):
+            async with governor.slot("anthropic"):
+                raise RateLimited()
+        t0 = time.monotonic()
+        async with governor.slot("anthropic"):
+            pass
+        return time.monotonic() - t0, governor.snapshot()["anthropic"]
+
+    waited, snapshot = asyncio.run(run())
+    assert waited >= 0.25
+    assert snapshot["rate_limited"] == 1
+
+
+def test_release_is_idempotent(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_MAX_CONCURRENCY", 1)
+
+    async def run():
+        governor = LLMGovernor()
+        slot = governor.slot("anthropic")
+        await slot.__aenter__()
+        slot.release()
+        slot.release()
+        # A double release would leave room for two calls at once
+        first, second = governor.slot("anthropic"), governor.slot("anthropic", max_wait=0.05)
+        await first.__aenter__()
+        with pytest.raises(GovernorBusy):
+            await second.__aenter__()
+        first.release()
+
+    asyncio.run(run())
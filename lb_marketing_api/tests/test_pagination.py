@@ -0,0 +1,108 @@
+"""Keyset pagination (app/pagination.py): cursors, tie-breaks, NULL ordering and page limits"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+COLUMNS = (models.ScheduledPost.scheduled_at, models.ScheduledPost.id)
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 3, 1, 12, 30, 5, 123456), 42]
+    assert decode_cursor(encode_cursor(values), COLUMNS) == values
+
+
+def test_cursor_keeps_nulls():
+    columns = (models.ReviewRecord.review_published_at, models.ReviewRecord.id)
+    assert decode_cursor(encode_cursor([None, 7]), columns) == [None, 7]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode_cursor([1]),  # Wrong number of sort columns
+    encode_cursor(["yesterday", 1]),  # Not a datetime
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, COLUMNS)
+    assert error.value.status_code == 400
+
+
+def _pages(client, path, headers, limit):
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        items.extend(page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return items
+
+
+@pytest.fixture
+def owner(db, make_user):
+    user, headers = make_user()
+    business = models.Business(user_id=user.id, name="Acme Dental")
+    db.add(business)
+    db.flush()
+    return user, business, headers
+
+
+def test_pages_break_ties_on_id(client, db, owner):
+    user, business, headers = owner
+    # Runs of posts sharing scheduled_at, so pages end in the middle of a tie
+    for i in range(7):
+        db.add(models.ScheduledPost(
+            user_id=user.id, business_id=business.id, platform=models.PlatformEnum.facebook,
+            content=f"Post {i}", scheduled_at=datetime(2026, 1, 1) + timedelta(days=i // 3),
+        ))
+    db.commit()
+
+    items = _pages(client, "/posts", headers, limit=2)
+    keys = [(item["scheduled_at"], item["id"]) for item in items]
+    assert len(keys) == 7 and len(set(keys)) == 7
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_nullable_sort_column_pages_nulls_first(client, db, owner):
+    user, business, headers = owner
+    engagement = models.ClientEngagement(user_id=user.id, business_id=business.id)
+    db.add(engagement)
+    db.flush()
+    published = [None, datetime(2026, 1, 2), None, datetime(2026, 1, 1), datetime(2026, 1, 2)]
+    for i, published_at in enumerate(published):
+        db.add(models.ReviewRecord(engagement_id=engagement.id, gbp_review_id=f"r{i}", review_published_at=published_at))
+    db.commit()
+
+    items = _pages(client, f"/demo/engagements/{engagement.id}/reviews", headers, limit=2)
+    assert len({item["id"] for item in items}) == len(published)
+    undated = [item for item in items if item["review_published_at"] is None]
+    assert items[:2] == undated
+    assert [item["id"] for item in undated] == sorted((item["id"] for item in undated), reverse=True)
+
+
+def test_default_and_maximum_page_size(client, db, owner):
+    user, business, headers = owner
+    db.add_all(
+        models.ScheduledPost(
+            user_id=user.id, business_id=business.id, platform=models.PlatformEnum.x,
+            content="Post", scheduled_at=datetime(2026, 1, 1),
+        )
+        for _ in range(DEFAULT_PAGE_SIZE + 1)
+    )
+    db.commit()
+
+    response = client.get("/posts", headers=headers)
+    assert len(response.json()) == DEFAULT_PAGE_SIZE
+    assert NEXT_CURSOR_HEADER in response.headers
+    rest = client.get("/posts", params={"cursor": response.headers[NEXT_CURSOR_HEADER]}, headers=headers)
+    assert len(rest.json()) == 1
+    assert NEXT_CURSOR_HEADER not in rest.headers
+
+    assert client.get("/posts", params={"limit": 201}, headers=headers).status_code == 422
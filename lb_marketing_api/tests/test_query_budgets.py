@@ -0,0 +1,89 @@
+"""
+Query budgets of the list endpoints: the number of SQL queries per request must not grow
+with the number of rows listed (no per-row lazy loads). Raise a budget only on purpose.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+
+ROWS = 20
+
+
+@pytest.fixture
+def owner(db, make_user):
+    """A user with ROWS engagements, reviews on the first one and ROWS scheduled posts"""
+    user, headers = make_user()
+    business = models.Business(user_id=user.id, name="Acme Dental")
+    db.add(business)
+    db.flush()
+    engagements = [models.ClientEngagement(user_id=user.id, business_id=business.id) for _ in range(ROWS)]
+    db.add_all(engagements)
+    db.flush()
+    start = datetime(2026, 1, 1)
+    db.add_all(
+        models.ReviewRecord(
+            engagement_id=engagements[0].id,
+            gbp_review_id=f"review-{i}",
+            review_text="Great service",
+            review_published_at=start + timedelta(hours=i),
+            has_reply=i % 2 == 0,
+        )
+        for i in range(ROWS)
+    )
+    db.add_all(
+        models.ScheduledPost(
+            user_id=user.id,
+            business_id=business.id,
+            platform=models.PlatformEnum.facebook,
+            content=f"Post {i}",
+            scheduled_at=start + timedelta(days=i),
+        )
+        for i in range(ROWS)
+    )
+    db.commit()
+    return headers, engagements[0].id
+
+
+# Each budget is one query for the current user plus the list query itself
+@pytest.mark.parametrize("view", ["full", "summary"])
+def test_list_engagements_query_budget(client, owner, query_budget, view):
+    headers, _ = owner
+    with query_budget(2):
+        response = client.get("/demo/engagements", params={"view": view}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+    assert all(row["business_name"] == "Acme Dental" for row in response.json())
+
+
+def test_list_posts_query_budget(client, owner, query_budget):
+    headers, _ = owner
+    with query_budget(2):
+        response = client.get("/posts", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+
+
+# The engagement ownership check adds two: the engagement and its business (selectinload)
+@pytest.mark.parametrize("view", ["full", "summary"])
+def test_list_reviews_query_budget(client, owner, query_budget, view):
+    headers, engagement_id = owner
+    with query_budget(4):
+        response = client.get(f"/demo/engagements/{engagement_id}/reviews", params={"view": view}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+
+
+def test_review_summary_query_budget(client, owner, query_budget):
+    headers, engagement_id = owner
+    with query_budget(4):
+        response = client.get(f"/demo/engagements/{engagement_id}/reviews/summary", headers=headers)
+    assert response.json() == {"total": ROWS, "unanswered_count": ROWS // 2}
+
+
+def test_budget_overrun_fails(client, owner, query_budget):
+    headers, _ = owner
+    with pytest.raises(AssertionError, match="budget is 1"):
+        with query_budget(1):
+            client.get("/posts", headers=headers)
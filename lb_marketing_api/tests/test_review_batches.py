@@ -0,0 +1,196 @@
+"""
+Batch auto-reply (auto_reply_batch jobs) against the local fake Anthropic server
+(scripts/fake_anthropic.py): submit, deferral while the batch runs, resume, cancel, and the
+replies written to the review records.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from sqlalchemy import select
+
+from app import models, schemas
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.services.ai_clients import ai_clients
+from app.services.demo import review_jobs  # noqa: F401  (registers the review job handlers)
+from app.services.demo.auto_reply import collect_batch_replies, result_items, submit_reply_batch
+from app.services.demo.claude_service import ClaudeService
+from app.services.jobs import enqueue_job, run_next_job
+from scripts import fake_anthropic
+
+
+@pytest.fixture(scope="module")
+def fake_anthropic_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake_anthropic.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "fake Anthropic server did not start"
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+@pytest.fixture
+def fake_anthropic_api(fake_anthropic_url, monkeypatch):
+    """Point the Anthropic client at the fake server; batches end once end_batches() is called"""
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "fake")
+    monkeypatch.setattr(settings, "ANTHROPIC_BASE_URL", fake_anthropic_url)
+    monkeypatch.setattr(fake_anthropic, "BATCH_SECONDS", 3600)
+    monkeypatch.setattr(fake_anthropic, "batches", {})
+
+    def end_batches():
+        monkeypatch.setattr(fake_anthropic, "BATCH_SECONDS", 0)
+    return end_batches
+
+
+@pytest.fixture
+def engagement(db, make_user):
+    """Engagement with three unanswered reviews and one already answered"""
+    user, _ = make_user()
+    business = models.Business(user_id=user.id, name="Acme Dental")
+    db.add(business)
+    db.flush()
+    engagement = models.ClientEngagement(
+        user_id=user.id, business_id=business.id, gbp_account_id="accounts/1", gbp_location_id="locations/1",
+    )
+    db.add(engagement)
+    db.flush()
+    for name in ("Ann", "Bob", "Cy"):
+        db.add(models.ReviewRecord(
+            engagement_id=engagement.id, gbp_review_id=f"gbp-{name}", reviewer_name=name,
+            review_text="Lovely visit", star_rating="FIVE",
+        ))
+    db.add(models.ReviewRecord(
+        engagement_id=engagement.id, gbp_review_id="gbp-old", reviewer_name="Dee",
+        review_text="Fine", star_rating="FOUR", has_reply=True, reply_text="Thanks Dee",
+    ))
+    db.commit()
+    return engagement
+
+
+async def _enqueue(engagement: models.ClientEngagement, dry_run: bool = False) -> int:
+    async with AsyncSessionLocal() as db:
+        job = await enqueue_job(
+            db, engagement.user_id, "auto_reply_batch",
+            params={"tone": "warm", "dry_run": dry_run, "batch": True}, engagement_id=engagement.id,
+        )
+        return job.id
+
+
+async def _run_due(job_id: int) -> models.Job:
+    """Make the (deferred) job due, run it once and return its row"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(models.Job, job_id)
+        job.run_after = None
+        await db.commit()
+    assert await run_next_job()
+    async with AsyncSessionLocal() as db:
+        return await db.get(models.Job, job_id)
+
+
+def _reviews(db, engagement):
+    db.expire_all()
+    return {
+        review.reviewer_name: review
+        for review in db.scalars(select(models.ReviewRecord).where(models.ReviewRecord.engagement_id == engagement.id))
+    }
+
+
+def test_submit_and_collect_batch_replies(fake_anthropic_api, engagement):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            loaded = await db.get(models.ClientEngagement, engagement.id)
+            await db.refresh(loaded, ["business"])
+            reviews = (await db.scalars(
+                select(models.ReviewRecord).where(models.ReviewRecord.has_reply.is_(False)).order_by(models.ReviewRecord.id)
+            )).all()
+            claude = ClaudeService(ai_clients.get_anthropic())
+            batch_id = await submit_reply_batch(claude, loaded, reviews, "warm")
+            assert not await claude.batch_ended(batch_id)
+            fake_anthropic_api()
+            assert await claude.batch_ended(batch_id)
+            items = result_items(reviews)
+            await collect_batch_replies(claude, batch_id, reviews, items)
+            await ai_clients.close()
+            return items
+
+    items = asyncio.run(run())
+    assert [item.generated_reply for item in items] == [
+        f"Thanks so much, {name}! We hope to see you again soon." for name in ("Ann", "Bob", "Cy")
+    ]
+    assert all(item.error is None and item.usage.output_tokens > 0 for item in items)
+
+
+def test_batch_job_defers_until_the_batch_ends_then_applies_replies(fake_anthropic_api, engagement, db):
+    async def run():
+        job_id = await _enqueue(engagement)
+
+        # First run submits the batch and defers
+        assert await run_next_job()
+        async with AsyncSessionLocal() as session:
+            job = await session.get(models.Job, job_id)
+        assert job.status == models.JobStatus.queued
+        assert job.run_after is not None
+        assert job.progress_total == 3
+        assert len(job.state["review_ids"]) == 3
+        batch_id = job.state["batch_id"]
+        assert fake_anthropic.batches[batch_id]["requests"]
+
+        # Batch still in progress: deferred again, same checkpoint
+        job = await _run_due(job_id)
+        assert job.status == models.JobStatus.queued
+        assert job.state["batch_id"] == batch_id
+
+        # Batch ended: resumed from the checkpoint, replies posted and saved
+        fake_anthropic_api()
+        job = await _run_due(job_id)
+        async with AsyncSessionLocal() as session:
+            results = (await session.scalars(
+                select(models.JobResult).where(models.JobResult.job_id == job_id).order_by(models.JobResult.id)
+            )).all()
+        await ai_clients.close()
+        return job, results
+
+    job, results = asyncio.run(run())
+    assert job.status == models.JobStatus.succeeded
+    assert job.result["succeeded"] == 3 and job.result["failed"] == 0
+    assert job.progress_done == 3
+    assert [schemas.AutoReplyResultItem(**result.data).saved for result in results] == [True, True, True]
+
+    reviews = _reviews(db, engagement)
+    for name in ("Ann", "Bob", "Cy"):
+        assert reviews[name].has_reply
+        assert reviews[name].reply_text == f"Thanks so much, {name}! We hope to see you again soon."
+        assert reviews[name].reply_generated_by == "ai"
+        assert reviews[name].reply_posted_at is not None
+    assert reviews["Dee"].reply_text == "Thanks Dee"
+
+
+def test_canceled_batch_job_cancels_the_batch(fake_anthropic_api, engagement, db):
+    async def run():
+        job_id = await _enqueue(engagement)
+        assert await run_next_job()
+        async with AsyncSessionLocal() as session:
+            job = await session.get(models.Job, job_id)
+            job.cancel_requested = True
+            await session.commit()
+            batch_id = job.state["batch_id"]
+        job = await _run_due(job_id)
+        await ai_clients.close()
+        return job, batch_id
+
+    job, batch_id = asyncio.run(run())
+    assert job.status == models.JobStatus.canceled
+    assert fake_anthropic.batches[batch_id]["canceled"]
+    reviews = _reviews(db, engagement)
+    assert not any(reviews[name].has_reply for name in ("Ann", "Bob", "Cy"))